@@ -1,10 +1,21 @@
 """Dock widget for browsing the Earth Engine catalog."""
 
 import html
+import threading
 import webbrowser
-from typing import List, Optional
-
-from qgis.PyQt.QtCore import Qt, QThread, QTimer, pyqtSignal
+from array import array
+from dataclasses import dataclass
+from itertools import islice
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+from qgis.PyQt.QtCore import (
+    QAbstractTableModel,
+    QModelIndex,
+    Qt,
+    QThread,
+    QTimer,
+    pyqtSignal,
+)
 from qgis.PyQt.QtWidgets import (
     QAbstractItemView,
     QApplication,
@@ -19,8 +30,7 @@ from qgis.PyQt.QtWidgets import (
     QProgressBar,
     QPushButton,
     QSplitter,
-    QTableWidget,
-    QTableWidgetItem,
+    QTableView,
     QTextBrowser,
     QVBoxLayout,
     QWidget,
@@ -35,18 +45,21 @@ from ..processing.add_image_collection import (
     AddImageCollectionAlgorithm,
     AddImageCollectionAlgorithmDialog,
 )
-from .client import (
-    COMMUNITY_SOURCE,
-    OFFICIAL_SOURCE,
-    CatalogItem,
+from .client import COMMUNITY_SOURCE, OFFICIAL_SOURCE, CatalogItem
+from .search import CatalogIndex, CatalogMatches
+from .store import (
+    CatalogStore,
+    database_path,
     load_catalog,
     load_community_catalog,
-    search_catalog,
 )
 
-MAX_VISIBLE_RESULTS = 100
+# Results read from the store while the catalog loads
+STORED_RESULTS_LIMIT = 100
 POPULAR_VISIBLE_RESULTS = 100
-RESULT_POPULATE_BATCH_SIZE = 50
+# Facets whose filter lists show how many results have each value
+COUNTED_FACETS = ("provider", "category")
+RESULT_COLUMNS = ["Dataset", "Type", "Source", "Provider", "Category", "Date range"]
 COMMON_OFFICIAL_ASSET_IDS = [
     "COPERNICUS/S2_SR_HARMONIZED",
     "COPERNICUS/S2_HARMONIZED",
@@ -76,63 +89,223 @@ COMMON_OFFICIAL_ASSET_IDS = [
 ]
 
 
+def _date_range_label(item: CatalogItem) -> str:
+    if item.start_date and item.end_date:
+        return f"{item.start_date} to {item.end_date}"
+    if item.start_date:
+        return f"{item.start_date} onward"
+    if item.end_date:
+        return f"Until {item.end_date}"
+    return "Unknown"
+
+
+def _column_value(item: CatalogItem, column: int) -> str:
+    if column == 0:
+        return item.title
+    if column == 1:
+        return item.asset_type
+    if column == 2:
+        return item.source
+    if column == 3:
+        return item.provider or "Unknown"
+    if column == 4:
+        return item.category or "Unknown"
+    return _date_range_label(item)
+
+
+class CatalogResultsModel(QAbstractTableModel):
+    """Table of the items at an array of result positions.
+
+    Only the rows in view are read, and sorting reorders the positions. Sorting
+    by column -1 restores the order of the results.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.items: Sequence[CatalogItem] = []
+        self.item_ids = array("I")
+        self._result_ids = self.item_ids
+        self._sort_column = -1
+        self._sort_order = Qt.SortOrder.AscendingOrder
+
+    def set_results(self, items: Sequence[CatalogItem], item_ids: array) -> None:
+        """Show the items at ``item_ids``, in that order."""
+        self.beginResetModel()
+        self.items = items
+        self.item_ids = self._result_ids = item_ids
+        self._sort_column = -1
+        self.endResetModel()
+
+    def item(self, row: int) -> Optional[CatalogItem]:
+        if row < 0 or row >= len(self.item_ids):
+            return None
+        return self.items[self.item_ids[row]]
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.item_ids)
+
+    def columnCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(RESULT_COLUMNS)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or role != Qt.ItemDataRole.DisplayRole:
+            return None
+        return _column_value(self.items[self.item_ids[index.row()]], index.column())
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if (
+            orientation == Qt.Orientation.Horizontal
+            and role == Qt.ItemDataRole.DisplayRole
+        ):
+            return RESULT_COLUMNS[section]
+        return None
+
+    def sort(self, column: int, order=Qt.SortOrder.AscendingOrder) -> None:
+        self.layoutAboutToBeChanged.emit()
+        self._sort_column = column
+        self._sort_order = order
+        self.item_ids = self._sorted_ids()
+        self.layoutChanged.emit()
+
+    def _sorted_ids(self) -> array:
+        if self._sort_column < 0:
+            return self._result_ids
+        column = self._sort_column
+        keys = [
+            _column_value(self.items[item_id], column).lower()
+            for item_id in self._result_ids
+        ]
+        # Stable, so equal values keep the order of the results
+        positions = sorted(
+            range(len(keys)),
+            key=keys.__getitem__,
+            reverse=self._sort_order == Qt.SortOrder.DescendingOrder,
+        )
+        return array("I", [self._result_ids[position] for position in positions])
+
+
 class CatalogLoadThread(QThread):
-    loaded = pyqtSignal(list)
+    """Load a catalog source and index it along with the other loaded items."""
+
+    loaded = pyqtSignal(object)
     failed = pyqtSignal(str)
 
-    def __init__(self, refresh: bool = False, community_only: bool = False):
+    def __init__(
+        self,
+        store: CatalogStore,
+        refresh: bool = False,
+        community_only: bool = False,
+        items: Optional[List[CatalogItem]] = None,
+    ):
         super().__init__()
+        self.store = store
         self.refresh = refresh
         self.community_only = community_only
+        self.items = items or []
 
     def run(self):
         try:
             if self.community_only:
-                self.loaded.emit(load_community_catalog(refresh=self.refresh))
+                source = COMMUNITY_SOURCE
+                loaded = load_community_catalog(self.store, refresh=self.refresh)
             else:
-                self.loaded.emit(load_catalog(refresh=self.refresh))
+                source = OFFICIAL_SOURCE
+                loaded = load_catalog(self.store, refresh=self.refresh)
+            items = [item for item in self.items if item.source != source] + loaded
+            # Indexing takes a moment on large catalogs, so it runs here too
+            self.loaded.emit(CatalogIndex(items))
         except Exception as exc:
             self.failed.emit(str(exc))
 
 
-class CatalogFilterThread(QThread):
-    filtered = pyqtSignal(int, list)
+@dataclass
+class CatalogFilterRequest:
+    request_id: int
+    catalog: Union[CatalogIndex, CatalogStore]
+    query: str = ""
+    asset_type: Optional[str] = None
+    source: Optional[str] = None
+    provider: Optional[str] = None
+    category: Optional[str] = None
+    limit: Optional[int] = None
+
+
+class CatalogFilterWorker(QThread):
+    """Search the loaded catalog index, or the store while it loads, on one
+    long lived thread.
+
+    Only the latest request is searched; requests made during a search
+    replace each other. Searches of the index refine the previous matches
+    when they can only narrow them. Results are emitted as the items
+    searched, the positions of the matches among them, and the number of
+    matches with each provider and category, when known.
+    """
+
+    filtered = pyqtSignal(int, object, object, object)
     failed = pyqtSignal(int, str)
 
-    def __init__(
-        self,
-        request_id: int,
-        items: List[CatalogItem],
-        query: str = "",
-        asset_type: Optional[str] = None,
-        source: Optional[str] = None,
-        provider: Optional[str] = None,
-        category: Optional[str] = None,
-    ):
+    def __init__(self):
         super().__init__()
-        self.request_id = request_id
-        self.items = list(items)
-        self.query = query
-        self.asset_type = asset_type
-        self.source = source
-        self.provider = provider
-        self.category = category
+        self._condition = threading.Condition()
+        self._request: Optional[CatalogFilterRequest] = None
+        self._stopping = False
+        self._index: Optional[CatalogIndex] = None
+        self._matches: Optional[CatalogMatches] = None
+
+    def request(self, request: CatalogFilterRequest) -> None:
+        with self._condition:
+            self._request = request
+            self._condition.notify()
+        if not self.isRunning():
+            self.start()
+
+    def stop(self) -> None:
+        """Drop the pending request and wait for the current search to end."""
+        with self._condition:
+            self._request = None
+            self._stopping = True
+            self._condition.notify()
+        self.wait()
+        self._stopping = False
 
     def run(self):
-        try:
-            self.filtered.emit(
-                self.request_id,
-                search_catalog(
-                    self.items,
-                    query=self.query,
-                    asset_type=self.asset_type,
-                    source=self.source,
-                    provider=self.provider,
-                    category=self.category,
-                ),
-            )
-        except Exception as exc:
-            self.failed.emit(self.request_id, str(exc))
+        while True:
+            with self._condition:
+                while self._request is None and not self._stopping:
+                    self._condition.wait()
+                if self._stopping:
+                    return
+                request, self._request = self._request, None
+            try:
+                self._search(request)
+            except Exception as exc:
+                self.failed.emit(request.request_id, str(exc))
+
+    def _search(self, request: CatalogFilterRequest) -> None:
+        filters = dict(
+            query=request.query,
+            asset_type=request.asset_type,
+            source=request.source,
+            provider=request.provider,
+            category=request.category,
+        )
+        if not isinstance(request.catalog, CatalogIndex):
+            items = request.catalog.search(**filters, limit=request.limit)
+            item_ids = array("I", range(len(items)))
+            self.filtered.emit(request.request_id, items, item_ids, None)
+            return
+
+        index = request.catalog
+        previous = self._matches if index is self._index else None
+        self._index = index
+        self._matches = index.matches(**filters, previous=previous)
+        counts = {
+            facet: index.facet_counts(facet, self._matches.item_ids)
+            for facet in COUNTED_FACETS
+        }
+        self.filtered.emit(
+            request.request_id, index.items, self._matches.item_ids, counts
+        )
 
 
 class CatalogDockWidget(QDockWidget):
@@ -141,33 +314,39 @@ class CatalogDockWidget(QDockWidget):
     def __init__(self, iface, parent=None):
         super().__init__("Earth Engine Catalog", parent)
         self.iface = iface
+        self.store = CatalogStore(database_path())
+        self.index = CatalogIndex([])
         self.items: List[CatalogItem] = []
-        self.filtered_items: List[CatalogItem] = []
         self._loader: Optional[CatalogLoadThread] = None
-        self._filter_loader: Optional[CatalogFilterThread] = None
+        self._filter_worker = CatalogFilterWorker()
+        self._filter_worker.filtered.connect(self._filters_applied)
+        self._filter_worker.failed.connect(self._filter_failed)
         self._is_loading = False
         self._is_filtering = False
         self._loaded_sources = set()
+        self._stored_count = 0
         self._pending_source = ""
         self._filter_request_id = 0
-        self._pending_filter = False
-        self._populate_row = 0
         self._matched_result_count = 0
         self._filter_timer = QTimer(self)
         self._filter_timer.setSingleShot(True)
         self._filter_timer.timeout.connect(self.apply_filters)
-        self._populate_timer = QTimer(self)
-        self._populate_timer.setSingleShot(True)
-        self._populate_timer.timeout.connect(self._populate_next_batch)
 
         self.setObjectName("EarthEngineCatalogDock")
         self.setWidget(self._build_widget())
         self._set_loading_state("Catalog not loaded.")
 
+    def closeEvent(self, event):
+        self._filter_worker.stop()
+        super().closeEvent(event)
+
     def showEvent(self, event):
         super().showEvent(event)
         if not self.items and self._loader is None:
             self.load_catalog()
+        elif self._is_filtering:
+            # The search was dropped when the dock closed
+            self.apply_filters()
 
     def _build_widget(self) -> QWidget:
         widget = QWidget()
@@ -212,10 +391,9 @@ class CatalogDockWidget(QDockWidget):
         layout.addWidget(self.progress_bar)
 
         splitter = QSplitter(Qt.Orientation.Vertical)
-        self.results_table = QTableWidget(0, 6)
-        self.results_table.setHorizontalHeaderLabels(
-            ["Dataset", "Type", "Source", "Provider", "Category", "Date range"]
-        )
+        self.results_model = CatalogResultsModel(self)
+        self.results_table = QTableView()
+        self.results_table.setModel(self.results_model)
         self.results_table.setSelectionBehavior(
             QAbstractItemView.SelectionBehavior.SelectRows
         )
@@ -224,8 +402,12 @@ class CatalogDockWidget(QDockWidget):
         )
         self.results_table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
         self.results_table.verticalHeader().setVisible(False)
-        self.results_table.setSortingEnabled(True)
         header = self.results_table.horizontalHeader()
+        # Results start in the search's order, until a column is clicked
+        header.setSortIndicator(-1, Qt.SortOrder.AscendingOrder)
+        self.results_table.setSortingEnabled(True)
+        # Size columns to the rows in view, not to every result
+        header.setResizeContentsPrecision(0)
         header.setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
         header.setSectionResizeMode(1, QHeaderView.ResizeMode.ResizeToContents)
         header.setSectionResizeMode(2, QHeaderView.ResizeMode.ResizeToContents)
@@ -259,10 +441,10 @@ class CatalogDockWidget(QDockWidget):
         self.category_combo.currentTextChanged.connect(self.apply_filters)
         self.refresh_button.clicked.connect(self._refresh_current_source)
         self.clear_filters_button.clicked.connect(self.clear_filters)
-        self.results_table.itemSelectionChanged.connect(self._update_details)
-        self.results_table.itemDoubleClicked.connect(
-            lambda _: self.load_selected_item()
+        self.results_table.selectionModel().selectionChanged.connect(
+            lambda *_: self._update_details()
         )
+        self.results_table.doubleClicked.connect(lambda _: self.load_selected_item())
         self.load_button.clicked.connect(self.load_selected_item)
         self.copy_button.clicked.connect(self.copy_selected_asset_id)
         self.open_button.clicked.connect(self.open_selected_dataset_page)
@@ -277,38 +459,51 @@ class CatalogDockWidget(QDockWidget):
         self._set_loading_state("Loading catalog...")
         self._set_busy_indicator_visible(True)
         self._set_controls_enabled(False)
-        self._loader = CatalogLoadThread(refresh=refresh)
+        self._loader = CatalogLoadThread(self.store, refresh=refresh, items=self.items)
         self._loader.loaded.connect(self._catalog_loaded)
         self._loader.failed.connect(self._catalog_failed)
         self._loader.loaded.connect(lambda _: self._clear_loader())
         self._loader.failed.connect(lambda _: self._clear_loader())
         self._loader.start()
-
-    def apply_filters(self) -> None:
-        if self._filter_loader is not None:
-            self._pending_filter = True
+        if not self.items:
+            self._show_stored_catalog()
+
+    def _show_stored_catalog(self) -> None:
+        """Search the official catalog stored by an earlier session while the
+        catalog loads, so the dock is usable straight away."""
+        self._stored_count = self.store.count(OFFICIAL_SOURCE)
+        if not self._stored_count:
             return
+        self._set_combo_values(
+            self.provider_combo,
+            "All providers",
+            self.store.facet_values("provider", OFFICIAL_SOURCE),
+        )
+        self._set_combo_values(
+            self.category_combo,
+            "All categories",
+            self.store.facet_values("category", OFFICIAL_SOURCE),
+        )
+        self._set_filters_enabled(True)
+        self.apply_filters()
 
-        source = self._selected_source_filter()
+    def apply_filters(self) -> None:
         self._filter_request_id += 1
-        request_id = self._filter_request_id
         self._is_filtering = True
         self._set_busy_indicator_visible(True)
         self._update_status("Updating catalog results...")
-        self._filter_loader = CatalogFilterThread(
-            request_id,
-            self.items,
+        # Until the catalog is indexed, only the first results are read
+        request = CatalogFilterRequest(
+            self._filter_request_id,
+            self.index if self.items else self.store,
             query=self.search_edit.text(),
             asset_type=self._combo_filter_value(self.type_combo, "All types"),
-            source=source,
+            source=self._selected_source_filter(),
             provider=self._combo_filter_value(self.provider_combo, "All providers"),
             category=self._combo_filter_value(self.category_combo, "All categories"),
+            limit=None if self.items else STORED_RESULTS_LIMIT,
         )
-        self._filter_loader.filtered.connect(self._filters_applied)
-        self._filter_loader.failed.connect(self._filter_failed)
-        self._filter_loader.filtered.connect(lambda *_: self._clear_filter_loader())
-        self._filter_loader.failed.connect(lambda *_: self._clear_filter_loader())
-        self._filter_loader.start()
+        self._filter_worker.request(request)
 
     def _schedule_filter(self) -> None:
         self._filter_timer.start(250)
@@ -324,18 +519,7 @@ class CatalogDockWidget(QDockWidget):
         selected_rows = self.results_table.selectionModel().selectedRows()
         if not selected_rows:
             return None
-        row = selected_rows[0].row()
-        first_item = self.results_table.item(row, 0)
-        if first_item is None:
-            return None
-        item_index = first_item.data(Qt.ItemDataRole.UserRole)
-        if (
-            item_index is None
-            or item_index < 0
-            or item_index >= len(self.filtered_items)
-        ):
-            return None
-        return self.filtered_items[item_index]
+        return self.results_model.item(selected_rows[0].row())
 
     def load_selected_item(self) -> None:
         item = self.selected_item()
@@ -387,16 +571,10 @@ class CatalogDockWidget(QDockWidget):
         if item and item.url:
             webbrowser.open(item.url)
 
-    def _catalog_loaded(self, items: list) -> None:
+    def _catalog_loaded(self, index: CatalogIndex) -> None:
         self._is_loading = False
-        if self._pending_source == COMMUNITY_SOURCE:
-            self.items = [
-                item for item in self.items if item.source != COMMUNITY_SOURCE
-            ] + items
-        else:
-            self.items = [
-                item for item in self.items if item.source != OFFICIAL_SOURCE
-            ] + items
+        self.index = index
+        self.items = index.items
         if self._pending_source:
             self._loaded_sources.add(self._pending_source)
         self._pending_source = ""
@@ -420,47 +598,38 @@ class CatalogDockWidget(QDockWidget):
     def _clear_loader(self) -> None:
         self._loader = None
 
-    def _filters_applied(self, request_id: int, items: list) -> None:
+    def _filters_applied(
+        self,
+        request_id: int,
+        items: Sequence[CatalogItem],
+        item_ids: array,
+        facet_counts: Optional[Dict[str, Dict[str, int]]],
+    ) -> None:
         if request_id != self._filter_request_id:
             return
-        if self._pending_filter:
-            self._is_filtering = False
-            return
-        self._matched_result_count = len(items)
+        if facet_counts is not None:
+            self._update_facet_counts(facet_counts)
+        self._matched_result_count = len(item_ids)
         if self._show_common_datasets():
-            items = self._common_catalog_items(items)
-        self.filtered_items = items
+            items, item_ids = self._common_catalog_results(items, item_ids)
         self._is_filtering = False
-        self._populate_results()
+        # New results are shown in their own order
+        self.results_table.horizontalHeader().setSortIndicator(
+            -1, Qt.SortOrder.AscendingOrder
+        )
+        self.results_model.set_results(items, item_ids)
+        self._set_busy_indicator_visible(self._is_loading)
+        self._update_status()
+        self._update_details()
 
     def _filter_failed(self, request_id: int, error: str) -> None:
         if request_id != self._filter_request_id:
             return
-        if self._pending_filter:
-            self._is_filtering = False
-            return
         self._matched_result_count = 0
         self._is_filtering = False
         self._set_busy_indicator_visible(self._is_loading)
         self._update_status(f"Could not update catalog results: {error}")
 
-    def _clear_filter_loader(self) -> None:
-        self._filter_loader = None
-        if self._pending_filter:
-            self._pending_filter = False
-            self.apply_filters()
-
-    def _populate_results(self) -> None:
-        self._populate_timer.stop()
-        visible_items = self.filtered_items[:MAX_VISIBLE_RESULTS]
-        self.results_table.setSortingEnabled(False)
-        self.results_table.clearSelection()
-        self.results_table.clearContents()
-        self.results_table.setRowCount(len(visible_items))
-        self._populate_row = 0
-        self._set_busy_indicator_visible(bool(visible_items))
-        self._populate_next_batch()
-
     def _show_common_datasets(self) -> bool:
         return (
             not self.search_edit.text().strip()
@@ -470,62 +639,40 @@ class CatalogDockWidget(QDockWidget):
             and self.category_combo.currentText() == "All categories"
         )
 
-    def _common_catalog_items(self, items: List[CatalogItem]) -> List[CatalogItem]:
-        items_by_asset_id = {item.asset_id: item for item in items}
-        common_items = [
-            items_by_asset_id[asset_id]
+    def _common_catalog_results(
+        self, items: Sequence[CatalogItem], item_ids: array
+    ) -> Tuple[Sequence[CatalogItem], array]:
+        if not self.items:
+            # Only the first results were read from the store
+            stored = self.store.get(COMMON_OFFICIAL_ASSET_IDS, OFFICIAL_SOURCE)
+            items = stored + [items[item_id] for item_id in item_ids]
+            item_ids = array("I", range(len(items)))
+        ids_by_asset_id: Dict[str, int] = {}
+        for item_id in item_ids:
+            ids_by_asset_id.setdefault(items[item_id].asset_id, item_id)
+        common_ids = [
+            ids_by_asset_id[asset_id]
             for asset_id in COMMON_OFFICIAL_ASSET_IDS
-            if asset_id in items_by_asset_id
+            if asset_id in ids_by_asset_id
         ]
-        if len(common_items) >= POPULAR_VISIBLE_RESULTS:
-            return common_items[:POPULAR_VISIBLE_RESULTS]
-
-        seen_asset_ids = {item.asset_id for item in common_items}
-        fallback_items = [item for item in items if item.asset_id not in seen_asset_ids]
-        return (common_items + fallback_items)[:POPULAR_VISIBLE_RESULTS]
-
-    def _populate_next_batch(self) -> None:
-        visible_items = self.filtered_items[:MAX_VISIBLE_RESULTS]
-        end_row = min(
-            self._populate_row + RESULT_POPULATE_BATCH_SIZE,
-            len(visible_items),
-        )
-        self.results_table.setUpdatesEnabled(False)
-        for row in range(self._populate_row, end_row):
-            item = visible_items[row]
-            date_range = self._date_range_label(item)
-            values = [
-                item.title,
-                item.asset_type,
-                item.source,
-                item.provider or "Unknown",
-                item.category or "Unknown",
-                date_range,
-            ]
-            for column, value in enumerate(values):
-                table_item = QTableWidgetItem(value)
-                table_item.setData(Qt.ItemDataRole.UserRole, row)
-                self.results_table.setItem(row, column, table_item)
-        self.results_table.setUpdatesEnabled(True)
-        self._populate_row = end_row
-        if self._populate_row < len(visible_items):
-            self._update_status(
-                f"Rendering {self._populate_row} of {len(visible_items)} result(s)..."
+        if len(common_ids) < POPULAR_VISIBLE_RESULTS:
+            seen_asset_ids = {items[item_id].asset_id for item_id in common_ids}
+            fallback_ids = (
+                item_id
+                for item_id in item_ids
+                if items[item_id].asset_id not in seen_asset_ids
             )
-            self._populate_timer.start(0)
-            return
-
-        self.results_table.setSortingEnabled(True)
-        self._set_busy_indicator_visible(self._is_loading or self._is_filtering)
-        self._update_status()
-        self._update_details()
+            common_ids.extend(
+                islice(fallback_ids, POPULAR_VISIBLE_RESULTS - len(common_ids))
+            )
+        return items, array("I", common_ids[:POPULAR_VISIBLE_RESULTS])
 
     def _update_details(self) -> None:
         item = self.selected_item()
         if item is None:
             if self._is_loading:
                 self.details.setPlainText("Loading catalog...")
-            elif self.items and not self.filtered_items:
+            elif self.items and not self.results_model.rowCount():
                 self.details.setPlainText("No datasets match the current filters.")
             else:
                 self.details.setPlainText("Select a dataset to view details.")
@@ -559,24 +706,18 @@ class CatalogDockWidget(QDockWidget):
         self._update_action_buttons()
 
     def _set_loading_state(self, message: str) -> None:
-        self._populate_timer.stop()
-        self.filtered_items = []
         self._matched_result_count = 0
-        self.results_table.setRowCount(0)
+        self.results_model.set_results([], array("I"))
         self.details.setPlainText(message)
         self._update_status(message)
         self._update_action_buttons()
 
     def _refresh_filter_options(self) -> None:
         self._set_combo_values(
-            self.provider_combo,
-            "All providers",
-            sorted({item.provider for item in self.items if item.provider}),
+            self.provider_combo, "All providers", self.index.facet_values("provider")
         )
         self._set_combo_values(
-            self.category_combo,
-            "All categories",
-            sorted({item.category for item in self.items if item.category}),
+            self.category_combo, "All categories", self.index.facet_values("category")
         )
 
     def _set_combo_values(
@@ -585,17 +726,35 @@ class CatalogDockWidget(QDockWidget):
         all_label: str,
         values: List[str],
     ) -> None:
-        current = combo.currentText()
+        current = combo.currentData()
         combo.blockSignals(True)
         combo.clear()
         combo.addItem(all_label)
-        combo.addItems(values)
+        for value in values:
+            combo.addItem(value, value)
         if current in values:
-            combo.setCurrentText(current)
+            combo.setCurrentIndex(combo.findData(current))
         combo.blockSignals(False)
 
+    def _update_facet_counts(self, facet_counts: Dict[str, Dict[str, int]]) -> None:
+        """Show how many results have each provider and category. A list with
+        a value selected keeps the counts it had when it was selected."""
+        for facet, combo in (
+            ("provider", self.provider_combo),
+            ("category", self.category_combo),
+        ):
+            if combo.currentIndex() > 0:
+                continue
+            counts = facet_counts[facet]
+            combo.blockSignals(True)
+            for row in range(1, combo.count()):
+                value = combo.itemData(row)
+                combo.setItemText(row, f"{value} ({counts.get(value, 0)})")
+            combo.blockSignals(False)
+
     def _combo_filter_value(self, combo: QComboBox, all_label: str) -> Optional[str]:
-        value = combo.currentText()
+        # Provider and category entries hold their value; their text has a count
+        value = combo.currentData() or combo.currentText()
         if value == all_label:
             return None
         return value
@@ -626,7 +785,9 @@ class CatalogDockWidget(QDockWidget):
         self._set_controls_enabled(False)
         self._set_busy_indicator_visible(True)
         self._update_status("Loading community catalog...")
-        self._loader = CatalogLoadThread(refresh=refresh, community_only=True)
+        self._loader = CatalogLoadThread(
+            self.store, refresh=refresh, community_only=True, items=self.items
+        )
         self._loader.loaded.connect(self._catalog_loaded)
         self._loader.failed.connect(self._catalog_failed)
         self._loader.loaded.connect(lambda _: self._clear_loader())
@@ -639,23 +800,17 @@ class CatalogDockWidget(QDockWidget):
         else:
             self.load_catalog(refresh=True)
 
-    def _date_range_label(self, item: CatalogItem) -> str:
-        if item.start_date and item.end_date:
-            return f"{item.start_date} to {item.end_date}"
-        if item.start_date:
-            return f"{item.start_date} onward"
-        if item.end_date:
-            return f"Until {item.end_date}"
-        return "Unknown"
-
     def _set_controls_enabled(self, enabled: bool) -> None:
+        self._set_filters_enabled(enabled)
+        self.source_combo.setEnabled(enabled)
+        self.refresh_button.setEnabled(enabled)
+
+    def _set_filters_enabled(self, enabled: bool) -> None:
         self.search_edit.setEnabled(enabled)
         self.type_combo.setEnabled(enabled)
-        self.source_combo.setEnabled(enabled)
         self.provider_combo.setEnabled(enabled)
         self.category_combo.setEnabled(enabled)
         self.clear_filters_button.setEnabled(enabled)
-        self.refresh_button.setEnabled(enabled)
 
     def _set_busy_indicator_visible(self, visible: bool) -> None:
         self.progress_bar.setVisible(visible)
@@ -664,18 +819,18 @@ class CatalogDockWidget(QDockWidget):
         if message:
             self.status_label.setText(message)
             return
-        total = len(self.items)
+        total = len(self.items) or self._stored_count
         matched = self._matched_result_count
-        visible = min(len(self.filtered_items), MAX_VISIBLE_RESULTS)
+        visible = self.results_model.rowCount()
         if total == 0:
             self.status_label.setText("No catalog datasets loaded.")
         elif self._show_common_datasets():
             self.status_label.setText(
                 f"Showing {visible} commonly used dataset(s). Search to browse {total} loaded dataset(s)."
             )
-        elif matched > MAX_VISIBLE_RESULTS:
+        elif not self.items:
             self.status_label.setText(
-                f"Showing first {MAX_VISIBLE_RESULTS} of {matched} match(es)."
+                f"Showing first {visible} match(es) while the catalog loads."
             )
         elif matched == total:
             self.status_label.setText(f"Showing {total} dataset(s).")
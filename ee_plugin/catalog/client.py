@@ -1,11 +1,11 @@
-"""Fetch, cache, and search Earth Engine catalog metadata."""
+"""Fetch and parse Earth Engine catalog metadata."""
 
 import csv
 import json
 import os
-import time
-from dataclasses import asdict, dataclass
-from typing import Iterable, List, Optional
+import sys
+from dataclasses import dataclass
+from typing import List, Tuple
 from urllib.request import Request, urlopen
 
 from qgis.PyQt.QtCore import QStandardPaths
@@ -26,15 +26,32 @@ CATALOG_CACHE_TTL_SECONDS = 7 * 24 * 60 * 60
 CATALOG_FETCH_TIMEOUT_SECONDS = 15
 
 
-@dataclass
+# Fields that repeat across many items, so their values are interned
+REPEATED_FIELDS = (
+    "asset_type",
+    "source",
+    "provider",
+    "category",
+    "license",
+    "license_text",
+)
+
+
+@dataclass(slots=True)
 class CatalogItem:
+    """Metadata of one catalog dataset.
+
+    Items have no instance dictionary, and values shared by many items, such
+    as providers, licenses and keywords, are stored once.
+    """
+
     title: str
     asset_id: str
     asset_type: str
     source: str = OFFICIAL_SOURCE
     provider: str = ""
     category: str = ""
-    keywords: Optional[List[str]] = None
+    keywords: Tuple[str, ...] = ()
     start_date: str = ""
     end_date: str = ""
     url: str = ""
@@ -45,24 +62,9 @@ class CatalogItem:
     thumbnail_url: str = ""
 
     def __post_init__(self):
-        self.keywords = self.keywords or []
-
-    @property
-    def search_text(self) -> str:
-        return " ".join(
-            [
-                self.title,
-                self.asset_id,
-                self.asset_type,
-                self.source,
-                self.provider,
-                self.category,
-                self.license,
-                self.license_text,
-                self.sample_code_url,
-                " ".join(self.keywords),
-            ]
-        ).lower()
+        for field in REPEATED_FIELDS:
+            setattr(self, field, sys.intern(getattr(self, field)))
+        self.keywords = tuple(sys.intern(keyword) for keyword in self.keywords or ())
 
 
 def cache_dir() -> str:
@@ -76,49 +78,6 @@ def cache_dir() -> str:
     return path
 
 
-def source_cache_path(source_name: str) -> str:
-    filename = source_name.lower().replace(" ", "_") + ".json"
-    return os.path.join(cache_dir(), filename)
-
-
-def load_catalog(
-    refresh: bool = False,
-    include_community: bool = False,
-) -> List[CatalogItem]:
-    items = load_official_catalog(refresh=refresh)
-    if include_community:
-        items.extend(load_community_catalog(refresh=refresh))
-    return items
-
-
-def load_official_catalog(refresh: bool = False) -> List[CatalogItem]:
-    items = _load_catalog_source("official", fetch_official_catalog, refresh)
-    if not items:
-        raise RuntimeError("Could not load official catalog data.")
-    return items
-
-
-def load_community_catalog(refresh: bool = False) -> List[CatalogItem]:
-    return _load_catalog_source("community", fetch_community_catalog, refresh)
-
-
-def _load_catalog_source(source_name: str, fetcher, refresh: bool) -> List[CatalogItem]:
-    path = source_cache_path(source_name)
-    if not refresh and _is_fresh_cache(path):
-        return _items_from_cache(path)
-
-    try:
-        items = fetcher()
-    except Exception:
-        if os.path.exists(path):
-            return _items_from_cache(path)
-        return []
-
-    with open(path, "w", encoding="utf-8") as file_obj:
-        json.dump([asdict(item) for item in items], file_obj)
-    return items
-
-
 def fetch_official_catalog() -> List[CatalogItem]:
     request = Request(
         OFFICIAL_CATALOG_TSV_URL,
@@ -197,43 +156,6 @@ def parse_community_catalog_json(text: str) -> List[CatalogItem]:
     return items
 
 
-def search_catalog(
-    items: Iterable[CatalogItem],
-    query: str = "",
-    asset_type: Optional[str] = None,
-    source: Optional[str] = None,
-    provider: Optional[str] = None,
-    category: Optional[str] = None,
-) -> List[CatalogItem]:
-    query = query.strip().lower()
-    asset_type = (asset_type or "").strip()
-    source = (source or "").strip()
-    provider = (provider or "").strip()
-    category = (category or "").strip()
-    filtered = [
-        item
-        for item in items
-        if (not asset_type or item.asset_type == asset_type)
-        and (not source or item.source == source)
-        and (not provider or item.provider == provider)
-        and (not category or item.category == category)
-        and (not query or query in item.search_text)
-    ]
-    return sorted(filtered, key=lambda item: _rank_item(item, query))
-
-
-def _items_from_cache(path: str) -> List[CatalogItem]:
-    with open(path, encoding="utf-8") as file_obj:
-        data = json.load(file_obj)
-    return [CatalogItem(**item) for item in data]
-
-
-def _is_fresh_cache(path: str) -> bool:
-    if not os.path.exists(path):
-        return False
-    return time.time() - os.path.getmtime(path) < CATALOG_CACHE_TTL_SECONDS
-
-
 def _normalize_asset_type(raw_type: str) -> str:
     raw_type = raw_type.strip().lower()
     if raw_type in ("image_collection", "imagecollection"):
@@ -253,19 +175,3 @@ def _clean_value(value) -> str:
     if value is None:
         return ""
     return str(value).strip()
-
-
-def _rank_item(item: CatalogItem, query: str) -> tuple:
-    if not query:
-        return (0, item.title.lower())
-    if item.asset_id.lower() == query or item.title.lower() == query:
-        rank = 0
-    elif item.asset_id.lower().startswith(query) or item.title.lower().startswith(
-        query
-    ):
-        rank = 1
-    elif query in item.asset_id.lower() or query in item.title.lower():
-        rank = 2
-    else:
-        rank = 3
-    return (rank, item.title.lower())
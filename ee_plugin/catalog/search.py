@@ -0,0 +1,394 @@
+"""Search catalog items through a prebuilt inverted index."""
+
+import math
+import re
+import threading
+from array import array
+from bisect import bisect_left
+from collections import Counter, OrderedDict
+from dataclasses import dataclass
+from functools import reduce
+from itertools import compress
+from operator import and_
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .client import CatalogItem
+
+# BM25 parameters
+BM25_K1 = 1.2
+BM25_B = 0.75
+# Term frequency weight of each field in the relevance score. Other fields
+# still match a query, but do not add to its score.
+FIELD_WEIGHTS = {"title": 3.0, "asset_id": 2.0, "keywords": 1.0}
+# Tokens that only start with a query term score less than exact tokens
+PREFIX_WEIGHT = 0.5
+TERM_CACHE_SIZE = 256
+FACETS = ("asset_type", "source", "provider", "category")
+
+TOKEN_PATTERN = re.compile(r"[0-9a-z]+")
+# Turns the binary digits of a bitset into one 0 or 1 byte per bit
+_BIT_FLAGS = bytes.maketrans(b"01", b"\x00\x01")
+
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+def _item_fields(item: CatalogItem) -> List[Tuple[str, str]]:
+    return [
+        ("title", item.title),
+        ("asset_id", item.asset_id),
+        ("keywords", " ".join(item.keywords)),
+        ("asset_type", item.asset_type),
+        ("source", item.source),
+        ("provider", item.provider),
+        ("category", item.category),
+        ("license", item.license),
+        ("license_text", item.license_text),
+        ("sample_code_url", item.sample_code_url),
+    ]
+
+
+def _bm25_scores(
+    frequencies: Dict[int, float],
+    lengths: List[float],
+    average_length: float,
+    count: int,
+) -> List[float]:
+    idf = math.log(1 + (count - len(frequencies) + 0.5) / (len(frequencies) + 0.5))
+    return [
+        idf
+        * frequency
+        * (BM25_K1 + 1)
+        / (
+            frequency
+            + BM25_K1 * (1 - BM25_B + BM25_B * lengths[item_id] / average_length)
+        )
+        for item_id, frequency in frequencies.items()
+    ]
+
+
+@dataclass
+class CatalogMatches:
+    """The matches of one search, which a narrower search can refine."""
+
+    query: str
+    terms: List[str]
+    filters: Dict[str, str]
+    item_ids: array
+
+    def contain(self, terms: List[str], filters: Dict[str, str]) -> bool:
+        """Whether every match of ``terms`` and ``filters`` is one of these.
+
+        That holds when the same facets are filtered to the same values, or
+        more facets are, and each term is extended by one of ``terms``.
+        """
+        return all(
+            filters.get(facet) == value for facet, value in self.filters.items()
+        ) and all(any(term.startswith(old) for term in terms) for old in self.terms)
+
+
+class CatalogIndex:
+    """Token and prefix index over catalog items, with bitset facets.
+
+    Every query term has to match the start of a token in one of the item's
+    fields. Matches are ranked by exact and leading matches of the whole
+    query on the asset ID or title first, then by BM25 relevance over the
+    title, asset ID and keywords, then by title. Results are arrays of item
+    positions in ``items``.
+    """
+
+    def __init__(self, items: Iterable[CatalogItem]):
+        self.items = list(items)
+        count = len(self.items)
+        self._title_order = array(
+            "I", sorted(range(count), key=lambda item_id: self._title(item_id))
+        )
+        self._title_rank = array("I", [0]) * count
+        for rank, item_id in enumerate(self._title_order):
+            self._title_rank[item_id] = rank
+        self._asset_id_order = array(
+            "I", sorted(range(count), key=lambda item_id: self._asset_id(item_id))
+        )
+
+        frequencies: Dict[str, Dict[int, float]] = {}
+        lengths = []
+        for item_id, item in enumerate(self.items):
+            length = 0.0
+            for field, text in _item_fields(item):
+                weight = FIELD_WEIGHTS.get(field, 0.0)
+                for token in tokenize(text):
+                    postings = frequencies.setdefault(token, {})
+                    postings[item_id] = postings.get(item_id, 0.0) + weight
+                    length += weight
+            lengths.append(length)
+        average_length = sum(lengths) / len(lengths) if lengths else 0.0
+        # Sorted, so the tokens that start with a term are one contiguous run
+        self._vocabulary = sorted(frequencies)
+        # Each posting holds the item's BM25 score for the token, so a query
+        # only has to add scores up
+        self._postings = {
+            token: (
+                array("I", postings),
+                array(
+                    "f",
+                    _bm25_scores(postings, lengths, average_length or 1.0, count),
+                ),
+            )
+            for token, postings in frequencies.items()
+        }
+
+        # Each item's facet values as codes into the facet's values, for
+        # counting, and for each value a bitset of the items that have it.
+        # Bit n is the item at title rank n, so filters are intersected with
+        # one integer AND, and the set bits come out in title order.
+        self._facet_values: Dict[str, List[str]] = {}
+        self._facet_codes: Dict[str, array] = {}
+        self._facet_masks: Dict[str, List[int]] = {}
+        for facet in FACETS:
+            codes_by_value: Dict[str, int] = {}
+            codes = array("H" if count < 2**16 else "I", [0]) * count
+            masks: List[bytearray] = []
+            for rank, item_id in enumerate(self._title_order):
+                value = getattr(self.items[item_id], facet)
+                code = codes_by_value.get(value)
+                if code is None:
+                    code = codes_by_value[value] = len(masks)
+                    masks.append(bytearray((count + 7) // 8))
+                codes[item_id] = code
+                masks[code][rank >> 3] |= 1 << (rank & 7)
+            self._facet_values[facet] = list(codes_by_value)
+            self._facet_codes[facet] = codes
+            self._facet_masks[facet] = [
+                int.from_bytes(mask, "little") for mask in masks
+            ]
+
+        self._term_cache: "OrderedDict[str, Dict[int, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def _title(self, item_id: int) -> str:
+        return self.items[item_id].title.lower()
+
+    def _asset_id(self, item_id: int) -> str:
+        return self.items[item_id].asset_id.lower()
+
+    def facet_values(self, facet: str) -> List[str]:
+        return sorted(value for value in self._facet_values[facet] if value)
+
+    def search(
+        self,
+        query: str = "",
+        asset_type: Optional[str] = None,
+        source: Optional[str] = None,
+        provider: Optional[str] = None,
+        category: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> List[CatalogItem]:
+        item_ids = self.search_ids(query, asset_type, source, provider, category)
+        return [self.items[item_id] for item_id in item_ids[:limit]]
+
+    def search_ids(
+        self,
+        query: str = "",
+        asset_type: Optional[str] = None,
+        source: Optional[str] = None,
+        provider: Optional[str] = None,
+        category: Optional[str] = None,
+    ) -> array:
+        """Return the positions of the matching items, best match first."""
+        return self.matches(query, asset_type, source, provider, category).item_ids
+
+    def matches(
+        self,
+        query: str = "",
+        asset_type: Optional[str] = None,
+        source: Optional[str] = None,
+        provider: Optional[str] = None,
+        category: Optional[str] = None,
+        previous: Optional[CatalogMatches] = None,
+    ) -> CatalogMatches:
+        """Search the items, refining the ``previous`` matches of this index
+        when the search can only narrow them."""
+        filters = {
+            facet: (value or "").strip()
+            for facet, value in zip(FACETS, (asset_type, source, provider, category))
+        }
+        filters = {facet: value for facet, value in filters.items() if value}
+        query = query.strip().lower()
+        terms = tokenize(query)
+        codes = self._filter_codes(filters)
+        if codes is None:
+            return CatalogMatches(query, terms, filters, array("I"))
+
+        if not terms:
+            # Intersecting the bitsets is cheaper than refining any matches
+            item_ids = self._members(self._filter_mask(codes))
+            return CatalogMatches(query, terms, filters, item_ids)
+
+        # The previous matches already have the facet values filtered then,
+        # and are a place to start when there are fewer of them than of the
+        # other candidates
+        narrowing = previous is not None and previous.contain(terms, filters)
+        if narrowing and previous.query == query:
+            # Narrowing facets keeps the order of the same query's matches
+            item_ids = self._with_mask(
+                previous.item_ids,
+                self._filter_mask(self._new_codes(codes, previous)),
+            )
+            return CatalogMatches(query, terms, filters, item_ids)
+
+        term_scores = sorted((self._term_scores(term) for term in terms), key=len)
+        if narrowing and len(previous.item_ids) < len(term_scores[0]):
+            scores = dict.fromkeys(previous.item_ids, 0.0)
+            codes = self._new_codes(codes, previous)
+        else:
+            scores = dict(term_scores.pop(0))
+        for other in term_scores:
+            scores = {
+                item_id: score + other[item_id]
+                for item_id, score in scores.items()
+                if item_id in other
+            }
+        mask = self._filter_mask(codes)
+        if mask is not None:
+            flags = self._flags(mask)
+            rank = self._title_rank
+            scores = {
+                item_id: score
+                for item_id, score in scores.items()
+                if flags[rank[item_id]]
+            }
+        # Two stable sorts with C level keys: by title, then by score
+        ranked = sorted(scores, key=self._title_rank.__getitem__)
+        ranked.sort(key=scores.__getitem__, reverse=True)
+        tiers = self._match_tiers(query, scores)
+        if tiers:
+            leading = [item_id for item_id in ranked if item_id in tiers]
+            leading.sort(key=tiers.__getitem__)
+            ranked = leading + [item_id for item_id in ranked if item_id not in tiers]
+        return CatalogMatches(query, terms, filters, array("I", ranked))
+
+    def facet_counts(self, facet: str, item_ids: Iterable[int]) -> Dict[str, int]:
+        """Count the items at ``item_ids`` with each value of ``facet``."""
+        values = self._facet_values[facet]
+        counts = Counter(map(self._facet_codes[facet].__getitem__, item_ids))
+        return {values[code]: count for code, count in counts.items()}
+
+    def _filter_codes(self, filters: Dict[str, str]) -> Optional[Dict[str, int]]:
+        """Return the code of each filtered facet value, ``None`` if a value
+        matches no item."""
+        codes = {}
+        for facet, value in filters.items():
+            try:
+                codes[facet] = self._facet_values[facet].index(value)
+            except ValueError:
+                return None
+        return codes
+
+    def _filter_mask(self, codes: Dict[str, int]) -> Optional[int]:
+        """Return the bitset of the items with every facet value in ``codes``,
+        ``None`` when no facet is filtered."""
+        if not codes:
+            return None
+        return reduce(
+            and_, (self._facet_masks[facet][code] for facet, code in codes.items())
+        )
+
+    def _flags(self, mask: int) -> bytes:
+        """Expand a bitset to one 0 or 1 byte per title rank."""
+        digits = format(mask, "b")[::-1].encode("ascii")
+        return digits.translate(_BIT_FLAGS).ljust(len(self.items), b"\x00")
+
+    def _members(self, mask: Optional[int]) -> array:
+        """Return the items in ``mask``, or every item, in title order."""
+        if mask is None:
+            return self._title_order
+        return array("I", compress(self._title_order, self._flags(mask)))
+
+    def _with_mask(self, item_ids: array, mask: Optional[int]) -> array:
+        """Return the items at ``item_ids`` that are in ``mask``, in order."""
+        if mask is None:
+            return array("I", item_ids)
+        flags = self._flags(mask)
+        rank = self._title_rank
+        return array("I", [item_id for item_id in item_ids if flags[rank[item_id]]])
+
+    def _new_codes(
+        self, codes: Dict[str, int], previous: CatalogMatches
+    ) -> Dict[str, int]:
+        return {
+            facet: code
+            for facet, code in codes.items()
+            if facet not in previous.filters
+        }
+
+    def _term_scores(self, term: str) -> Dict[int, float]:
+        """Score the items with a token starting with ``term``."""
+        with self._lock:
+            scores = self._term_cache.get(term)
+            if scores is not None:
+                self._term_cache.move_to_end(term)
+                return scores
+
+        # Tokens only hold [0-9a-z], which all sort before "{"
+        start = bisect_left(self._vocabulary, term)
+        end = bisect_left(self._vocabulary, term + "{", start)
+        # An item with several matching tokens keeps the score of the rarest,
+        # or of the exact token, which are written last
+        tokens = sorted(
+            (token for token in self._vocabulary[start:end] if token != term),
+            key=lambda token: len(self._postings[token][0]),
+            reverse=True,
+        )
+        scores = {}
+        for token in tokens:
+            item_ids, token_scores = self._postings[token]
+            scores.update(
+                zip(item_ids, [score * PREFIX_WEIGHT for score in token_scores])
+            )
+        if term in self._postings:
+            scores.update(zip(*self._postings[term]))
+
+        with self._lock:
+            self._term_cache[term] = scores
+            while len(self._term_cache) > TERM_CACHE_SIZE:
+                self._term_cache.popitem(last=False)
+        return scores
+
+    def _match_tiers(self, query: str, scores: Dict[int, float]) -> Dict[int, int]:
+        """Return 0 for matches whose asset ID or title is the query, 1 for
+        those that start with it."""
+        tiers: Dict[int, int] = {}
+        for value, order in (
+            (self._asset_id, self._asset_id_order),
+            (self._title, self._title_order),
+        ):
+            start = bisect_left(order, query, key=value)
+            end = bisect_left(order, query + "\U0010ffff", start, key=value)
+            # Check whichever is fewer, the matches or the values starting
+            # with the query
+            if end - start > len(scores):
+                leading = [
+                    item_id for item_id in scores if value(item_id).startswith(query)
+                ]
+            else:
+                leading = [item_id for item_id in order[start:end] if item_id in scores]
+            for item_id in leading:
+                tier = 0 if value(item_id) == query else 1
+                tiers[item_id] = min(tier, tiers.get(item_id, tier))
+        return tiers
+
+
+def search_catalog(
+    items: Iterable[CatalogItem],
+    query: str = "",
+    asset_type: Optional[str] = None,
+    source: Optional[str] = None,
+    provider: Optional[str] = None,
+    category: Optional[str] = None,
+) -> List[CatalogItem]:
+    """Search items once; build a ``CatalogIndex`` to search them repeatedly."""
+    return CatalogIndex(items).search(query, asset_type, source, provider, category)
@@ -0,0 +1,378 @@
+"""Persist catalog items in a SQLite database with a full text index.
+
+Each source's items are rows of one table, with indexed facet columns and an
+FTS5 index kept in step by triggers. Refreshing a source only writes the rows
+that changed. The dock searches the database until the in-memory
+``CatalogIndex`` of the loaded catalog is built, and then searches the index.
+"""
+
+import json
+import os
+import sqlite3
+import time
+from contextlib import closing
+from dataclasses import fields
+from typing import Dict, Iterable, List, Optional
+
+from .client import (
+    CATALOG_CACHE_TTL_SECONDS,
+    COMMUNITY_SOURCE,
+    OFFICIAL_SOURCE,
+    CatalogItem,
+    cache_dir,
+    fetch_community_catalog,
+    fetch_official_catalog,
+)
+from .search import FIELD_WEIGHTS, tokenize
+
+CATALOG_DATABASE_NAME = "catalog.sqlite"
+# Bump to rebuild databases written with an older schema
+SCHEMA_VERSION = 1
+ITEM_COLUMNS = tuple(field.name for field in fields(CatalogItem))
+# The fields searched by ``CatalogIndex``, in the same order
+SEARCH_COLUMNS = (
+    "title",
+    "asset_id",
+    "keywords",
+    "asset_type",
+    "source",
+    "provider",
+    "category",
+    "license",
+    "license_text",
+    "sample_code_url",
+)
+FACET_COLUMNS = ("asset_type", "source", "provider", "category")
+# File names of the JSON caches used before the database
+LEGACY_CACHE_NAMES = {OFFICIAL_SOURCE: "official", COMMUNITY_SOURCE: "community"}
+
+# SQLite cannot bind identifiers, so the statements below interpolate column
+# names, but only the fixed ones above; every value is a bound parameter
+_COLUMN_LIST = ", ".join(ITEM_COLUMNS)
+_SEARCH_COLUMN_LIST = ", ".join(SEARCH_COLUMNS)
+_NEW_SEARCH_VALUES = ", ".join(f"new.{column}" for column in SEARCH_COLUMNS)
+_OLD_SEARCH_VALUES = ", ".join(f"old.{column}" for column in SEARCH_COLUMNS)
+_SELECT_SOURCE_ROWS = (
+    f"SELECT {_COLUMN_LIST} FROM items "  # nosec B608
+    "WHERE source = ?"
+)
+_UPSERT_ITEM = (
+    f"INSERT INTO items ({_COLUMN_LIST}) "  # nosec B608
+    f"VALUES ({', '.join('?' for _ in ITEM_COLUMNS)}) "
+    "ON CONFLICT (source, asset_id) DO UPDATE SET "
+    + ", ".join(f"{column} = excluded.{column}" for column in ITEM_COLUMNS)
+)
+_SELECT_FACET_VALUES = {
+    facet: (
+        f"SELECT DISTINCT {facet} FROM items "  # nosec B608
+        f"WHERE {facet} != '' AND (:source IS NULL OR source = :source) "
+        f"ORDER BY {facet}"
+    )
+    for facet in FACET_COLUMNS
+}
+_FULL_TEXT_SCHEMA = f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS items_fts USING fts5 (
+        {_SEARCH_COLUMN_LIST}, content='items', content_rowid='id'
+    );
+    CREATE TRIGGER IF NOT EXISTS items_fts_insert
+    AFTER INSERT ON items BEGIN
+        INSERT INTO items_fts (rowid, {_SEARCH_COLUMN_LIST})
+        VALUES (new.id, {_NEW_SEARCH_VALUES});
+    END;
+    CREATE TRIGGER IF NOT EXISTS items_fts_delete
+    AFTER DELETE ON items BEGIN
+        INSERT INTO items_fts (items_fts, rowid, {_SEARCH_COLUMN_LIST})
+        VALUES ('delete', old.id, {_OLD_SEARCH_VALUES});
+    END;
+    CREATE TRIGGER IF NOT EXISTS items_fts_update
+    AFTER UPDATE ON items BEGIN
+        INSERT INTO items_fts (items_fts, rowid, {_SEARCH_COLUMN_LIST})
+        VALUES ('delete', old.id, {_OLD_SEARCH_VALUES});
+        INSERT INTO items_fts (rowid, {_SEARCH_COLUMN_LIST})
+        VALUES (new.id, {_NEW_SEARCH_VALUES});
+    END;
+"""  # nosec B608
+_SEARCH_TEXT = " || ' ' || ".join(f"items.{column}" for column in SEARCH_COLUMNS)
+_SEARCH_RANK = "bm25(items_fts, {})".format(
+    ", ".join(str(FIELD_WEIGHTS.get(column, 0.0)) for column in SEARCH_COLUMNS)
+)
+
+
+def database_path() -> str:
+    return os.path.join(cache_dir(), CATALOG_DATABASE_NAME)
+
+
+def _item_row(item: CatalogItem) -> tuple:
+    return tuple(
+        json.dumps(item.keywords) if column == "keywords" else getattr(item, column)
+        for column in ITEM_COLUMNS
+    )
+
+
+def _row_item(row: sqlite3.Row) -> CatalogItem:
+    values = {column: row[column] for column in ITEM_COLUMNS}
+    values["keywords"] = json.loads(values["keywords"])
+    return CatalogItem(**values)
+
+
+def _match_expression(terms: List[str]) -> str:
+    """Match every term at the start of a token, as ``CatalogIndex`` does."""
+    return " ".join(f'"{term}"*' for term in terms)
+
+
+class CatalogStore:
+    """Catalog items of every source in one SQLite database.
+
+    A connection is opened per call, so one store can be shared by threads.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.has_full_text = True
+        self._create_schema()
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.path, timeout=30)
+        connection.row_factory = sqlite3.Row
+        return connection
+
+    def _create_schema(self) -> None:
+        columns = ", ".join(f"{column} TEXT NOT NULL" for column in ITEM_COLUMNS)
+        with closing(self._connect()) as connection:
+            if (
+                connection.execute("PRAGMA user_version").fetchone()[0]
+                != SCHEMA_VERSION
+            ):
+                connection.executescript(
+                    "DROP TABLE IF EXISTS items_fts;"
+                    "DROP TABLE IF EXISTS items;"
+                    "DROP TABLE IF EXISTS sources;"
+                )
+            # Readers are not blocked while a refresh writes
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.executescript(
+                f"""
+                CREATE TABLE IF NOT EXISTS items (
+                    id INTEGER PRIMARY KEY, {columns}, UNIQUE (source, asset_id)
+                );
+                CREATE INDEX IF NOT EXISTS items_asset_type
+                    ON items (source, asset_type);
+                CREATE INDEX IF NOT EXISTS items_provider ON items (source, provider);
+                CREATE INDEX IF NOT EXISTS items_category ON items (source, category);
+                CREATE INDEX IF NOT EXISTS items_title ON items (source, lower(title));
+                CREATE INDEX IF NOT EXISTS items_asset_id ON items (asset_id);
+                CREATE TABLE IF NOT EXISTS sources (
+                    source TEXT PRIMARY KEY, updated REAL NOT NULL
+                );
+                PRAGMA user_version = {SCHEMA_VERSION};
+                """
+            )
+            try:
+                connection.executescript(_FULL_TEXT_SCHEMA)
+            except sqlite3.OperationalError:
+                # SQLite built without FTS5: search scans the items instead
+                self.has_full_text = False
+
+    def updated(self, source: str) -> Optional[float]:
+        """Return when ``source`` was last stored, ``None`` if it never was."""
+        with closing(self._connect()) as connection:
+            row = connection.execute(
+                "SELECT updated FROM sources WHERE source = ?", (source,)
+            ).fetchone()
+        return row["updated"] if row else None
+
+    def is_fresh(self, source: str) -> bool:
+        updated = self.updated(source)
+        return updated is not None and (
+            time.time() - updated < CATALOG_CACHE_TTL_SECONDS
+        )
+
+    def replace_source(
+        self,
+        source: str,
+        items: Iterable[CatalogItem],
+        updated: Optional[float] = None,
+    ) -> int:
+        """Store ``items`` as the whole of ``source`` and return how many rows
+        were written or deleted; unchanged rows are left alone."""
+        rows = {item.asset_id: _item_row(item) for item in items}
+        with closing(self._connect()) as connection, connection:
+            stored = {
+                row["asset_id"]: tuple(row)
+                for row in connection.execute(_SELECT_SOURCE_ROWS, (source,))
+            }
+            changed = [
+                row for asset_id, row in rows.items() if stored.get(asset_id) != row
+            ]
+            removed = [
+                (source, asset_id) for asset_id in stored if asset_id not in rows
+            ]
+            connection.executemany(_UPSERT_ITEM, changed)
+            connection.executemany(
+                "DELETE FROM items WHERE source = ? AND asset_id = ?", removed
+            )
+            connection.execute(
+                "INSERT OR REPLACE INTO sources (source, updated) VALUES (?, ?)",
+                (source, time.time() if updated is None else updated),
+            )
+        return len(changed) + len(removed)
+
+    def count(self, source: Optional[str] = None) -> int:
+        query, parameters = "SELECT count(*) FROM items", ()
+        if source:
+            query, parameters = query + " WHERE source = ?", (source,)
+        with closing(self._connect()) as connection:
+            return connection.execute(query, parameters).fetchone()[0]
+
+    def items(self, source: Optional[str] = None) -> List[CatalogItem]:
+        """Return the items of ``source``, or of every source, in stored order."""
+        query, parameters = "SELECT * FROM items", ()
+        if source:
+            query, parameters = query + " WHERE source = ?", (source,)
+        with closing(self._connect()) as connection:
+            rows = connection.execute(query + " ORDER BY id", parameters).fetchall()
+        return [_row_item(row) for row in rows]
+
+    def get(
+        self, asset_ids: List[str], source: Optional[str] = None
+    ) -> List[CatalogItem]:
+        """Return the stored items with ``asset_ids``, in the order given."""
+        items = []
+        with closing(self._connect()) as connection:
+            for asset_id in asset_ids:
+                # Each lookup is one probe of the asset id index
+                row = connection.execute(
+                    "SELECT * FROM items WHERE asset_id = :asset_id"
+                    " AND (:source IS NULL OR source = :source) ORDER BY id LIMIT 1",
+                    {"asset_id": asset_id, "source": source or None},
+                ).fetchone()
+                if row is not None:
+                    items.append(_row_item(row))
+        return items
+
+    def facet_values(self, facet: str, source: Optional[str] = None) -> List[str]:
+        if facet not in FACET_COLUMNS:
+            raise ValueError(f"Unknown catalog facet: {facet}")
+        with closing(self._connect()) as connection:
+            rows = connection.execute(
+                _SELECT_FACET_VALUES[facet], {"source": source or None}
+            )
+            return [row[0] for row in rows]
+
+    def search(
+        self,
+        query: str = "",
+        asset_type: Optional[str] = None,
+        source: Optional[str] = None,
+        provider: Optional[str] = None,
+        category: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> List[CatalogItem]:
+        """Search the stored items, ranked like ``CatalogIndex.search``."""
+        conditions = []
+        parameters: Dict[str, object] = {}
+        for facet, value in zip(
+            FACET_COLUMNS, (asset_type, source, provider, category)
+        ):
+            value = (value or "").strip()
+            if value:
+                conditions.append(f"items.{facet} = :{facet}")
+                parameters[facet] = value
+
+        terms = tokenize(query)
+        tables = "items"
+        order = "lower(items.title)"
+        if terms and self.has_full_text:
+            tables = "items JOIN items_fts ON items_fts.rowid = items.id"
+            conditions.append("items_fts MATCH :match")
+            parameters["match"] = _match_expression(terms)
+            order = f"{_SEARCH_RANK}, {order}"
+        elif terms:
+            for index, term in enumerate(terms):
+                conditions.append(f"instr(lower({_SEARCH_TEXT}), :term{index}) > 0")
+                parameters[f"term{index}"] = term
+        if terms:
+            # Exact, then leading matches of the whole query come first
+            parameters["query"] = query.strip().lower()
+            order = (
+                "CASE"
+                " WHEN lower(items.asset_id) = :query OR lower(items.title) = :query"
+                " THEN 0"
+                " WHEN substr(lower(items.asset_id), 1, length(:query)) = :query"
+                " OR substr(lower(items.title), 1, length(:query)) = :query"
+                f" THEN 1 ELSE 2 END, {order}"
+            )
+
+        # Only the fixed fragments above are joined; values are parameters
+        sql = "SELECT items.* FROM " + tables  # nosec B608
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += f" ORDER BY {order}"
+        if limit is not None:
+            sql += " LIMIT :limit"
+            parameters["limit"] = int(limit)
+        with closing(self._connect()) as connection:
+            rows = connection.execute(sql, parameters).fetchall()
+        return [_row_item(row) for row in rows]
+
+
+def load_catalog(
+    store: CatalogStore,
+    refresh: bool = False,
+    include_community: bool = False,
+) -> List[CatalogItem]:
+    items = load_official_catalog(store, refresh=refresh)
+    if include_community:
+        items.extend(load_community_catalog(store, refresh=refresh))
+    return items
+
+
+def load_official_catalog(
+    store: CatalogStore, refresh: bool = False
+) -> List[CatalogItem]:
+    items = _load_catalog_source(
+        store, OFFICIAL_SOURCE, fetch_official_catalog, refresh
+    )
+    if not items:
+        raise RuntimeError("Could not load official catalog data.")
+    return items
+
+
+def load_community_catalog(
+    store: CatalogStore, refresh: bool = False
+) -> List[CatalogItem]:
+    return _load_catalog_source(
+        store, COMMUNITY_SOURCE, fetch_community_catalog, refresh
+    )
+
+
+def _load_catalog_source(
+    store: CatalogStore, source: str, fetcher, refresh: bool
+) -> List[CatalogItem]:
+    _import_legacy_cache(store, source)
+    if not refresh and store.is_fresh(source):
+        return store.items(source)
+
+    try:
+        items = fetcher()
+    except Exception:
+        return store.items(source)
+
+    store.replace_source(source, items)
+    return items
+
+
+def _import_legacy_cache(store: CatalogStore, source: str) -> None:
+    """Move a JSON cache from before the database into it, keeping its age."""
+    path = os.path.join(cache_dir(), LEGACY_CACHE_NAMES[source] + ".json")
+    if not os.path.exists(path):
+        return
+    if store.updated(source) is None:
+        try:
+            with open(path, encoding="utf-8") as file_obj:
+                items = [CatalogItem(**item) for item in json.load(file_obj)]
+        except (OSError, ValueError, TypeError):
+            items = None
+        if items is not None:
+            store.replace_source(source, items, updated=os.path.getmtime(path))
+    os.remove(path)
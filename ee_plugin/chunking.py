@@ -0,0 +1,239 @@
+"""Run large Earth Engine jobs as concurrent, retried and resumable chunks.
+
+Work is split into chunks that each fit in one request. Chunks run
+concurrently, failed requests are retried with backoff, and every finished
+chunk is appended to a checkpoint file. Running the same job again skips the
+chunks already in the checkpoint, so an interrupted job resumes where it
+stopped.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+import ee
+from qgis.core import QgsFeedback
+
+logger = logging.getLogger(__name__)
+
+CHUNK_MAX_WORKERS = 4
+CHUNK_RETRIES = 3
+RETRY_DELAY = 2.0
+CHECKPOINT_DIR = os.path.join(tempfile.gettempdir(), "ee_plugin_checkpoints")
+# Fragments of the errors Earth Engine returns when a quota is exhausted
+QUOTA_ERRORS = ("too many concurrent", "quota", "rate limit", "429")
+
+
+class ChunkErrors(RuntimeError):
+    """Raised once every chunk has run, when some of them still failed."""
+
+    def __init__(self, errors: Dict[int, str]):
+        self.errors = errors
+        first = next(iter(errors.values()))
+        super().__init__(
+            f"{len(errors)} chunk(s) failed, the first with: {first}. "
+            "Run the algorithm again to retry only the failed chunks."
+        )
+
+
+def chunked(items: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def partition(
+    items: Iterable[Tuple[Any, Sequence[float]]],
+    budgets: Sequence[float],
+    max_items: int,
+) -> Iterator[List[Any]]:
+    """Group ``(item, costs)`` pairs into chunks that stay within every budget.
+
+    An item over budget on its own still gets a chunk to itself.
+    """
+    chunk: List[Any] = []
+    totals = [0.0] * len(budgets)
+    for item, costs in items:
+        over = any(
+            total + cost > budget for total, cost, budget in zip(totals, costs, budgets)
+        )
+        if chunk and (over or len(chunk) == max_items):
+            yield chunk
+            chunk, totals = [], [0.0] * len(budgets)
+        chunk.append(item)
+        totals = [total + cost for total, cost in zip(totals, costs)]
+    if chunk:
+        yield chunk
+
+
+def job_key(*parts: Any) -> str:
+    """Hash the inputs that make two runs of a job interchangeable."""
+    text = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.sha1(text.encode("utf-8"), usedforsecurity=False).hexdigest()
+
+
+class Checkpoint:
+    """Results of finished chunks, appended to a JSON lines file as they arrive."""
+
+    def __init__(self, key: str, directory: str = CHECKPOINT_DIR):
+        self.path = os.path.join(directory, f"{key}.jsonl")
+        self.results: Dict[int, Any] = {}
+        self._lock = threading.Lock()
+        if os.path.exists(self.path):
+            self._load()
+
+    def _load(self) -> None:
+        with open(self.path, encoding="utf-8") as file:
+            for line in file:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # The last line is cut short when a run is killed mid-write
+                    logger.debug(f"Skipping truncated checkpoint line in {self.path}")
+                    continue
+                self.results[entry["chunk"]] = entry["result"]
+
+    def record(self, index: int, result: Any) -> None:
+        line = json.dumps({"chunk": index, "result": result})
+        with self._lock:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as file:
+                file.write(line + "\n")
+            self.results[index] = result
+
+    def remove(self) -> None:
+        with self._lock:
+            if os.path.exists(self.path):
+                os.remove(self.path)
+            self.results.clear()
+
+
+class Throttle:
+    """Space requests out, halving the rate each time a quota error comes back."""
+
+    def __init__(self, rate: float, min_rate: float = 0.1):
+        self.interval = 1 / rate
+        self.max_interval = 1 / min_rate
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next)
+            self._next = start + self.interval
+        time.sleep(start - now)
+
+    def slow_down(self) -> None:
+        with self._lock:
+            self.interval = min(self.interval * 2, self.max_interval)
+            logger.info(f"Quota reached, slowing to {1 / self.interval:.2f} requests/s")
+
+
+def is_quota_error(error: Exception) -> bool:
+    message = str(error).lower()
+    return any(fragment in message for fragment in QUOTA_ERRORS)
+
+
+def with_retries(
+    function: Callable[[], Any],
+    retries: int = CHUNK_RETRIES,
+    delay: float = RETRY_DELAY,
+    throttle: Optional[Throttle] = None,
+) -> Any:
+    """Call ``function``, retrying Earth Engine and network errors with backoff."""
+    for attempt in range(retries + 1):
+        if throttle is not None:
+            throttle.wait()
+        try:
+            return function()
+        except (ee.EEException, OSError) as error:
+            if throttle is not None and is_quota_error(error):
+                throttle.slow_down()
+            if attempt == retries:
+                raise
+            wait = delay * 2**attempt
+            logger.debug(f"Request failed, retrying in {wait:.0f} s: {error}")
+            time.sleep(wait)
+
+
+def run_chunks(
+    process: Callable[[Any], Any],
+    chunks: List[Any],
+    feedback: Optional[QgsFeedback] = None,
+    checkpoint: Optional[Checkpoint] = None,
+    max_workers: int = CHUNK_MAX_WORKERS,
+    retries: int = CHUNK_RETRIES,
+    throttle: Optional[Throttle] = None,
+) -> Iterator[Tuple[int, Any]]:
+    """Process chunks concurrently, yielding ``(index, result)`` as each finishes.
+
+    Results must be JSON serializable to be checkpointed. Chunks found in
+    ``checkpoint`` are yielded first without a request. Failed chunks do not
+    stop the others; ``ChunkErrors`` is raised once the rest have finished.
+    """
+    done = dict(checkpoint.results) if checkpoint is not None else {}
+    done = {index: result for index, result in done.items() if index < len(chunks)}
+    if done:
+        logger.info(f"Resuming: {len(done)} of {len(chunks)} chunks already done")
+    for index, result in done.items():
+        yield index, result
+
+    def run(index: int) -> Any:
+        result = with_retries(
+            lambda: process(chunks[index]), retries, throttle=throttle
+        )
+        # Recorded from the worker, so chunks that finish after a cancel or a
+        # failure elsewhere are still kept for the next run
+        if checkpoint is not None:
+            checkpoint.record(index, result)
+        return result
+
+    errors = {}
+    finished = len(done)
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    try:
+        futures = {
+            executor.submit(run, index): index
+            for index in range(len(chunks))
+            if index not in done
+        }
+        for future in as_completed(futures):
+            if feedback is not None and feedback.isCanceled():
+                return
+            index = futures[future]
+            finished += 1
+            if feedback is not None:
+                feedback.setProgress(100 * finished / len(chunks))
+            try:
+                result = future.result()
+            except Exception as error:
+                logger.warning(f"Chunk {index + 1} of {len(chunks)} failed: {error}")
+                errors[index] = str(error)
+                continue
+            yield index, result
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+    if errors:
+        raise ChunkErrors(errors)
@@ -11,13 +11,13 @@ from typing import cast
 
 import requests  # type: ignore
 from qgis import gui, processing
-from qgis.core import QgsProject, QgsApplication
+from qgis.core import Qgis, QgsProject, QgsApplication
 from qgis.PyQt import QtWidgets
 from qgis.PyQt.QtCore import QCoreApplication, QSettings, QTranslator, Qt
 from qgis.PyQt.QtGui import QIcon
 import ee
 
-from . import provider, config, ee_auth, utils, logging
+from . import provider, config, ee_auth, utils, logging, vector, vector_provider
 from .catalog.catalog_dock import CatalogDockWidget
 from .identify import EarthEngineIdentifyTool
 from .ui import menus
@@ -172,6 +172,42 @@ class GoogleEarthEnginePlugin(object):
             triggered=lambda: processing.execAlgorithmDialog("ee:export_geotiff"),
         )
 
+        sample_points_button = QtWidgets.QAction(
+            text=self.tr("Sample Layers at Points"),
+            parent=self.iface.mainWindow(),
+            triggered=lambda: processing.execAlgorithmDialog("ee:sample_points"),
+        )
+
+        zonal_statistics_button = QtWidgets.QAction(
+            text=self.tr("Zonal Statistics"),
+            parent=self.iface.mainWindow(),
+            triggered=lambda: processing.execAlgorithmDialog("ee:zonal_statistics"),
+        )
+
+        extract_time_series_button = QtWidgets.QAction(
+            text=self.tr("Extract Time Series at Points"),
+            parent=self.iface.mainWindow(),
+            triggered=lambda: processing.execAlgorithmDialog("ee:extract_time_series"),
+        )
+
+        toggle_render_mode_button = QtWidgets.QAction(
+            text=self.tr("Toggle Vector/Raster Rendering"),
+            parent=self.iface.mainWindow(),
+            triggered=self._run_cmd_toggle_render_mode,
+        )
+
+        toggle_incremental_refresh_button = QtWidgets.QAction(
+            text=self.tr("Toggle Incremental Refresh"),
+            parent=self.iface.mainWindow(),
+            triggered=self._run_cmd_toggle_incremental_refresh,
+        )
+
+        toggle_zoom_simplification_button = QtWidgets.QAction(
+            text=self.tr("Toggle Zoom Simplification"),
+            parent=self.iface.mainWindow(),
+            triggered=self._run_cmd_toggle_zoom_simplification,
+        )
+
         self.identify_action = QtWidgets.QAction(
             icon=QgsApplication.getThemeIcon("/mActionIdentify.svg"),
             text=self.tr("Identify Earth Engine Pixel or Region"),
@@ -182,6 +218,24 @@ class GoogleEarthEnginePlugin(object):
         self.identify_tool = EarthEngineIdentifyTool(self.iface)
         self.identify_tool.setAction(self.identify_action)
 
+        identify_time_series_action = QtWidgets.QAction(
+            text=self.tr("Identify Time Series"),
+            parent=self.iface.mainWindow(),
+        )
+        identify_time_series_action.setCheckable(True)
+        identify_time_series_action.setChecked(self.identify_tool.time_series_enabled)
+        identify_time_series_action.toggled.connect(
+            self.identify_tool.set_time_series_enabled
+        )
+
+        identify_hover_action = QtWidgets.QAction(
+            text=self.tr("Identify on Hover"),
+            parent=self.iface.mainWindow(),
+        )
+        identify_hover_action.setCheckable(True)
+        identify_hover_action.setChecked(self.identify_tool.hover_enabled)
+        identify_hover_action.toggled.connect(self.identify_tool.set_hover_enabled)
+
         # Initialize plugin menu
         plugin_menu = cast(QtWidgets.QMenu, self.iface.pluginMenu())
         self.menu = plugin_menu.addMenu(
@@ -224,7 +278,20 @@ class GoogleEarthEnginePlugin(object):
                             menus.Action(action=add_image_collection_button),
                         ],
                     ),
+                    menus.Action(action=toggle_render_mode_button),
+                    menus.Action(action=toggle_incremental_refresh_button),
+                    menus.Action(action=toggle_zoom_simplification_button),
                     menus.Action(action=self.identify_action),
+                    menus.Action(action=identify_hover_action),
+                    menus.Action(action=identify_time_series_action),
+                    menus.SubMenu(
+                        label=self.tr("Analysis"),
+                        subitems=[
+                            menus.Action(action=sample_points_button),
+                            menus.Action(action=zonal_statistics_button),
+                            menus.Action(action=extract_time_series_button),
+                        ],
+                    ),
                     menus.SubMenu(
                         label=self.tr("Export"),
                         subitems=[menus.Action(action=export_geotiff_button)],
@@ -307,6 +374,65 @@ class GoogleEarthEnginePlugin(object):
     def _run_cmd_set_cloud_project(self):
         ee_auth.ee_initialize_with_project(self.ee_config, force=True)
 
+    def _run_cmd_toggle_render_mode(self):
+        layer = self.iface.activeLayer()
+        if utils.is_ee_raster_layer(layer):
+            mode = vector.RENDER_VECTOR
+        else:
+            mode = vector.RENDER_RASTER
+        try:
+            utils.switch_feature_collection_render_mode(layer, mode)
+        except ValueError as e:
+            self.iface.messageBar().pushMessage(
+                "Earth Engine plugin:", str(e), level=Qgis.MessageLevel.Warning
+            )
+
+    def _run_cmd_toggle_incremental_refresh(self):
+        layer = self.iface.activeLayer()
+        if not utils.is_ee_vector_layer(layer):
+            self.iface.messageBar().pushMessage(
+                "Earth Engine plugin:",
+                "Select an Earth Engine vector layer first.",
+                level=Qgis.MessageLevel.Warning,
+            )
+            return
+        enabled = not vector.is_incremental_refresh(layer)
+        vector.set_incremental_refresh(layer, enabled)
+        if enabled:
+            message = (
+                f"Incremental refresh is on for {layer.name()}. It applies "
+                "after the next refresh, which downloads the layer in full."
+            )
+        else:
+            message = f"Incremental refresh is off for {layer.name()}."
+        self.iface.messageBar().pushMessage(
+            "Earth Engine plugin:", message, level=Qgis.MessageLevel.Info
+        )
+
+    def _run_cmd_toggle_zoom_simplification(self):
+        layer = self.iface.activeLayer()
+        if not utils.is_ee_vector_layer(layer):
+            self.iface.messageBar().pushMessage(
+                "Earth Engine plugin:",
+                "Select an Earth Engine vector layer first.",
+                level=Qgis.MessageLevel.Warning,
+            )
+            return
+        enabled = not vector_provider.is_simplified(layer)
+        try:
+            layer = utils.switch_zoom_simplification(layer, enabled)
+        except ValueError as e:
+            self.iface.messageBar().pushMessage(
+                "Earth Engine plugin:", str(e), level=Qgis.MessageLevel.Warning
+            )
+            return
+        state = "on" if enabled else "off"
+        self.iface.messageBar().pushMessage(
+            "Earth Engine plugin:",
+            f"Zoom simplification is {state} for {layer.name()}.",
+            level=Qgis.MessageLevel.Info,
+        )
+
     def check_version(self):
         global version_checked
 
@@ -0,0 +1,168 @@
+"""Convert Earth Engine GeoJSON features to QGIS geometries and features.
+
+Geometries are built straight from their coordinate arrays instead of going
+through WKT or JSON text, and field types are inferred in one pass over the
+features. Features written to files go through OGR's GeoJSON reader instead,
+see ``vector.write_features``.
+"""
+
+import json
+from typing import Any, Dict, Iterable, List, Optional
+
+from qgis.core import (
+    QgsFeature,
+    QgsFields,
+    QgsGeometry,
+    QgsGeometryCollection,
+    QgsLineString,
+    QgsMultiLineString,
+    QgsMultiPoint,
+    QgsMultiPolygon,
+    QgsPoint,
+    QgsPolygon,
+)
+from qgis.PyQt.QtCore import QVariant
+
+GEOMETRY_TYPES = (
+    "Point",
+    "MultiPoint",
+    "LineString",
+    "MultiLineString",
+    "Polygon",
+    "MultiPolygon",
+)
+
+
+def _point(coordinate: List[float]) -> QgsPoint:
+    return QgsPoint(coordinate[0], coordinate[1])
+
+
+def _line(coordinates: List[List[float]]) -> QgsLineString:
+    return QgsLineString(
+        [coordinate[0] for coordinate in coordinates],
+        [coordinate[1] for coordinate in coordinates],
+    )
+
+
+def _polygon(rings: List[List[List[float]]]) -> QgsPolygon:
+    polygon = QgsPolygon()
+    if rings:
+        polygon.setExteriorRing(_line(rings[0]))
+        for ring in rings[1:]:
+            polygon.addInteriorRing(_line(ring))
+    return polygon
+
+
+# Multi-part geometry types, with the class and part builder of each
+MULTI_PART_TYPES = {
+    "MultiPoint": (QgsMultiPoint, _point),
+    "MultiLineString": (QgsMultiLineString, _line),
+    "MultiPolygon": (QgsMultiPolygon, _polygon),
+}
+
+
+def _abstract_geometry(geometry: Dict[str, Any]):
+    geometry_type = geometry.get("type")
+    coordinates = geometry.get("coordinates")
+    if geometry_type == "Point":
+        return _point(coordinates)
+    if geometry_type == "LineString":
+        return _line(coordinates)
+    if geometry_type == "Polygon":
+        return _polygon(coordinates)
+    if geometry_type in MULTI_PART_TYPES:
+        collection_type, build_part = MULTI_PART_TYPES[geometry_type]
+        collection = collection_type()
+        for part in coordinates:
+            collection.addGeometry(build_part(part))
+        return collection
+    if geometry_type == "GeometryCollection":
+        collection = QgsGeometryCollection()
+        for part in geometry.get("geometries", []):
+            collection.addGeometry(_abstract_geometry(part))
+        return collection
+    raise ValueError(f"Unsupported feature geometry type: {geometry_type}")
+
+
+def geometry_from_geojson(geometry: Optional[Dict[str, Any]]) -> QgsGeometry:
+    """Build a QGIS geometry from a GeoJSON geometry, keeping x and y only.
+
+    Missing and empty geometries give a null geometry.
+    """
+    if not geometry or not (geometry.get("coordinates") or geometry.get("geometries")):
+        return QgsGeometry()
+    return QgsGeometry(_abstract_geometry(geometry))
+
+
+def field_type(value: Any):
+    """Return the field type that holds ``value``; empty values are doubles."""
+    if isinstance(value, bool):
+        return QVariant.Bool
+    if isinstance(value, int):
+        return QVariant.LongLong
+    if isinstance(value, float) or value is None:
+        return QVariant.Double
+    return QVariant.String
+
+
+def property_types(features: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """Infer a field type per property in one pass, in order of appearance.
+
+    Integer properties with floating point values become doubles; any other
+    mix of types becomes a string. Properties that are always empty are
+    doubles.
+    """
+    types: Dict[str, Any] = {}
+    for feature in features:
+        for name, value in (feature.get("properties") or {}).items():
+            current = types.get(name)
+            if value is None:
+                if current is None:
+                    types[name] = None
+                continue
+            value_type = field_type(value)
+            if current is None or current == value_type:
+                types[name] = value_type
+            elif {current, value_type} == {QVariant.LongLong, QVariant.Double}:
+                types[name] = QVariant.Double
+            else:
+                types[name] = QVariant.String
+    return {
+        name: QVariant.Double if value_type is None else value_type
+        for name, value_type in types.items()
+    }
+
+
+def attribute_value(value: Any) -> Any:
+    """Return ``value`` as a QGIS attribute, with lists and objects as JSON."""
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    return json.dumps(value)
+
+
+def to_qgs_features(
+    features: Iterable[Dict[str, Any]],
+    fields: QgsFields,
+    field_names: Optional[Dict[str, str]] = None,
+) -> List[QgsFeature]:
+    """Convert GeoJSON features to QGIS features with ``fields``.
+
+    Properties fill the field named in ``field_names``, or the field of the
+    same name. Properties without a field are dropped.
+    """
+    field_names = field_names or {}
+    indexes: Dict[str, int] = {}
+    qgs_features = []
+    for info in features:
+        attributes = [None] * fields.count()
+        for name, value in (info.get("properties") or {}).items():
+            index = indexes.get(name)
+            if index is None:
+                index = indexes[name] = fields.indexOf(field_names.get(name, name))
+            if index >= 0:
+                attributes[index] = attribute_value(value)
+        feature = QgsFeature(fields)
+        feature.setAttributes(attributes)
+        feature.setGeometry(geometry_from_geojson(info.get("geometry")))
+        qgs_features.append(feature)
+    return qgs_features
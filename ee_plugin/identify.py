@@ -1,12 +1,18 @@
 """Map tool for identifying Earth Engine raster pixels and vector features."""
 
+import html
 import logging
+import math
 import re
-from typing import Any, Dict, List, Optional
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, replace
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
 
 import ee
 from qgis.core import (
     Qgis,
+    QgsApplication,
     QgsCoordinateReferenceSystem,
     QgsCoordinateTransform,
     QgsFeature,
@@ -16,13 +22,16 @@ from qgis.core import (
     QgsPointXY,
     QgsProject,
     QgsRectangle,
+    QgsSettings,
+    QgsTask,
     QgsVectorLayer,
 )
 from qgis.gui import QgsMapTool, QgsMapMouseEvent, QgsRubberBand, QgsVertexMarker
-from qgis.PyQt.QtCore import Qt, QVariant
+from qgis.PyQt.QtCore import QDateTime, Qt, QTimer, QVariant, pyqtSignal
 from qgis.PyQt.QtGui import QColor
 from qgis.PyQt.QtWidgets import (
     QApplication,
+    QComboBox,
     QDialog,
     QDialogButtonBox,
     QFormLayout,
@@ -31,37 +40,566 @@ from qgis.PyQt.QtWidgets import (
     QMessageBox,
     QTableWidget,
     QTableWidgetItem,
+    QToolTip,
     QVBoxLayout,
 )
 
-from . import Map, utils
+from . import Map, geojson, utils
+from .pixel_blocks import pixel_cache
+from .time_series import TimeSeries, find_source_collection, time_series_cache
+from .ui.widgets import TimeSeriesPlot
 
 logger = logging.getLogger(__name__)
 
-FEATURE_IDENTIFY_LIMIT = 100
+# Features fetched per page when browsing identified features
+FEATURE_IDENTIFY_PAGE_SIZE = 100
+IDENTIFY_MAX_WORKERS = 8
+
+TIME_SERIES_SETTING = "ee_plugin/identify_time_series"
+HOVER_SETTING = "ee_plugin/identify_hover"
+HOVER_MAX_RATE_SETTING = "ee_plugin/identify_hover_max_rate"
+# Requests per second; cached pixel blocks are shown regardless
+DEFAULT_HOVER_MAX_RATE = 4.0
+MIN_HOVER_MAX_RATE = 0.1
+HOVER_DEBOUNCE_MS = 150
+# Approximate pixels reduced by each coarse pass of a region identify, before
+# the final pass at the canvas scale
+PROGRESSIVE_PIXEL_BUDGETS = (10_000, 1_000_000)
+METERS_PER_DEGREE = 111_320
 
 
 def identify_image(
     image: ee.Image, geometry: ee.Geometry, scale: float, reducer: ee.Reducer
 ) -> Dict[str, Any]:
     """Reduce every image band over an Earth Engine geometry."""
+    return _reduce_region(image, geometry, scale, reducer).getInfo()
+
+
+def _reduce_region(
+    image: ee.Image, geometry: ee.Geometry, scale: float, reducer: ee.Reducer
+) -> ee.Dictionary:
     return image.reduceRegion(
         reducer=reducer,
         geometry=geometry,
         scale=scale,
         bestEffort=True,
         maxPixels=100_000_000,
-    ).getInfo()
+    )
 
 
-def identify_features(
+def identify_query(
+    request: "IdentifyRequest", selection_context: Dict[str, Any], is_region: bool
+) -> ee.ComputedObject:
+    """Build the unevaluated Earth Engine query that identifies one layer."""
+    geometry = selection_context["ee_geometry"]
+    if request.is_features:
+        return identify_feature_page(request.ee_object, geometry, request.offset)
+    reducer = identify_reducer(is_region)
+    if is_region:
+        # Pixel counts show how much of the region each pass actually reduced
+        reducer = reducer.combine(ee.Reducer.count(), sharedInputs=True)
+    return _reduce_region(
+        request.ee_object, geometry, selection_context["scale"], reducer
+    )
+
+
+def split_pixel_counts(
+    info: Dict[str, Any], reducer_name: str
+) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """Split ``<band>_<reducer>`` and ``<band>_count`` outputs into two dicts."""
+    values, counts = {}, {}
+    for key, value in info.items():
+        if key.endswith("_count"):
+            counts[key[: -len("_count")]] = value
+        elif key.endswith(f"_{reducer_name}"):
+            values[key[: -len(reducer_name) - 1]] = value
+    return values, counts
+
+
+def region_area(geometry: Dict[str, float]) -> float:
+    """Approximate the area of a WGS84 bounding box in square metres."""
+    latitude = math.radians((geometry["south"] + geometry["north"]) / 2)
+    width = abs(geometry["east"] - geometry["west"]) * math.cos(latitude)
+    height = abs(geometry["north"] - geometry["south"])
+    return width * height * METERS_PER_DEGREE**2
+
+
+def region_scales(
+    geometry: Dict[str, float],
+    scale: float,
+    budgets: Tuple[int, ...] = PROGRESSIVE_PIXEL_BUDGETS,
+) -> List[float]:
+    """Return the scales of each region identify pass, coarsest first.
+
+    Coarse passes are skipped when they would not be much faster than the
+    pass after them; the last pass is always at ``scale``.
+    """
+    area = region_area(geometry)
+    scales = []
+    for budget in sorted(budgets):
+        coarse = float(f"{math.sqrt(area / budget):.3g}")
+        if coarse >= 2 * scale and (not scales or coarse <= scales[-1] / 2):
+            scales.append(coarse)
+    return scales + [scale]
+
+
+def identify_feature_page(
     feature_collection: ee.FeatureCollection,
     geometry: ee.Geometry,
-    limit: int = FEATURE_IDENTIFY_LIMIT,
+    offset: int = 0,
+    page_size: int = FEATURE_IDENTIFY_PAGE_SIZE,
+) -> ee.Dictionary:
+    """Count the features intersecting a geometry and fetch one page of them.
+
+    Geometries are dropped on the server; ``load_feature_geometries`` fetches
+    them once they are needed.
+    """
+    hits = feature_collection.filterBounds(geometry)
+    page = ee.FeatureCollection(hits.toList(page_size, offset))
+    return ee.Dictionary(
+        {"total": hits.size(), "page": page.select([".*"], None, False)}
+    )
+
+
+def load_feature_geometries(
+    result: Dict[str, Any], features: Optional[List[Dict[str, Any]]] = None
+) -> None:
+    """Fetch the full geometries of identified features in one request.
+
+    Fills in ``geometry`` on each of ``features`` (all result features by
+    default) that was identified without one. The result's collections are
+    already filtered to the selection, so only the features it hit are
+    searched by id.
+    """
+    collections = result.get("collections", {})
+    missing: Dict[str, List[Dict[str, Any]]] = {}
+    for feature_info in result["features"] if features is None else features:
+        layer = feature_info.get("_source_layer", result["layer"])
+        if "geometry" not in feature_info and layer in collections:
+            missing.setdefault(layer, []).append(feature_info)
+    if not missing:
+        return
+
+    queries = {
+        layer: collections[layer]
+        .filter(
+            ee.Filter.inList(
+                "system:index", [feature_info["id"] for feature_info in infos]
+            )
+        )
+        .select([], None, True)
+        for layer, infos in missing.items()
+    }
+    info = ee.Dictionary(queries).getInfo()
+    for layer, infos in missing.items():
+        geometries = {
+            feature["id"]: feature.get("geometry")
+            for feature in info[layer].get("features", [])
+        }
+        for feature_info in infos:
+            feature_info["geometry"] = geometries.get(feature_info["id"])
+
+
+@dataclass
+class IdentifyRequest:
+    """An Earth Engine layer to identify, read from the map layer up front.
+
+    ``offset`` is the first feature to fetch when browsing feature results.
+    """
+
+    layer: str
+    ee_object: Any
+    is_features: bool = False
+    offset: int = 0
+
+
+def identify_requests(layers: List[Any]) -> List[IdentifyRequest]:
+    """Restore the Earth Engine objects behind QGIS layers on the GUI thread."""
+    requests = []
+    for layer in layers:
+        feature_collection = utils.get_ee_feature_collection_from_layer(layer)
+        if feature_collection is not None:
+            requests.append(IdentifyRequest(layer.name(), feature_collection, True))
+            continue
+        image = utils.get_ee_object_from_layer(layer)
+        if image is None:
+            raise ValueError(
+                f"The Earth Engine image could not be restored from {layer.name()}."
+            )
+        requests.append(IdentifyRequest(layer.name(), image))
+
+    if len({request.is_features for request in requests}) > 1:
+        raise ValueError(
+            "Identify feature collection layers separately from raster layers."
+        )
+    return requests
+
+
+def identify_layer(
+    request: IdentifyRequest,
+    selection_context: Dict[str, Any],
+    is_region: bool,
+    info: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """Identify one layer and return its result in the dialog's format.
+
+    ``info`` is the layer's query result when it was already fetched as part
+    of a batch.
+    """
+    if info is None and uses_pixel_blocks(request, is_region):
+        info = _identify_pixel_block(request, selection_context)
+    if info is None:
+        info = identify_query(request, selection_context, is_region).getInfo()
+    result = {
+        "layer": request.layer,
+        "selection_type": "region" if is_region else "point",
+        "geometry": selection_context["geometry"],
+        "feature_geometry": selection_context["feature_geometry"],
+    }
+    if request.is_features:
+        result["result_type"] = "features"
+        result["features"] = info["page"].get("features", [])
+        for feature_info in result["features"]:
+            # Not fetched yet, as opposed to a feature without a geometry
+            feature_info.pop("geometry", None)
+        result["total"] = info["total"]
+        # The hits, so geometries are looked up among them by id later
+        result["collections"] = {
+            request.layer: request.ee_object.filterBounds(
+                selection_context["ee_geometry"]
+            )
+        }
+        return result
+
+    result["reducer"] = identify_reducer_name(is_region)
+    result["scale"] = selection_context["scale"]
+    if is_region:
+        result["values"], result["pixel_counts"] = split_pixel_counts(
+            info, result["reducer"]
+        )
+    else:
+        result["values"] = info
+    return result
+
+
+def uses_pixel_blocks(request: IdentifyRequest, is_region: bool) -> bool:
+    """Point identifies of images are answered from cached pixel blocks."""
+    return not is_region and not request.is_features
+
+
+def _identify_pixel_block(
+    request: IdentifyRequest,
+    selection_context: Dict[str, Any],
+    cached_only: bool = False,
+) -> Optional[Dict[str, Any]]:
+    geometry = selection_context["geometry"]
+    try:
+        return pixel_cache.identify(
+            request.ee_object,
+            geometry["longitude"],
+            geometry["latitude"],
+            selection_context["scale"],
+            cached_only=cached_only,
+        )
+    except Exception as error:
+        logger.debug(f"Pixel block fetch failed, using reduceRegion: {error}")
+        return None
+
+
+def identify_batch(
+    requests: List[IdentifyRequest], selection_context: Dict[str, Any], is_region: bool
 ) -> List[Dict[str, Any]]:
-    """Fetch features from a collection that intersect an Earth Engine geometry."""
-    info = feature_collection.filterBounds(geometry).limit(limit).getInfo()
-    return info.get("features", [])
+    """Identify every layer with a single request, keyed by layer position."""
+    queries = ee.Dictionary(
+        {
+            str(index): identify_query(request, selection_context, is_region)
+            for index, request in enumerate(requests)
+        }
+    )
+    info = queries.getInfo()
+    return [
+        identify_layer(request, selection_context, is_region, info[str(index)])
+        for index, request in enumerate(requests)
+    ]
+
+
+def empty_identify_result(
+    requests: List[IdentifyRequest], selection_context: Dict[str, Any], is_region: bool
+) -> Dict[str, Any]:
+    """Return the result shown while every layer is still being identified."""
+    result = {
+        "layer": requests[0].layer if len(requests) == 1 else "Earth Engine identify",
+        "selection_type": "region" if is_region else "point",
+        "geometry": selection_context["geometry"],
+        "feature_geometry": selection_context["feature_geometry"],
+    }
+    if requests[0].is_features:
+        result["result_type"] = "features"
+        result["features"] = []
+        result["total"] = 0
+        result["collections"] = {}
+        return result
+
+    result["reducer"] = identify_reducer_name(is_region)
+    result["scale"] = selection_context["scale"]
+    if len(requests) == 1:
+        result["values"] = {}
+    else:
+        result["results"] = []
+    return result
+
+
+def combine_identify_results(
+    results: List[Dict[str, Any]], merge: bool = False
+) -> Dict[str, Any]:
+    """Merge per-layer identify results into the single result the dialog shows.
+
+    A lone result is returned as is unless ``merge`` is set.
+    """
+    if len(results) == 1 and not merge:
+        return results[0]
+    first = results[0]
+    if all(result.get("result_type") == "features" for result in results):
+        features = []
+        collections = {}
+        for result in results:
+            for feature_info in result["features"]:
+                # Tagged in place, so geometries loaded through the combined
+                # result stay loaded when more pages arrive
+                feature_info["_source_layer"] = result["layer"]
+                features.append(feature_info)
+            collections.update(result.get("collections", {}))
+        return {
+            "result_type": "features",
+            "layer": "Earth Engine identify",
+            "selection_type": first["selection_type"],
+            "geometry": first["geometry"],
+            "feature_geometry": first["feature_geometry"],
+            "features": features,
+            "total": sum(result.get("total", 0) for result in results),
+            "collections": collections,
+        }
+    if any(result.get("result_type") == "features" for result in results):
+        raise ValueError(
+            "Identify feature collection layers separately from raster layers."
+        )
+    return {
+        "results": results,
+        "selection_type": first["selection_type"],
+        "reducer": first["reducer"],
+        "scale": first["scale"],
+        "geometry": first["geometry"],
+        "feature_geometry": first["feature_geometry"],
+    }
+
+
+class IdentifyTask(QgsTask):
+    """Identify several layers, emitting each result as it arrives.
+
+    All layers are first fetched in one batched request. If that fails, each
+    layer is queried concurrently on its own. Point identifies of images are
+    answered from cached pixel blocks first; only the layers without one are
+    fetched, in one batched request when there are several.
+
+    Image regions are reduced in passes from a coarse scale down to the
+    canvas scale. The first pass reports through ``resultReady``, later ones
+    replace it through ``resultRefined`` until the task is cancelled.
+    """
+
+    resultReady = pyqtSignal(int, object)
+    resultFailed = pyqtSignal(int, str)
+    resultRefined = pyqtSignal(int, object)
+    refining = pyqtSignal(float)
+    refinementFailed = pyqtSignal(str)
+
+    def __init__(
+        self,
+        requests: List[IdentifyRequest],
+        selection_context: Dict[str, Any],
+        is_region: bool,
+        max_workers: int = IDENTIFY_MAX_WORKERS,
+    ):
+        super().__init__("Earth Engine identify", QgsTask.Flag.CanCancel)
+        self.requests = requests
+        self.selection_context = selection_context
+        self.is_region = is_region
+        self.max_workers = max_workers
+        # Index of the running pass and the number of passes, for progress
+        self._passes = (0, 1)
+
+    def run(self) -> bool:
+        if uses_pixel_blocks(self.requests[0], self.is_region):
+            return self._run_point_pass(self.selection_context)
+        if not self.is_region or self.requests[0].is_features:
+            return self._run_pass(self.selection_context)
+
+        scales = region_scales(
+            self.selection_context["geometry"], self.selection_context["scale"]
+        )
+        for level, scale in enumerate(scales):
+            if self.isCanceled():
+                return False
+            if level:
+                self.refining.emit(scale)
+            self._passes = (level, len(scales))
+            context = dict(self.selection_context, scale=scale)
+            if not self._run_pass(context, refine=level > 0):
+                return False
+            self.setProgress(100 * (level + 1) / len(scales))
+        return True
+
+    def _run_point_pass(self, selection_context: Dict[str, Any]) -> bool:
+        """Answer image points from cached blocks, then fetch the misses.
+
+        A single miss fetches its pixel block for the next clicks. Several
+        misses share one batched request rather than a computePixels call each.
+        """
+        missing = []
+        for index, request in enumerate(self.requests):
+            info = _identify_pixel_block(request, selection_context, cached_only=True)
+            if info is None:
+                missing.append(index)
+            else:
+                result = identify_layer(request, selection_context, False, info)
+                self._emit_result(index, result, False)
+        if not missing:
+            return True
+        return self._run_pass(selection_context, indexes=missing)
+
+    def _run_pass(
+        self,
+        selection_context: Dict[str, Any],
+        refine=False,
+        indexes: Optional[List[int]] = None,
+    ) -> bool:
+        """Identify the requests at ``indexes``, or all of them."""
+        if indexes is None:
+            indexes = list(range(len(self.requests)))
+        if len(indexes) > 1:
+            try:
+                results = identify_batch(
+                    [self.requests[index] for index in indexes],
+                    selection_context,
+                    self.is_region,
+                )
+            except Exception as error:
+                # One failing layer fails the whole batch; query them one by
+                # one so the others still show up
+                logger.debug(f"Batched identify failed, retrying per layer: {error}")
+            else:
+                if self.isCanceled():
+                    return False
+                for index, result in zip(indexes, results):
+                    self._emit_result(index, result, refine)
+                return True
+        return self._run_concurrently(selection_context, refine, indexes)
+
+    def _run_concurrently(
+        self,
+        selection_context: Dict[str, Any],
+        refine=False,
+        indexes: Optional[List[int]] = None,
+    ) -> bool:
+        if indexes is None:
+            indexes = list(range(len(self.requests)))
+        executor = ThreadPoolExecutor(max_workers=min(self.max_workers, len(indexes)))
+        try:
+            futures = {
+                executor.submit(
+                    identify_layer,
+                    self.requests[index],
+                    selection_context,
+                    self.is_region,
+                ): index
+                for index in indexes
+            }
+            for done, future in enumerate(as_completed(futures), 1):
+                if self.isCanceled():
+                    return False
+                index = futures[future]
+                try:
+                    self._emit_result(index, future.result(), refine)
+                except Exception as error:
+                    message = f"{self.requests[index].layer}: {error}"
+                    if refine:
+                        # The coarser result stays on show
+                        self.refinementFailed.emit(message)
+                    else:
+                        self.resultFailed.emit(index, message)
+                level, passes = self._passes
+                self.setProgress(100 * (level + done / len(futures)) / passes)
+            return True
+        finally:
+            # Requests already sent cannot be recalled; their results are dropped
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _emit_result(self, index: int, result: Dict[str, Any], refine: bool) -> None:
+        if refine:
+            self.resultRefined.emit(index, result)
+        else:
+            self.resultReady.emit(index, result)
+
+
+class FeatureGeometryTask(QgsTask):
+    """Fetch the missing geometries of every loaded identify feature at once."""
+
+    def __init__(self, result: Dict[str, Any]):
+        super().__init__("Earth Engine feature geometries", QgsTask.Flag.CanCancel)
+        self.result = result
+        self.error: Optional[str] = None
+
+    def run(self) -> bool:
+        try:
+            load_feature_geometries(self.result)
+        except Exception as error:
+            self.error = str(error)
+            return False
+        return True
+
+
+class TimeSeriesTask(QgsTask):
+    """Fetch the point time series of several collections concurrently."""
+
+    seriesReady = pyqtSignal(str, object)
+    seriesFailed = pyqtSignal(str, str)
+
+    def __init__(
+        self,
+        collections: Dict[str, ee.ImageCollection],
+        selection_context: Dict[str, Any],
+    ):
+        super().__init__("Earth Engine time series", QgsTask.Flag.CanCancel)
+        self.collections = collections
+        self.selection_context = selection_context
+
+    def run(self) -> bool:
+        geometry = self.selection_context["geometry"]
+        executor = ThreadPoolExecutor(
+            max_workers=min(IDENTIFY_MAX_WORKERS, len(self.collections))
+        )
+        try:
+            futures = {
+                executor.submit(
+                    time_series_cache.fetch,
+                    collection,
+                    geometry["longitude"],
+                    geometry["latitude"],
+                    self.selection_context["scale"],
+                ): layer
+                for layer, collection in self.collections.items()
+            }
+            for done, future in enumerate(as_completed(futures), 1):
+                if self.isCanceled():
+                    return False
+                layer = futures[future]
+                try:
+                    self.seriesReady.emit(layer, future.result())
+                except Exception as error:
+                    self.seriesFailed.emit(layer, str(error))
+                self.setProgress(100 * done / len(futures))
+            return True
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
 
 
 def point_to_ee_geometry(point: QgsPointXY) -> ee.Geometry:
@@ -110,6 +648,7 @@ def add_identify_results_layer(
 ) -> QgsVectorLayer:
     """Add identify results as a temporary single-feature layer."""
     if result.get("result_type") == "features":
+        load_feature_geometries(result)
         return _add_feature_identify_results_layer(result, project)
     if "results" in result:
         return _add_multi_identify_results_layer(result, project)
@@ -138,22 +677,20 @@ def _add_feature_identify_results_layer(
 ) -> QgsVectorLayer:
     """Add selected EE features as a temporary vector layer."""
     layer = _new_feature_result_layer(result)
-    fields = _feature_result_fields(result)
+    property_types = geojson.property_types(result["features"])
+    field_names = _feature_property_field_names(property_types)
+    fields = _feature_result_fields(property_types, field_names)
     provider = layer.dataProvider()
     provider.addAttributes(fields)
     layer.updateFields()
 
-    features = []
-    for feature_info in result["features"]:
-        feature = QgsFeature(layer.fields())
-        geometry_info = feature_info.get("geometry")
-        if geometry_info:
-            feature.setGeometry(_geojson_to_qgs_geometry(geometry_info))
-        attributes = _feature_result_attributes(result, feature_info)
-        feature.setAttributes(
-            [attributes.get(field.name()) for field in layer.fields()]
+    features = geojson.to_qgs_features(result["features"], layer.fields(), field_names)
+    for feature_info, feature in zip(result["features"], features):
+        feature.setAttribute(
+            "source_layer", feature_info.get("_source_layer", result["layer"])
         )
-        features.append(feature)
+        feature.setAttribute("selection_type", result["selection_type"])
+        feature.setAttribute("ee_feature_id", str(feature_info.get("id", "")))
 
     if features and not provider.addFeatures(features):
         raise ValueError("Could not add identify features to the temporary layer.")
@@ -242,14 +779,7 @@ def _feature_result_geometry_type(result: Dict[str, Any]) -> str:
     for feature_info in result["features"]:
         geometry_info = feature_info.get("geometry") or {}
         geometry_type = geometry_info.get("type")
-        if geometry_type in (
-            "Point",
-            "MultiPoint",
-            "LineString",
-            "MultiLineString",
-            "Polygon",
-            "MultiPolygon",
-        ):
+        if geometry_type in geojson.GEOMETRY_TYPES:
             return geometry_type
     return "Point"
 
@@ -276,13 +806,15 @@ def _result_fields(result: Dict[str, Any]) -> QgsFields:
         fields.append(
             QgsField(
                 band_fields[band],
-                _qvariant_type(value),
+                geojson.field_type(value),
             )
         )
     return fields
 
 
-def _feature_result_fields(result: Dict[str, Any]) -> QgsFields:
+def _feature_result_fields(
+    property_types: Dict[str, Any], field_names: Dict[str, str]
+) -> QgsFields:
     fields = QgsFields()
     for name, field_type in [
         ("source_layer", QVariant.String),
@@ -291,18 +823,8 @@ def _feature_result_fields(result: Dict[str, Any]) -> QgsFields:
     ]:
         fields.append(QgsField(name, field_type))
 
-    field_names = _feature_property_field_names(result)
-    sample_values = {}
-    for feature_info in result["features"]:
-        sample_values.update(feature_info.get("properties", {}))
-
-    for property_name, field_name in field_names.items():
-        fields.append(
-            QgsField(
-                field_name,
-                _qvariant_type(sample_values.get(property_name)),
-            )
-        )
+    for property_name, field_type in property_types.items():
+        fields.append(QgsField(field_names[property_name], field_type))
     return fields
 
 
@@ -328,48 +850,6 @@ def _multi_result_fields(result: Dict[str, Any]) -> QgsFields:
     return fields
 
 
-def _geojson_to_qgs_geometry(geometry_info: Dict[str, Any]) -> QgsGeometry:
-    return QgsGeometry.fromWkt(_geojson_geometry_to_wkt(geometry_info))
-
-
-def _geojson_geometry_to_wkt(geometry_info: Dict[str, Any]) -> str:
-    geometry_type = geometry_info.get("type")
-    coordinates = geometry_info.get("coordinates")
-    if geometry_type == "Point":
-        return f"POINT ({_wkt_coordinate(coordinates)})"
-    if geometry_type == "MultiPoint":
-        return "MULTIPOINT ({})".format(
-            ", ".join(f"({_wkt_coordinate(point)})" for point in coordinates)
-        )
-    if geometry_type == "LineString":
-        return f"LINESTRING ({_wkt_coordinate_sequence(coordinates)})"
-    if geometry_type == "MultiLineString":
-        return "MULTILINESTRING ({})".format(
-            ", ".join(f"({_wkt_coordinate_sequence(line)})" for line in coordinates)
-        )
-    if geometry_type == "Polygon":
-        return f"POLYGON ({_wkt_polygon_coordinates(coordinates)})"
-    if geometry_type == "MultiPolygon":
-        return "MULTIPOLYGON ({})".format(
-            ", ".join(
-                f"({_wkt_polygon_coordinates(polygon)})" for polygon in coordinates
-            )
-        )
-    raise ValueError(f"Unsupported feature geometry type: {geometry_type}")
-
-
-def _wkt_polygon_coordinates(rings: List[Any]) -> str:
-    return ", ".join(f"({_wkt_coordinate_sequence(ring)})" for ring in rings)
-
-
-def _wkt_coordinate_sequence(coordinates: List[Any]) -> str:
-    return ", ".join(_wkt_coordinate(coordinate) for coordinate in coordinates)
-
-
-def _wkt_coordinate(coordinate: List[Any]) -> str:
-    return f"{coordinate[0]} {coordinate[1]}"
-
-
 def _result_geometry(result: Dict[str, Any]) -> QgsGeometry:
     if "feature_geometry" in result:
         return QgsGeometry(result["feature_geometry"])
@@ -404,20 +884,6 @@ def _result_attributes(result: Dict[str, Any]) -> Dict[str, Any]:
     return attributes
 
 
-def _feature_result_attributes(
-    result: Dict[str, Any], feature_info: Dict[str, Any]
-) -> Dict[str, Any]:
-    attributes = {
-        "source_layer": feature_info.get("_source_layer", result["layer"]),
-        "selection_type": result["selection_type"],
-        "ee_feature_id": str(feature_info.get("id", "")),
-    }
-    field_names = _feature_property_field_names(result)
-    for property_name, value in feature_info.get("properties", {}).items():
-        attributes[field_names[property_name]] = _qgis_attribute_value(value)
-    return attributes
-
-
 def _multi_result_attributes(
     result: Dict[str, Any], band: Optional[str], value: Any
 ) -> Dict[str, Any]:
@@ -433,24 +899,21 @@ def _multi_result_attributes(
     return attributes
 
 
-def _feature_property_field_names(result: Dict[str, Any]) -> Dict[str, str]:
+def _feature_property_field_names(property_names: Iterable[str]) -> Dict[str, str]:
     used_names = {"source_layer", "selection_type", "ee_feature_id"}
     field_names = {}
-    for feature_info in result["features"]:
-        for property_name in feature_info.get("properties", {}):
-            if property_name in field_names:
-                continue
-            field_name = re.sub(r"[^0-9A-Za-z_]+", "_", str(property_name)).strip("_")
-            field_name = field_name or "property"
-            if field_name[0].isdigit():
-                field_name = f"property_{field_name}"
-            unique_field_name = field_name
-            suffix = 2
-            while unique_field_name in used_names:
-                unique_field_name = f"{field_name}_{suffix}"
-                suffix += 1
-            used_names.add(unique_field_name)
-            field_names[property_name] = unique_field_name
+    for property_name in property_names:
+        field_name = re.sub(r"[^0-9A-Za-z_]+", "_", str(property_name)).strip("_")
+        field_name = field_name or "property"
+        if field_name[0].isdigit():
+            field_name = f"property_{field_name}"
+        unique_field_name = field_name
+        suffix = 2
+        while unique_field_name in used_names:
+            unique_field_name = f"{field_name}_{suffix}"
+            suffix += 1
+        used_names.add(unique_field_name)
+        field_names[property_name] = unique_field_name
     return field_names
 
 
@@ -480,20 +943,30 @@ def _band_field_names(result: Dict[str, Any]) -> Dict[str, str]:
     return field_names
 
 
-def _qvariant_type(value: Any):
-    if isinstance(value, bool):
-        return QVariant.Bool
-    if isinstance(value, int):
-        return QVariant.LongLong
-    if isinstance(value, float) or value is None:
-        return QVariant.Double
-    return QVariant.String
+def hover_text(layers: List[str], values: Dict[str, Dict[str, Any]]) -> str:
+    """Format hover identify values, with a placeholder for pending layers."""
+    sections = []
+    for layer in layers:
+        lines = [f"<b>{html.escape(layer)}</b>"]
+        if layer not in values:
+            lines.append("<i>Loading...</i>")
+        elif not values[layer]:
+            lines.append("<i>No data</i>")
+        else:
+            lines.extend(
+                html.escape(f"{band}: {_format_identify_value(value)}")
+                for band, value in values[layer].items()
+            )
+        sections.append("<br>".join(lines))
+    return "<br><br>".join(sections)
 
 
-def _qgis_attribute_value(value: Any) -> Any:
-    if value is None or isinstance(value, (bool, int, float, str)):
-        return value
-    return str(value)
+def hover_max_rate() -> float:
+    """Return the hover request rate setting, kept positive."""
+    rate = QgsSettings().value(
+        HOVER_MAX_RATE_SETTING, DEFAULT_HOVER_MAX_RATE, type=float
+    )
+    return max(rate, MIN_HOVER_MAX_RATE)
 
 
 def _format_identify_value(value: Any) -> str:
@@ -505,56 +978,198 @@ def _format_identify_value(value: Any) -> str:
 
 
 class IdentifyResultsDialog(QDialog):
-    """Display and add Earth Engine identify results to the project."""
+    """Display and add Earth Engine identify results to the project.
+
+    With ``pending`` set, ``result`` is a placeholder that fills in as
+    ``add_layer_result`` receives each layer's result. Region results may
+    then be replaced by finer passes through ``update_layer_result``, and
+    feature results extended a page at a time through ``add_feature_page``.
+    """
 
-    def __init__(self, result: Dict[str, Any], parent=None):
+    stopRequested = pyqtSignal()
+    loadMoreRequested = pyqtSignal()
+    featureHighlighted = pyqtSignal(object)
+
+    def __init__(self, result: Dict[str, Any], parent=None, pending: int = 0):
         super().__init__(parent)
         self.result = result
         self.results = result.get("results", [result])
-        if self._is_multi_result():
-            self.setWindowTitle("Earth Engine Identify")
-        else:
-            self.setWindowTitle(f"Earth Engine Identify - {result['layer']}")
+        self.pending = pending
+        self._expected = pending
+        self._layer_results: Dict[int, Dict[str, Any]] = {}
+        self._errors: List[str] = []
+        self._refine_errors: List[str] = []
+        self._refining_scale: Optional[float] = None
+        self._loading = False
+        self._geometry_task: Optional[FeatureGeometryTask] = None
+        # Run once the geometry task finishes
+        self._after_geometries: List[Callable[[], None]] = []
         self.setMinimumSize(480, 360)
 
         layout = QVBoxLayout(self)
 
-        heading = self._heading_text()
-        title = QLabel(f"<h2 style='margin: 0'>{heading}</h2>")
-        subtitle = QLabel(self._subtitle_text())
-        subtitle.setStyleSheet("color: palette(mid); margin-bottom: 8px;")
-        layout.addWidget(title)
-        layout.addWidget(subtitle)
+        self._title = QLabel()
+        self._subtitle = QLabel()
+        self._subtitle.setStyleSheet("color: palette(mid); margin-bottom: 8px;")
+        layout.addWidget(self._title)
+        layout.addWidget(self._subtitle)
 
         details = QFormLayout()
-        details.addRow("Layer", QLabel(self._layer_text()))
+        self._layer_label = QLabel()
+        details.addRow("Layer", self._layer_label)
+        self._scale_label = QLabel()
         if "scale" in result:
-            details.addRow("Scale", QLabel(f"{result['scale']:.3f} m"))
+            details.addRow("Scale", self._scale_label)
         details.addRow("Selection", QLabel(self._geometry_text()))
         layout.addLayout(details)
 
-        table = self._create_values_table()
-        layout.addWidget(table)
+        self._table = QTableWidget()
+        layout.addWidget(self._table)
 
-        if self._is_feature_result() and not self.result["features"]:
-            empty_label = QLabel("No features intersect this selection.")
-            empty_label.setStyleSheet("color: palette(mid); font-style: italic;")
-            layout.addWidget(empty_label)
-        elif not self._is_feature_result() and not any(
-            layer_result["values"] for layer_result in self.results
-        ):
-            empty_label = QLabel("No unmasked data was found in this selection.")
-            empty_label.setStyleSheet("color: palette(mid); font-style: italic;")
-            layout.addWidget(empty_label)
+        self._empty_label = QLabel()
+        self._empty_label.setStyleSheet("color: palette(mid); font-style: italic;")
+        layout.addWidget(self._empty_label)
+
+        self._status_label = QLabel()
+        self._status_label.setWordWrap(True)
+        layout.addWidget(self._status_label)
 
         buttons = QDialogButtonBox(
             QDialogButtonBox.StandardButton.Save | QDialogButtonBox.StandardButton.Close
         )
-        buttons.button(QDialogButtonBox.StandardButton.Save).setText("Add Layer")
+        self._add_button = buttons.button(QDialogButtonBox.StandardButton.Save)
+        self._add_button.setText("Add Layer")
+        self._stop_button = buttons.addButton(
+            "Stop Refining", QDialogButtonBox.ButtonRole.ActionRole
+        )
+        self._more_button = buttons.addButton(
+            "Load More", QDialogButtonBox.ButtonRole.ActionRole
+        )
         buttons.clicked.connect(self._button_clicked)
         buttons.rejected.connect(self.reject)
         layout.addWidget(buttons)
 
+        self._refresh()
+
+    def add_layer_result(self, index: int, layer_result: Dict[str, Any]) -> None:
+        """Show the result of the layer at ``index`` in the identify request."""
+        self.pending = max(0, self.pending - 1)
+        self.update_layer_result(index, layer_result)
+
+    def update_layer_result(self, index: int, layer_result: Dict[str, Any]) -> None:
+        """Replace the result of the layer at ``index`` with a finer one."""
+        self._layer_results[index] = layer_result
+        results = [self._layer_results[key] for key in sorted(self._layer_results)]
+        # Keep the multi-layer layout while other layers are still arriving
+        self.result = combine_identify_results(results, merge=self._expected > 1)
+        self.results = self.result.get("results", [self.result])
+        self._refresh()
+
+    def add_feature_page(self, index: int, layer_result: Dict[str, Any]) -> None:
+        """Append the next page of features of the layer at ``index``."""
+        loaded = self._layer_results.get(index, {}).get("features", [])
+        features = loaded + layer_result["features"]
+        self.update_layer_result(index, dict(layer_result, features=features))
+
+    def feature_offsets(self) -> Dict[int, int]:
+        """Return how many features of each layer have been loaded so far."""
+        return {
+            index: len(layer_result["features"])
+            for index, layer_result in self._layer_results.items()
+        }
+
+    def has_more_features(self) -> bool:
+        return self._is_feature_result() and len(self.result["features"]) < (
+            self.result.get("total", 0)
+        )
+
+    def set_loading(self) -> None:
+        """Show that the next page of features is being fetched."""
+        self._loading = True
+        self._refresh()
+
+    def finish_loading(self) -> None:
+        self._loading = False
+        self._refresh()
+
+    def add_layer_error(self, index: int, message: str) -> None:
+        self._errors.append(message)
+        self.pending = max(0, self.pending - 1)
+        self._refresh()
+
+    def set_refining(self, scale: float) -> None:
+        """Show that a finer pass at ``scale`` metres is being computed."""
+        self._refining_scale = scale
+        self._refresh()
+
+    def add_refinement_error(self, message: str) -> None:
+        self._refine_errors.append(message)
+        self._refresh()
+
+    def finish_refining(self) -> None:
+        self._refining_scale = None
+        self._refresh()
+
+    def _refresh(self) -> None:
+        if self._is_multi_result():
+            self.setWindowTitle("Earth Engine Identify")
+        else:
+            self.setWindowTitle(f"Earth Engine Identify - {self.result['layer']}")
+        self._title.setText(f"<h2 style='margin: 0'>{self._heading_text()}</h2>")
+        self._subtitle.setText(self._subtitle_text())
+        self._layer_label.setText(self._layer_text())
+        if "scale" in self.result:
+            self._scale_label.setText(f"{self.result['scale']:.3f} m")
+
+        table = self._create_values_table()
+        self.layout().replaceWidget(self._table, table)
+        self._table.deleteLater()
+        self._table = table
+
+        if self.pending:
+            empty_text = ""
+        elif self._is_feature_result() and not self.result["features"]:
+            empty_text = "No features intersect this selection."
+        elif not self._is_feature_result() and not any(
+            layer_result["values"] for layer_result in self.results
+        ):
+            empty_text = "No unmasked data was found in this selection."
+        else:
+            empty_text = ""
+        self._empty_label.setText(empty_text)
+        self._empty_label.setVisible(bool(empty_text))
+
+        status = [f"Could not identify {error}" for error in self._errors]
+        status += [f"Could not refine {error}" for error in self._refine_errors]
+        if self.pending:
+            status.insert(0, f"Waiting for {self.pending} more layer(s)...")
+        elif self._loading:
+            status.insert(0, "Loading more features...")
+        elif self._geometry_task is not None:
+            status.insert(0, "Loading feature geometries...")
+        elif self.has_more_features():
+            status.insert(
+                0,
+                f"Showing {len(self.result['features'])} of "
+                f"{self.result['total']} features.",
+            )
+        elif self._refining_scale is not None:
+            status.insert(
+                0,
+                f"Showing a coarse estimate, refining at "
+                f"{self._refining_scale:.3f} m...",
+            )
+        self._status_label.setText("\n".join(status))
+        self._status_label.setVisible(bool(status))
+        self._stop_button.setVisible(
+            self._refining_scale is not None and not self.pending
+        )
+        self._more_button.setVisible(self.has_more_features() and not self.pending)
+        self._more_button.setEnabled(not self._loading)
+        self._add_button.setEnabled(
+            bool(self._layer_results) or (not self.pending and not self._errors)
+        )
+
     def _is_multi_result(self) -> bool:
         return "results" in self.result
 
@@ -606,14 +1221,16 @@ class IdentifyResultsDialog(QDialog):
             table.horizontalHeader().setSectionResizeMode(
                 2, QHeaderView.ResizeMode.Stretch
             )
+            table.itemSelectionChanged.connect(self._highlight_selected_feature)
         elif self._is_multi_result():
             rows = sum(
                 max(1, len(layer_result["values"])) for layer_result in self.results
             )
-            table = QTableWidget(rows, 3)
-            table.setHorizontalHeaderLabels(
-                ["Layer", "Band", self.result["reducer"].title()]
-            )
+            headers = ["Layer", "Band", self.result["reducer"].title()]
+            if self._has_pixel_counts():
+                headers.append("Pixels")
+            table = QTableWidget(rows, len(headers))
+            table.setHorizontalHeaderLabels(headers)
             self._populate_multi_table(table)
             table.horizontalHeader().setSectionResizeMode(
                 0, QHeaderView.ResizeMode.Stretch
@@ -625,8 +1242,11 @@ class IdentifyResultsDialog(QDialog):
                 2, QHeaderView.ResizeMode.ResizeToContents
             )
         else:
-            table = QTableWidget(len(self.result["values"]), 2)
-            table.setHorizontalHeaderLabels(["Band", self.result["reducer"].title()])
+            headers = ["Band", self.result["reducer"].title()]
+            if self._has_pixel_counts():
+                headers.append("Pixels")
+            table = QTableWidget(len(self.result["values"]), len(headers))
+            table.setHorizontalHeaderLabels(headers)
             self._populate_single_table(table)
             table.horizontalHeader().setSectionResizeMode(
                 0, QHeaderView.ResizeMode.Stretch
@@ -642,10 +1262,16 @@ class IdentifyResultsDialog(QDialog):
         table.setSortingEnabled(True)
         return table
 
+    def _has_pixel_counts(self) -> bool:
+        return any("pixel_counts" in layer_result for layer_result in self.results)
+
     def _populate_single_table(self, table: QTableWidget) -> None:
+        counts = self.result.get("pixel_counts", {})
         for row, (band, value) in enumerate(self.result["values"].items()):
             table.setItem(row, 0, QTableWidgetItem(str(band)))
             table.setItem(row, 1, QTableWidgetItem(self._format_value(value)))
+            if counts:
+                table.setItem(row, 2, QTableWidgetItem(str(counts.get(band, ""))))
 
     def _populate_multi_table(self, table: QTableWidget) -> None:
         row = 0
@@ -656,29 +1282,80 @@ class IdentifyResultsDialog(QDialog):
                 table.setItem(row, 2, QTableWidgetItem("No data"))
                 row += 1
                 continue
+            counts = layer_result.get("pixel_counts", {})
             for band, value in layer_result["values"].items():
                 table.setItem(row, 0, QTableWidgetItem(layer_result["layer"]))
                 table.setItem(row, 1, QTableWidgetItem(str(band)))
                 table.setItem(row, 2, QTableWidgetItem(self._format_value(value)))
+                if counts:
+                    table.setItem(row, 3, QTableWidgetItem(str(counts.get(band, ""))))
                 row += 1
 
     def _populate_feature_table(self, table: QTableWidget) -> None:
         row = 0
-        for feature_info in self.result["features"]:
+        for feature_index, feature_info in enumerate(self.result["features"]):
             properties = feature_info.get("properties", {})
             feature_id = str(feature_info.get("id", ""))
             if not properties:
-                table.setItem(row, 0, QTableWidgetItem(feature_id))
+                table.setItem(row, 0, self._feature_item(feature_id, feature_index))
                 table.setItem(row, 1, QTableWidgetItem(""))
                 table.setItem(row, 2, QTableWidgetItem("No properties"))
                 row += 1
                 continue
             for property_name, value in properties.items():
-                table.setItem(row, 0, QTableWidgetItem(feature_id))
+                table.setItem(row, 0, self._feature_item(feature_id, feature_index))
                 table.setItem(row, 1, QTableWidgetItem(str(property_name)))
                 table.setItem(row, 2, QTableWidgetItem(self._format_value(value)))
                 row += 1
 
+    @staticmethod
+    def _feature_item(feature_id: str, feature_index: int) -> QTableWidgetItem:
+        # Rows are sortable, so each one remembers which feature it shows
+        item = QTableWidgetItem(feature_id)
+        item.setData(Qt.ItemDataRole.UserRole, feature_index)
+        return item
+
+    def _highlight_selected_feature(self) -> None:
+        """Highlight the selected feature, fetching its geometry if needed."""
+        items = self._table.selectedItems()
+        if not items:
+            return
+        feature_index = self._table.item(items[0].row(), 0).data(
+            Qt.ItemDataRole.UserRole
+        )
+        feature_info = self.result["features"][feature_index]
+        if "geometry" not in feature_info:
+            # Highlights whichever row is selected once the geometries arrive
+            self._load_geometries(self._highlight_selected_feature)
+            return
+        if feature_info.get("geometry"):
+            self.featureHighlighted.emit(
+                geojson.geometry_from_geojson(feature_info["geometry"])
+            )
+
+    def _load_geometries(self, then: Callable[[], None]) -> None:
+        """Fetch the geometries of every loaded feature, then call ``then``."""
+        if then not in self._after_geometries:
+            self._after_geometries.append(then)
+        if self._geometry_task is not None:
+            return
+        task = FeatureGeometryTask(self.result)
+        task.taskCompleted.connect(self._geometries_loaded)
+        task.taskTerminated.connect(self._geometries_loaded)
+        self._geometry_task = task
+        self._refresh()
+        QgsApplication.taskManager().addTask(task)
+
+    def _geometries_loaded(self) -> None:
+        task, self._geometry_task = self._geometry_task, None
+        callbacks, self._after_geometries = self._after_geometries, []
+        self._refresh()
+        if task.error is not None:
+            QMessageBox.warning(self, "Could not load geometries", task.error)
+            return
+        for callback in callbacks:
+            callback()
+
     def _geometry_text(self) -> str:
         geometry = self.result["geometry"]
         if self.result["selection_type"] == "point":
@@ -693,13 +1370,28 @@ class IdentifyResultsDialog(QDialog):
         return _format_identify_value(value)
 
     def _button_clicked(self, button) -> None:
-        if self.sender().standardButton(button) == QDialogButtonBox.StandardButton.Save:
+        if button is self._stop_button:
+            self.stopRequested.emit()
+        elif button is self._more_button:
+            self.loadMoreRequested.emit()
+        elif (
+            self.sender().standardButton(button) == QDialogButtonBox.StandardButton.Save
+        ):
             self.add_results_layer()
 
     def add_results_layer(self) -> None:
+        if self._is_feature_result() and any(
+            "geometry" not in feature_info for feature_info in self.result["features"]
+        ):
+            self._load_geometries(self.add_results_layer)
+            return
         try:
-            layer = add_identify_results_layer(self.result)
-        except (OSError, TypeError, ValueError) as error:
+            QApplication.setOverrideCursor(Qt.CursorShape.WaitCursor)
+            try:
+                layer = add_identify_results_layer(self.result)
+            finally:
+                QApplication.restoreOverrideCursor()
+        except (ee.EEException, OSError, TypeError, ValueError) as error:
             QMessageBox.critical(self, "Could not add layer", str(error))
             return
 
@@ -710,6 +1402,94 @@ class IdentifyResultsDialog(QDialog):
         )
 
 
+class TimeSeriesDialog(QDialog):
+    """Plot the time series of each identified layer at a point."""
+
+    def __init__(self, geometry: Dict[str, float], layers: List[str], parent=None):
+        super().__init__(parent)
+        self.series: Dict[str, TimeSeries] = {}
+        self.pending = len(layers)
+        self._errors: List[str] = []
+        self.setWindowTitle("Earth Engine Time Series")
+        self.setMinimumSize(560, 480)
+
+        layout = QVBoxLayout(self)
+        layout.addWidget(QLabel("<h2 style='margin: 0'>Time series</h2>"))
+        details = QFormLayout()
+        details.addRow(
+            "Point",
+            QLabel(f"{geometry['longitude']:.6f}, {geometry['latitude']:.6f}"),
+        )
+        self.layer_combo = QComboBox()
+        self.band_combo = QComboBox()
+        details.addRow("Layer", self.layer_combo)
+        details.addRow("Band", self.band_combo)
+        layout.addLayout(details)
+
+        self.plot = TimeSeriesPlot()
+        layout.addWidget(self.plot)
+        self.table = QTableWidget(0, 2)
+        self.table.setHorizontalHeaderLabels(["Date", "Value"])
+        self.table.horizontalHeader().setSectionResizeMode(
+            QHeaderView.ResizeMode.Stretch
+        )
+        self.table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.table.verticalHeader().setVisible(False)
+        layout.addWidget(self.table)
+
+        self._status_label = QLabel()
+        self._status_label.setWordWrap(True)
+        layout.addWidget(self._status_label)
+
+        buttons = QDialogButtonBox(QDialogButtonBox.StandardButton.Close)
+        buttons.rejected.connect(self.reject)
+        layout.addWidget(buttons)
+
+        self.layer_combo.currentTextChanged.connect(self._show_layer)
+        self.band_combo.currentTextChanged.connect(self._show_band)
+        self._update_status()
+
+    def add_series(self, layer: str, series: TimeSeries) -> None:
+        self.series[layer] = series
+        self.pending = max(0, self.pending - 1)
+        self.layer_combo.addItem(layer)
+        self._update_status()
+
+    def add_error(self, layer: str, message: str) -> None:
+        self._errors.append(f"Could not fetch the series of {layer}: {message}")
+        self.pending = max(0, self.pending - 1)
+        self._update_status()
+
+    def _update_status(self) -> None:
+        status = list(self._errors)
+        if self.pending:
+            status.insert(0, f"Waiting for {self.pending} more layer(s)...")
+        self._status_label.setText("\n".join(status))
+        self._status_label.setVisible(bool(status))
+
+    def _show_layer(self, layer: str) -> None:
+        series = self.series.get(layer)
+        self.band_combo.blockSignals(True)
+        self.band_combo.clear()
+        if series is not None:
+            self.band_combo.addItems(series.bands)
+        self.band_combo.blockSignals(False)
+        self._show_band(self.band_combo.currentText())
+
+    def _show_band(self, band: str) -> None:
+        series = self.series.get(self.layer_combo.currentText())
+        values = series.values.get(band, []) if series is not None else []
+        times = series.times if values else []
+        self.plot.set_series(times, values)
+        self.table.setRowCount(len(times))
+        for row, (timestamp, value) in enumerate(zip(times, values)):
+            date = QDateTime.fromMSecsSinceEpoch(timestamp, Qt.TimeSpec.UTC)
+            self.table.setItem(
+                row, 0, QTableWidgetItem(date.toString("yyyy-MM-dd hh:mm"))
+            )
+            self.table.setItem(row, 1, QTableWidgetItem(_format_identify_value(value)))
+
+
 class EarthEngineIdentifyTool(QgsMapTool):
     """Identify pixels, regions, and features from Earth Engine layers."""
 
@@ -720,6 +1500,29 @@ class EarthEngineIdentifyTool(QgsMapTool):
         self.setCursor(Qt.CursorShape.CrossCursor)
         self.start_point = None
         self.start_pos = None
+        self._identify_task: Optional[QgsTask] = None
+        self._results_dialog: Optional[QDialog] = None
+        # Requests, selection context and selection kind of the last feature
+        # identify, to fetch further pages with
+        self._feature_identify: Optional[
+            Tuple[List[IdentifyRequest], Dict[str, Any], bool]
+        ] = None
+        self.time_series_enabled = QgsSettings().value(
+            TIME_SERIES_SETTING, False, type=bool
+        )
+
+        self.hover_enabled = QgsSettings().value(HOVER_SETTING, False, type=bool)
+        self._hover_timer = QTimer(self.canvas, singleShot=True)
+        self._hover_timer.timeout.connect(self._hover_identify)
+        self._hover_point: Optional[QgsPointXY] = None
+        self._hover_position = None
+        self._hover_task: Optional[IdentifyTask] = None
+        self._hover_generation = 0
+        self._hover_layers: List[str] = []
+        self._hover_values: Dict[str, Dict[str, Any]] = {}
+        self._hover_requests_key: Optional[tuple] = None
+        self._hover_requests: List[IdentifyRequest] = []
+        self._last_hover_request = 0.0
 
         self.rubber_band = QgsRubberBand(self.canvas, Qgis.GeometryType.Polygon)
         self.rubber_band.setColor(QColor(255, 193, 7))
@@ -748,6 +1551,10 @@ class EarthEngineIdentifyTool(QgsMapTool):
         if self.start_point is None or not (
             event.buttons() & Qt.MouseButton.LeftButton
         ):
+            if self.hover_enabled and event.buttons() == Qt.MouseButton.NoButton:
+                self._hover_point = event.mapPoint()
+                self._hover_position = event.pos()
+                self._hover_timer.start(HOVER_DEBOUNCE_MS)
             return
         if not self._is_drag(event.pos()):
             return
@@ -774,9 +1581,124 @@ class EarthEngineIdentifyTool(QgsMapTool):
     def deactivate(self) -> None:
         self.start_point = None
         self.start_pos = None
+        self._stop_hover()
         self.clear_highlight()
         super().deactivate()
 
+    def set_time_series_enabled(self, enabled: bool) -> None:
+        """Plot the source collection's time series for point identifies."""
+        self.time_series_enabled = enabled
+        QgsSettings().setValue(TIME_SERIES_SETTING, enabled)
+
+    def set_hover_enabled(self, enabled: bool) -> None:
+        """Show values under the cursor while the tool is active."""
+        self.hover_enabled = enabled
+        QgsSettings().setValue(HOVER_SETTING, enabled)
+        if not enabled:
+            self._stop_hover()
+
+    def _stop_hover(self) -> None:
+        self._hover_timer.stop()
+        self._hover_generation += 1
+        self._cancel_hover_task()
+        self._hover_point = None
+        QToolTip.hideText()
+
+    def _cancel_hover_task(self) -> None:
+        task, self._hover_task = self._hover_task, None
+        if task is None:
+            return
+        try:
+            task.cancel()
+        except RuntimeError:
+            logger.debug("Hover identify task already finished.")
+
+    def _hover_identify(self) -> None:
+        if self._hover_point is None:
+            return
+        requests = self._hover_identify_requests()
+        if not requests:
+            QToolTip.hideText()
+            return
+
+        selection_context = self._selection_context(self._hover_point, False)
+        geometry = selection_context["geometry"]
+        self._hover_generation += 1
+        self._cancel_hover_task()
+        self._hover_layers = [request.layer for request in requests]
+        self._hover_values = {}
+        missing = []
+        for request in requests:
+            try:
+                values = pixel_cache.identify(
+                    request.ee_object,
+                    geometry["longitude"],
+                    geometry["latitude"],
+                    selection_context["scale"],
+                    cached_only=True,
+                )
+            except Exception as error:
+                logger.debug(f"Hover identify failed for {request.layer}: {error}")
+                values = None
+            if values is None:
+                missing.append(request)
+            else:
+                self._hover_values[request.layer] = values
+        self._show_hover_values()
+        if not missing:
+            return
+
+        wait = self._last_hover_request + 1 / hover_max_rate() - time.monotonic()
+        if wait > 0:
+            # Over the rate limit; try again once a request is allowed
+            self._hover_timer.start(int(wait * 1000) + 1)
+            return
+        self._last_hover_request = time.monotonic()
+        generation = self._hover_generation
+        task = IdentifyTask(missing, selection_context, False)
+        task.resultReady.connect(
+            lambda index, result: self._hover_result_ready(generation, result)
+        )
+        task.resultFailed.connect(
+            lambda index, message: logger.debug(f"Hover identify failed: {message}")
+        )
+        self._hover_task = task
+        QgsApplication.taskManager().addTask(task)
+
+    def _hover_result_ready(self, generation: int, result: Dict[str, Any]) -> None:
+        if generation != self._hover_generation:
+            return
+        self._hover_values[result["layer"]] = result["values"]
+        self._show_hover_values()
+
+    def _show_hover_values(self) -> None:
+        QToolTip.showText(
+            self.canvas.mapToGlobal(self._hover_position),
+            hover_text(self._hover_layers, self._hover_values),
+            self.canvas,
+        )
+
+    def _hover_identify_requests(self) -> List[IdentifyRequest]:
+        """Return the selected image layers, restoring their objects only on change."""
+        layers = [
+            layer
+            for layer in self._selected_layer_tree_layers()
+            if utils.is_ee_raster_layer(layer)
+            and not utils.is_ee_feature_collection_layer(layer)
+        ]
+        key = tuple(
+            (layer.id(), layer.customProperty(utils.EE_OBJECT_PROPERTY))
+            for layer in layers
+        )
+        if key != self._hover_requests_key:
+            try:
+                self._hover_requests = identify_requests(layers)
+            except ValueError as error:
+                logger.debug(f"Hover identify skipped: {error}")
+                self._hover_requests = []
+            self._hover_requests_key = key
+        return self._hover_requests
+
     def clear_highlight(self) -> None:
         self.rubber_band.reset(Qgis.GeometryType.Polygon)
         self.point_marker.hide()
@@ -806,16 +1728,7 @@ class EarthEngineIdentifyTool(QgsMapTool):
 
         try:
             selection_context = self._selection_context(selection, is_region)
-            reducer = identify_reducer(is_region)
-            reducer_name = identify_reducer_name(is_region)
-
-            QApplication.setOverrideCursor(Qt.CursorShape.WaitCursor)
-            try:
-                results = self._identify_layer_results(
-                    layers, selection_context, reducer, reducer_name, is_region
-                )
-            finally:
-                QApplication.restoreOverrideCursor()
+            requests = identify_requests(layers)
         except Exception as error:
             self.iface.messageBar().pushMessage(
                 "Earth Engine Identify",
@@ -825,8 +1738,122 @@ class EarthEngineIdentifyTool(QgsMapTool):
             )
             return
 
-        result = results[0] if len(results) == 1 else self._multi_result(results)
-        IdentifyResultsDialog(result, self.iface.mainWindow()).exec()
+        self.cancel_identify()
+        if self.time_series_enabled and not is_region:
+            self._identify_time_series(requests, selection_context)
+            return
+        dialog = IdentifyResultsDialog(
+            empty_identify_result(requests, selection_context, is_region),
+            self.iface.mainWindow(),
+            pending=len(requests),
+        )
+        dialog.setAttribute(Qt.WidgetAttribute.WA_DeleteOnClose)
+        task = IdentifyTask(requests, selection_context, is_region)
+        task.resultReady.connect(dialog.add_layer_result)
+        task.resultFailed.connect(dialog.add_layer_error)
+        task.resultRefined.connect(dialog.update_layer_result)
+        task.refining.connect(dialog.set_refining)
+        task.refinementFailed.connect(dialog.add_refinement_error)
+        task.taskCompleted.connect(dialog.finish_refining)
+        task.taskTerminated.connect(dialog.finish_refining)
+        dialog.stopRequested.connect(task.cancel)
+        if requests[0].is_features:
+            self._feature_identify = (requests, selection_context, is_region)
+            dialog.loadMoreRequested.connect(self._load_more_features)
+            dialog.featureHighlighted.connect(self._highlight_feature)
+        self._identify_task = task
+        self._results_dialog = dialog
+        QgsApplication.taskManager().addTask(task)
+        dialog.show()
+
+    def _load_more_features(self) -> None:
+        """Fetch the next page of features of the dialog's layers."""
+        dialog = self._results_dialog
+        if dialog is None or self._feature_identify is None:
+            return
+        requests, selection_context, is_region = self._feature_identify
+        offsets = dialog.feature_offsets()
+        # Layers already fully loaded come back with an empty page, in the
+        # same batched request as the others
+        requests = [
+            replace(request, offset=offsets.get(index, 0))
+            for index, request in enumerate(requests)
+        ]
+        task = IdentifyTask(requests, selection_context, is_region)
+        task.resultReady.connect(dialog.add_feature_page)
+        task.resultFailed.connect(dialog.add_layer_error)
+        task.taskCompleted.connect(dialog.finish_loading)
+        task.taskTerminated.connect(dialog.finish_loading)
+        self._identify_task = task
+        dialog.set_loading()
+        QgsApplication.taskManager().addTask(task)
+
+    def _highlight_feature(self, geometry: QgsGeometry) -> None:
+        self.point_marker.hide()
+        self.rubber_band.reset(geometry.type())
+        self.rubber_band.setToGeometry(
+            geometry, QgsCoordinateReferenceSystem("EPSG:4326")
+        )
+
+    def _identify_time_series(
+        self, requests: List[IdentifyRequest], selection_context: Dict[str, Any]
+    ) -> None:
+        collections = {}
+        for request in requests:
+            if request.is_features:
+                continue
+            collection = find_source_collection(request.ee_object)
+            if collection is not None:
+                collections[request.layer] = collection
+        if not collections:
+            self.iface.messageBar().pushMessage(
+                "Earth Engine Identify",
+                "None of the selected layers was computed from an image collection.",
+                level=Qgis.MessageLevel.Warning,
+                duration=5,
+            )
+            return
+
+        dialog = TimeSeriesDialog(
+            selection_context["geometry"], list(collections), self.iface.mainWindow()
+        )
+        dialog.setAttribute(Qt.WidgetAttribute.WA_DeleteOnClose)
+        task = TimeSeriesTask(collections, selection_context)
+        task.seriesReady.connect(dialog.add_series)
+        task.seriesFailed.connect(dialog.add_error)
+        self._identify_task = task
+        self._results_dialog = dialog
+        QgsApplication.taskManager().addTask(task)
+        dialog.show()
+
+    def cancel_identify(self) -> None:
+        """Drop the identify still in flight and close its unfinished dialog."""
+        task, self._identify_task = self._identify_task, None
+        dialog, self._results_dialog = self._results_dialog, None
+        if task is not None:
+            try:
+                if isinstance(task, TimeSeriesTask):
+                    task.seriesReady.disconnect()
+                    task.seriesFailed.disconnect()
+                else:
+                    task.resultReady.disconnect()
+                    task.resultFailed.disconnect()
+                    task.resultRefined.disconnect()
+                    task.refining.disconnect()
+                    task.refinementFailed.disconnect()
+                task.cancel()
+            except (RuntimeError, TypeError):
+                logger.debug("Identify task already finished.")
+        if dialog is not None:
+            try:
+                if dialog.pending:
+                    dialog.close()
+                elif isinstance(dialog, IdentifyResultsDialog):
+                    # Keep the coarser result, it just stops refining
+                    dialog.finish_refining()
+                    dialog.finish_loading()
+            except RuntimeError:
+                logger.debug("Identify dialog was already closed.")
 
     def _identify_layers(self) -> List[Any]:
         return [
@@ -897,87 +1924,3 @@ class EarthEngineIdentifyTool(QgsMapTool):
             "geometry": geometry_metadata,
             "scale": scale,
         }
-
-    def _identify_layer_results(
-        self,
-        layers: List[Any],
-        selection_context: Dict[str, Any],
-        reducer: ee.Reducer,
-        reducer_name: str,
-        is_region: bool,
-    ) -> List[Dict[str, Any]]:
-        results = []
-        for layer in layers:
-            feature_collection = utils.get_ee_feature_collection_from_layer(layer)
-            if feature_collection is not None:
-                features = identify_features(
-                    feature_collection,
-                    selection_context["ee_geometry"],
-                )
-                results.append(
-                    {
-                        "result_type": "features",
-                        "layer": layer.name(),
-                        "selection_type": "region" if is_region else "point",
-                        "geometry": selection_context["geometry"],
-                        "feature_geometry": selection_context["feature_geometry"],
-                        "features": features,
-                    }
-                )
-                continue
-
-            image = utils.get_ee_object_from_layer(layer)
-            if image is None:
-                raise ValueError(
-                    f"The Earth Engine image could not be restored from {layer.name()}."
-                )
-
-            values = identify_image(
-                image,
-                selection_context["ee_geometry"],
-                selection_context["scale"],
-                reducer,
-            )
-            results.append(
-                {
-                    "layer": layer.name(),
-                    "selection_type": "region" if is_region else "point",
-                    "reducer": reducer_name,
-                    "scale": selection_context["scale"],
-                    "geometry": selection_context["geometry"],
-                    "feature_geometry": selection_context["feature_geometry"],
-                    "values": values,
-                }
-            )
-        return results
-
-    @staticmethod
-    def _multi_result(results: List[Dict[str, Any]]) -> Dict[str, Any]:
-        first = results[0]
-        if all(result.get("result_type") == "features" for result in results):
-            features = []
-            for result in results:
-                for feature_info in result["features"]:
-                    feature_info = dict(feature_info)
-                    feature_info["_source_layer"] = result["layer"]
-                    features.append(feature_info)
-            return {
-                "result_type": "features",
-                "layer": "Earth Engine identify",
-                "selection_type": first["selection_type"],
-                "geometry": first["geometry"],
-                "feature_geometry": first["feature_geometry"],
-                "features": features,
-            }
-        if any(result.get("result_type") == "features" for result in results):
-            raise ValueError(
-                "Identify feature collection layers separately from raster layers."
-            )
-        return {
-            "results": results,
-            "selection_type": first["selection_type"],
-            "reducer": first["reducer"],
-            "scale": first["scale"],
-            "geometry": first["geometry"],
-            "feature_geometry": first["feature_geometry"],
-        }
@@ -0,0 +1,197 @@
+"""Cache blocks of raw pixel values for fast point identify.
+
+The first identify at a point fetches a ``BLOCK_SIZE`` x ``BLOCK_SIZE`` window
+of pixels around it with ``computePixels``, on a Web Mercator grid at the
+identify scale. Later points inside the same window are answered from the
+cached block without another request.
+"""
+
+import ast
+import hashlib
+import logging
+import math
+import struct
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+import ee
+
+logger = logging.getLogger(__name__)
+
+BLOCK_SIZE = 64
+MAX_BLOCKS = 64
+MASK_PREFIX = "ee_mask_"
+BLOCK_CRS = "EPSG:3857"
+EARTH_RADIUS = 6378137.0
+# Web Mercator is undefined at the poles; identify falls back to reduceRegion
+MAX_LATITUDE = 85.05112878
+
+# numpy type codes of the structured .npy arrays returned by computePixels
+NPY_STRUCT_TYPES = {
+    "b1": "?",
+    "i1": "b",
+    "u1": "B",
+    "i2": "h",
+    "u2": "H",
+    "i4": "i",
+    "u4": "I",
+    "i8": "q",
+    "u8": "Q",
+    "f4": "f",
+    "f8": "d",
+}
+
+BlockKey = Tuple[str, float, int, int]
+
+
+@dataclass
+class PixelBlock:
+    """One window of pixels, kept as the raw .npy record bytes."""
+
+    bands: List[str]
+    record: struct.Struct
+    data: bytes
+    offset: int
+    width: int = BLOCK_SIZE
+
+    def values(self, row: int, column: int) -> Dict[str, Any]:
+        """Return band values at a pixel, with ``None`` for masked bands."""
+        position = self.offset + (row * self.width + column) * self.record.size
+        fields = dict(zip(self.bands, self.record.unpack_from(self.data, position)))
+        return {
+            band: value if fields.get(f"{MASK_PREFIX}{band}", 1) else None
+            for band, value in fields.items()
+            if not band.startswith(MASK_PREFIX)
+        }
+
+
+def parse_npy(data: bytes) -> PixelBlock:
+    """Read a structured .npy array of pixel records without numpy."""
+    if data[:6] != b"\x93NUMPY":
+        raise ValueError("computePixels did not return a .npy array.")
+    if data[6] == 1:
+        (header_size,) = struct.unpack_from("<H", data, 8)
+        offset = 10 + header_size
+    else:
+        (header_size,) = struct.unpack_from("<I", data, 8)
+        offset = 12 + header_size
+    header = ast.literal_eval(data[offset - header_size : offset].decode("latin1"))
+    if header.get("fortran_order"):
+        raise ValueError("Fortran ordered .npy arrays are not supported.")
+
+    bands, formats = [], []
+    for name, descr in header["descr"]:
+        byte_order = "<" if descr[0] in "<|" else ">"
+        if byte_order != "<":
+            raise ValueError(f"Unsupported byte order for band {name}: {descr}")
+        bands.append(name)
+        formats.append(NPY_STRUCT_TYPES[descr[1:]])
+    _, width = header["shape"]
+    return PixelBlock(bands, struct.Struct("<" + "".join(formats)), data, offset, width)
+
+
+def to_web_mercator(longitude: float, latitude: float) -> Tuple[float, float]:
+    x = math.radians(longitude) * EARTH_RADIUS
+    y = math.log(math.tan(math.pi / 4 + math.radians(latitude) / 2)) * EARTH_RADIUS
+    return x, y
+
+
+def block_position(x: float, y: float, scale: float) -> Tuple[int, int, int, int]:
+    """Return the block column and row containing a point, and its pixel in it."""
+    span = BLOCK_SIZE * scale
+    block_x = math.floor(x / span)
+    block_y = math.floor(y / span)
+    column = min(BLOCK_SIZE - 1, int((x - block_x * span) / scale))
+    # Rows count down from the block's top edge
+    row = min(BLOCK_SIZE - 1, int(((block_y + 1) * span - y) / scale))
+    return block_x, block_y, row, column
+
+
+def expression_key(image: ee.Image) -> str:
+    expression = ee.serializer.toJSON(image).encode("utf-8")
+    return hashlib.sha1(expression, usedforsecurity=False).hexdigest()
+
+
+def fetch_block(image: ee.Image, scale: float, block_x: int, block_y: int) -> bytes:
+    """Fetch the raw pixels of one block, with a mask band per image band."""
+    span = BLOCK_SIZE * scale
+    masks = image.mask().regexpRename("^(.*)$", f"{MASK_PREFIX}$1")
+    return ee.data.computePixels(
+        {
+            "expression": image.addBands(masks),
+            "fileFormat": "NPY",
+            "grid": {
+                "dimensions": {"width": BLOCK_SIZE, "height": BLOCK_SIZE},
+                "affineTransform": {
+                    "scaleX": scale,
+                    "shearX": 0,
+                    "translateX": block_x * span,
+                    "shearY": 0,
+                    "scaleY": -scale,
+                    "translateY": (block_y + 1) * span,
+                },
+                "crsCode": BLOCK_CRS,
+            },
+        }
+    )
+
+
+class PixelBlockCache:
+    """LRU cache of pixel blocks keyed by expression hash, scale and position."""
+
+    def __init__(self, max_blocks: int = MAX_BLOCKS):
+        self.max_blocks = max_blocks
+        self._blocks: "OrderedDict[BlockKey, PixelBlock]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: BlockKey) -> Optional[PixelBlock]:
+        with self._lock:
+            block = self._blocks.get(key)
+            if block is not None:
+                self._blocks.move_to_end(key)
+            return block
+
+    def put(self, key: BlockKey, block: PixelBlock) -> None:
+        with self._lock:
+            self._blocks[key] = block
+            self._blocks.move_to_end(key)
+            while len(self._blocks) > self.max_blocks:
+                self._blocks.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._blocks.clear()
+
+    def identify(
+        self,
+        image: ee.Image,
+        longitude: float,
+        latitude: float,
+        scale: float,
+        cached_only: bool = False,
+    ) -> Optional[Dict[str, Any]]:
+        """Return the band values at a WGS84 point, fetching its block if needed.
+
+        Returns ``None`` when the point cannot be answered from a block, or,
+        with ``cached_only``, when its block has not been fetched yet.
+        """
+        if abs(latitude) > MAX_LATITUDE or scale <= 0:
+            return None
+        # Canvas scales drift slightly between redraws at the same zoom
+        scale = float(f"{scale:.6g}")
+        x, y = to_web_mercator(longitude, latitude)
+        block_x, block_y, row, column = block_position(x, y, scale)
+        key = (expression_key(image), scale, block_x, block_y)
+        block = self.get(key)
+        if block is None:
+            if cached_only:
+                return None
+            block = parse_npy(fetch_block(image, scale, block_x, block_y))
+            self.put(key, block)
+            logger.debug(f"Fetched pixel block {key[1:]} for identify")
+        return block.values(row, column)
+
+
+pixel_cache = PixelBlockCache()
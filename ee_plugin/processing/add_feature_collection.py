@@ -1,12 +1,17 @@
 import logging
-from typing import Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional
 
 import ee
 from qgis.core import (
+    QgsCoordinateReferenceSystem,
     QgsProcessingAlgorithm,
+    QgsProcessingParameterBoolean,
     QgsProcessingParameterString,
     QgsProcessingOutputVectorLayer,
     QgsProcessingOutputRasterLayer,
+    QgsProject,
+    QgsRectangle,
 )
 from qgis import gui
 from qgis.PyQt.QtCore import QTimer
@@ -23,15 +28,16 @@ from qgis.PyQt.QtWidgets import (
 )
 from qgis.PyQt.QtGui import QColor
 
-from .. import Map
-from ..ui.widgets import FilterWidget
+from .. import Map, vector
+from ..ui.widgets import FilterWidget, PropertySelectionWidget
+from ..processing.add_image_collection import apply_property_filters
 from ..processing.custom_algorithm_dialog import BaseAlgorithmDialog
 from ..utils import (
     translate as _,
-    get_ee_properties,
-    filter_functions,
     get_ee_extent,
     add_processing_ee_layer,
+    add_or_update_ee_vector_layer,
+    processing_output_should_load,
     set_ee_feature_collection_layer_source,
 )
 
@@ -64,6 +70,28 @@ def _date_from_default(value: str):
     return None
 
 
+def filter_feature_collection(
+    feature_collection_id: str,
+    filters: str,
+    extent: Optional[QgsRectangle],
+    extent_crs: Optional[QgsCoordinateReferenceSystem],
+    project: Optional[QgsProject],
+) -> ee.FeatureCollection:
+    """Apply the property and extent filters, in the order the algorithm does."""
+    fc = ee.FeatureCollection(feature_collection_id)
+    if filters:
+        fc = apply_property_filters(fc, filters)
+
+    # Apply extent filter if provided
+    if extent and extent_crs:
+        try:
+            ee_extent = get_ee_extent(extent, extent_crs, project)
+            fc = fc.filterBounds(ee_extent)
+        except Exception as e:
+            raise ValueError(f"Invalid extent format: {extent}") from e
+    return fc
+
+
 class AddFeatureCollectionAlgorithm(QgsProcessingAlgorithm):
     def name(self):
         return "add_feature_collection"
@@ -93,6 +121,9 @@ class AddFeatureCollectionAlgorithm(QgsProcessingAlgorithm):
         <li><b>Filter Properties:</b> Filters to apply to the Feature Collection. Feature properties vary per dataset. See the <a href='https://developers.google.com/earth-engine/datasets'>Catalog</a> for details.</li>
         <li><b>Start and End Date:</b> Optional start and end dates for filtering. Applies only to collections with <code>system:time_start</code>.</li>
         <li><b>Geographic Extent:</b> Optional bounding box filter using the format xmin,ymin,xmax,ymax.</li>
+        <li><b>Properties:</b> Optional comma-separated property names to keep. Only these are fetched from Earth Engine.</li>
+        <li><b>Download as Vector Layer:</b> Download the features as a local vector layer instead of a styled raster overlay.</li>
+        <li><b>Attributes Only:</b> Drop geometries and download an attribute table. Implies a vector download.</li>
         <li><b>Visualization Parameters:</b> Includes outline color, fill color, line width, and opacity. </li>
     </ul>
  
@@ -147,6 +178,31 @@ class AddFeatureCollectionAlgorithm(QgsProcessingAlgorithm):
             )
         )
 
+        self.addParameter(
+            QgsProcessingParameterString(
+                "properties",
+                _("Properties to keep (comma separated, empty for all)"),
+                defaultValue="",
+                optional=True,
+            )
+        )
+
+        self.addParameter(
+            QgsProcessingParameterBoolean(
+                "as_vector",
+                _("Download as vector layer"),
+                defaultValue=False,
+            )
+        )
+
+        self.addParameter(
+            QgsProcessingParameterBoolean(
+                "drop_geometry",
+                _("Attributes only (drop geometry)"),
+                defaultValue=False,
+            )
+        )
+
         self.addParameter(
             QgsProcessingParameterString(
                 "viz_color_hex",
@@ -197,18 +253,6 @@ class AddFeatureCollectionAlgorithm(QgsProcessingAlgorithm):
             )
         )
 
-    def _get_filters(self, filters: str) -> List[str]:
-        filters = filters.split(";")
-        parsed_filters = []
-        for f in filters:
-            f = f.split(":")
-            if len(f) == 3 and f[1] in filter_functions:
-                parsed_filters.append(f)
-            else:
-                raise ValueError(f"Invalid filter format: {f}")
-
-        return parsed_filters
-
     def processAlgorithm(self, parameters, context, feedback):
         feature_collection_id = self.parameterAsString(
             parameters, "feature_collection_id", context
@@ -222,59 +266,79 @@ class AddFeatureCollectionAlgorithm(QgsProcessingAlgorithm):
         viz_fill_color = self.parameterAsString(parameters, "viz_fill_color", context)
         viz_width = self.parameterAsString(parameters, "viz_width", context)
         opacity = self.parameterAsString(parameters, "opacity", context)
+        properties = [
+            prop.strip()
+            for prop in self.parameterAsString(parameters, "properties", context).split(
+                ","
+            )
+            if prop.strip()
+        ]
+        drop_geometry = self.parameterAsBoolean(parameters, "drop_geometry", context)
+        as_vector = drop_geometry or self.parameterAsBoolean(
+            parameters, "as_vector", context
+        )
+
+        fc = filter_feature_collection(
+            feature_collection_id, filters, extent, extent_crs, context.project()
+        )
 
-        fc = ee.FeatureCollection(feature_collection_id)
-
-        if filters:
-            filters = self._get_filters(filters)
-            for filter_item in filters:
-                filter_property, filter_operator, filter_value = filter_item
-                filter_func = filter_functions.get(filter_operator)
-                if filter_func:
-                    # Attempt to convert value to number, fallback to string
-                    try:
-                        filter_value_casted = float(filter_value)
-                        # Convert to int if applicable
-                        if filter_value_casted.is_integer():
-                            filter_value_casted = int(filter_value_casted)
-                    except ValueError:
-                        filter_value_casted = filter_value
-                    fc = fc.filter(
-                        filter_func["operator"](filter_property, filter_value_casted)
-                    )
-
-        # Apply date filter only if system:time_start exists
-        if start_date and end_date and fc.size().getInfo() > 0:
-            sample_feature = fc.first()
-            sample_info = sample_feature.getInfo()
-            if "system:time_start" in sample_info.get("properties", {}):
+        # Apply date filter only if system:time_start exists. The summary is
+        # usually cached already, from the dialog summarizing the same filters.
+        if start_date and end_date:
+            summary = vector.summarize_feature_collection(fc)
+            if summary.has_time_start:
                 fc = fc.filter(ee.Filter.date(ee.Date(start_date), ee.Date(end_date)))
-            else:
+            elif summary.count > 0:
                 logger.warning(
                     "Skipping date filter: no system:time_start property found."
                 )
-        # Apply extent filter if provided
-        if extent and extent_crs:
-            try:
-                ee_extent = get_ee_extent(extent, extent_crs, context.project())
-                fc = fc.filterBounds(ee_extent)
-            except Exception as e:
-                raise ValueError(f"Invalid extent format: {extent}") from e
+        counted_fc = fc
+
+        # Projected after filtering, so filters can still use dropped properties
+        fc = vector.select_properties(fc, properties, retain_geometry=not drop_geometry)
 
         result = {}
         layer_name = f"FC: {feature_collection_id}"
 
+        if as_vector:
+            vis_params = {
+                "color": viz_color_hex,
+                "fillColor": viz_fill_color,
+                "width": int(viz_width),
+            }
+            # Downloaded even when fc is still a named table, which
+            # add_processing_ee_layer would draw on the server
+            add_to_project = processing_output_should_load(parameters, context)
+            layer = add_or_update_ee_vector_layer(
+                fc,
+                layer_name,
+                vis_params,
+                add_to_project=add_to_project,
+                context=None if add_to_project else context,
+            )
+            if opacity != "":
+                layer.setOpacity(int(opacity) / 100)
+            result["OUTPUT_VECTOR"] = layer
+            return result
+
         styled_fc = fc.style(
             color=viz_color_hex, fillColor=viz_fill_color, width=int(viz_width)
         )
-        # opacity can't be set from EE, we must apply in QGIS
-        layer = add_processing_ee_layer(styled_fc, {}, layer_name, context, parameters)
+        # The count is only needed for the warning below, so it is fetched
+        # while the map ID is being created
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            summary = executor.submit(vector.summarize_feature_collection, counted_fc)
+            # opacity can't be set from EE, we must apply in QGIS
+            layer = add_processing_ee_layer(
+                styled_fc, {}, layer_name, context, parameters
+            )
+            count = summary.result().count
         set_ee_feature_collection_layer_source(layer, fc)
         if opacity != "":
             layer.setOpacity(int(opacity) / 100)
         result["OUTPUT_RASTER"] = layer
 
-        if fc.size().getInfo() == 0:
+        if count == 0:
             logger.warning(
                 f"No features found in the Feature Collection: {feature_collection_id}"
             )
@@ -400,7 +464,7 @@ class AddFeatureCollectionAlgorithmDialog(BaseAlgorithmDialog):
         # Connect signals
         if self.defaults.get("feature_collection_id"):
             self.fc_id.setText(self.defaults["feature_collection_id"])
-        self.fc_id.textChanged.connect(self._on_fc_id_changed)
+        self.fc_id.textChanged.connect(self._on_inputs_changed)
 
         layout.addWidget(QLabel("Feature Collection ID"))
         layout.addWidget(self.fc_id)
@@ -410,8 +474,15 @@ class AddFeatureCollectionAlgorithmDialog(BaseAlgorithmDialog):
             property_list=self.feature_properties,
             add_initial_row=False,
         )
+        self.filter_widget.changed.connect(self._on_inputs_changed)
         layout.addWidget(self.filter_widget)
 
+        # --- Property Selection ---
+        self.property_widget = PropertySelectionWidget(
+            property_list=self.feature_properties,
+        )
+        layout.addWidget(self.property_widget)
+
         # --- Date Range ---
         date_group = gui.QgsCollapsibleGroupBox(_("Filter by Dates"))
         date_group.setCollapsed(True)
@@ -445,6 +516,7 @@ class AddFeatureCollectionAlgorithmDialog(BaseAlgorithmDialog):
         )
         self.extent_group.setMapCanvas(Map.get_iface().mapCanvas())
         self.extent_group.setToolTip(_("Specify the geographic extent."))
+        self.extent_group.extentChanged.connect(self._on_inputs_changed)
         layout.addWidget(self.extent_group)
 
         # -- Visualization Parameters
@@ -478,6 +550,9 @@ class AddFeatureCollectionAlgorithmDialog(BaseAlgorithmDialog):
             "end_date": self.end_date.date().toString("yyyy-MM-dd"),
             "extent": self.extent_group.outputExtent(),
             "extent_crs": self.extent_group.outputCrs(),
+            "properties": ",".join(self.property_widget.selected_properties()),
+            "as_vector": self.property_widget.as_vector.isChecked(),
+            "drop_geometry": self.property_widget.drop_geometry.isChecked(),
             "opacity": str(self.opacity.value()),
             "viz_color_hex": self.outline_color.color().name(),
             "viz_fill_color": self.fill_color.color().name(),
@@ -485,7 +560,7 @@ class AddFeatureCollectionAlgorithmDialog(BaseAlgorithmDialog):
             "LOAD_OUTPUT_LAYER": True,
         }
 
-    def _on_fc_id_changed(self):
+    def _on_inputs_changed(self):
         self._update_timer.start(500)
 
     def _on_fc_id_ready(self):
@@ -495,10 +570,27 @@ class AddFeatureCollectionAlgorithmDialog(BaseAlgorithmDialog):
         asset_id = self.fc_id.text().strip()
         if not asset_id:
             return
-        props = get_ee_properties(asset_id, silent=True)
-        if props:
-            self.feature_properties = props
+        parameters = self.getParameters()
+        try:
+            # Summarizes the collection the algorithm checks for dates, so
+            # running it reuses the cached result
+            fc = filter_feature_collection(
+                asset_id,
+                parameters["filters"],
+                parameters["extent"],
+                parameters["extent_crs"],
+                QgsProject.instance(),
+            )
+            summary = vector.summarize_feature_collection(fc)
+        except Exception as e:
+            # Typing an asset id may hit network errors as well as EE ones
+            logger.debug(f"Could not read properties of {asset_id!r}: {e}")
+            return
+        # Refilling the dropdowns would clear the filter being edited
+        if summary.properties and summary.properties != self.feature_properties:
+            self.feature_properties = summary.properties
             self._refresh_property_dropdowns()
 
     def _refresh_property_dropdowns(self):
         self.filter_widget.set_property_list(self.feature_properties)
+        self.property_widget.set_property_list(self.feature_properties)
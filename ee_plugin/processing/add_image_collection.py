@@ -73,6 +73,39 @@ def _date_from_default(value: str) -> Optional[QDate]:
     return None
 
 
+def parse_property_filters(filters: str) -> List[List[str]]:
+    """Parse ``property:operator:value`` filters separated by semicolons."""
+    parsed_filters = []
+    for f in filters.split(";"):
+        f = f.split(":")
+        if len(f) == 3 and f[1] in filter_functions:
+            parsed_filters.append(f)
+        else:
+            raise ValueError(f"Invalid filter format: {f}")
+    return parsed_filters
+
+
+def apply_property_filters(
+    collection: ee.ImageCollection, filters: str
+) -> ee.ImageCollection:
+    for filter_property, filter_operator, filter_value in parse_property_filters(
+        filters
+    ):
+        filter_func = filter_functions[filter_operator]
+        # Attempt to convert value to number, fallback to string
+        try:
+            filter_value_casted = float(filter_value)
+            # Convert to int if applicable
+            if filter_value_casted.is_integer():
+                filter_value_casted = int(filter_value_casted)
+        except ValueError:
+            filter_value_casted = filter_value
+        collection = collection.filter(
+            filter_func["operator"](filter_property, filter_value_casted)
+        )
+    return collection
+
+
 class AddImageCollectionAlgorithmDialog(BaseAlgorithmDialog):
     def __init__(
         self,
@@ -460,18 +493,6 @@ class AddImageCollectionAlgorithm(QgsProcessingAlgorithm):
     def createInstance(self):
         return AddImageCollectionAlgorithm()
 
-    def _get_filters(self, filters: str) -> List[str]:
-        filters = filters.split(";")
-        parsed_filters = []
-        for f in filters:
-            f = f.split(":")
-            if len(f) == 3 and f[1] in filter_functions:
-                parsed_filters.append(f)
-            else:
-                raise ValueError(f"Invalid filter format: {f}")
-
-        return parsed_filters
-
     def createCustomParametersWidget(self, parent=None):
         # Use stock Processing dialog on older QGIS where custom dialog init is fragile
         if Qgis.QGIS_VERSION_INT < 34000:
@@ -550,23 +571,7 @@ class AddImageCollectionAlgorithm(QgsProcessingAlgorithm):
 
         # Apply the filters if provided
         if filters:
-            filters = self._get_filters(filters)
-
-            for filter_item in filters:
-                filter_property, filter_operator, filter_value = filter_item
-                filter_func = filter_functions.get(filter_operator)
-                if filter_func:
-                    # Attempt to convert value to number, fallback to string
-                    try:
-                        filter_value_casted = float(filter_value)
-                        # Convert to int if applicable
-                        if filter_value_casted.is_integer():
-                            filter_value_casted = int(filter_value_casted)
-                    except ValueError:
-                        filter_value_casted = filter_value
-                    ic = ic.filter(
-                        filter_func["operator"](filter_property, filter_value_casted)
-                    )
+            ic = apply_property_filters(ic, filters)
 
         # Apply compositing logic
         compositing_options = [
@@ -0,0 +1,399 @@
+import hashlib
+import json
+import logging
+from itertools import product
+from typing import Any, List, Tuple
+
+import ee
+from qgis.core import (
+    Qgis,
+    QgsCoordinateReferenceSystem,
+    QgsFeature,
+    QgsFeatureSink,
+    QgsField,
+    QgsFields,
+    QgsProcessing,
+    QgsProcessingAlgorithm,
+    QgsProcessingContext,
+    QgsProcessingFeedback,
+    QgsProcessingMultiStepFeedback,
+    QgsProcessingParameterDateTime,
+    QgsProcessingParameterFeatureSink,
+    QgsProcessingParameterFeatureSource,
+    QgsProcessingParameterField,
+    QgsProcessingParameterNumber,
+    QgsProcessingParameterString,
+)
+from qgis.PyQt.QtCore import QDateTime, Qt, QVariant
+
+from .. import chunking
+from ..logging import local_context
+from ..utils import translate as _
+from .add_image_collection import apply_property_filters
+from .sample_points import PointRow, point_rows, points_collection, unique_field_names
+
+logger = logging.getLogger(__name__)
+
+# FeatureCollection.getInfo stops at 5000 features. An image yields at most
+# one sample per point, so slices of the collection are sized by image count.
+MAX_SAMPLES = 5000
+DEFAULT_CHUNK_SIZE = 100
+DEFAULT_REQUEST_RATE = 5.0
+TIME_START_PROPERTY = "system:time_start"
+
+# Offset and number of images of a slice of the collection
+Window = Tuple[int, int]
+
+
+def image_windows(images: int, chunk_size: int) -> List[Window]:
+    """Slice the collection so a chunk's samples never exceed ``MAX_SAMPLES``.
+
+    Slices hold a fixed number of images rather than a span of time, so
+    bursts of images on a few dates cannot overflow a request.
+    """
+    per_window = max(1, MAX_SAMPLES // chunk_size)
+    return [
+        (offset, min(per_window, images - offset))
+        for offset in range(0, images, per_window)
+    ]
+
+
+def extract_chunk(
+    collection: ee.ImageCollection,
+    bands: List[str],
+    scale: float,
+    rows: List[PointRow],
+    window: Window,
+) -> List[List[Any]]:
+    """Sample every image in a slice of the collection at a chunk of points.
+
+    Returns ``[fid, time, image id, *values]`` rows, one per point and image.
+    """
+    points = points_collection(rows)
+    offset, count = window
+    images = ee.ImageCollection(collection.toList(count, offset))
+
+    def sample(image: ee.Image) -> ee.FeatureCollection:
+        return image.sampleRegions(
+            collection=points, properties=["fid"], scale=scale, geometries=False
+        ).map(
+            lambda feature: feature.set(
+                {
+                    "time": image.get(TIME_START_PROPERTY),
+                    "image": image.get("system:index"),
+                }
+            )
+        )
+
+    samples = images.filterBounds(points.geometry()).map(sample).flatten()
+    return [
+        [properties["fid"], properties.get("time"), properties.get("image")]
+        + [properties.get(band) for band in bands]
+        for properties in (
+            feature["properties"] for feature in samples.getInfo().get("features", [])
+        )
+    ]
+
+
+class ExtractTimeSeriesAlgorithm(QgsProcessingAlgorithm):
+    """Extract image collection time series at the points of a local layer."""
+
+    INPUT = "INPUT"
+    ID_FIELD = "ID_FIELD"
+    COLLECTION = "image_collection_id"
+    FILTERS = "filters"
+    START_DATE = "start_date"
+    END_DATE = "end_date"
+    BANDS = "BANDS"
+    SCALE = "SCALE"
+    CHUNK_SIZE = "CHUNK_SIZE"
+    MAX_WORKERS = "MAX_WORKERS"
+    REQUEST_RATE = "REQUEST_RATE"
+    OUTPUT = "OUTPUT"
+
+    def name(self) -> str:
+        return "extract_time_series"
+
+    def displayName(self) -> str:
+        return _("Extract Time Series at Points")
+
+    def group(self) -> str:
+        return "Analysis"
+
+    def groupId(self) -> str:
+        return "analysis"
+
+    def createInstance(self) -> QgsProcessingAlgorithm:
+        return ExtractTimeSeriesAlgorithm()
+
+    def shortHelpString(self) -> str:
+        return (
+            "<h2>Extract Earth Engine Time Series at Points</h2>"
+            "<p>Samples every image of a filtered Earth Engine image collection "
+            "at every point of a local layer. The output is a long table with "
+            "one row per point and image date, and a column per band.</p>"
+            "<ul>"
+            "<li><b>Points</b>: The local point layer.</li>"
+            "<li><b>Point ID Field</b>: Copied to the output to identify points "
+            "(optional, the feature ID by default).</li>"
+            "<li><b>Image Collection ID</b>, <b>Filter Image Properties</b> and "
+            "<b>dates</b>: Filter the collection as in Add Image Collection.</li>"
+            "<li><b>Bands</b>: Comma-separated bands to extract (optional).</li>"
+            "<li><b>Scale</b>: Resolution in meters to sample at.</li>"
+            "<li><b>Points per Request</b>: Points are sent in chunks, and the "
+            "images are split so each request stays small.</li>"
+            "<li><b>Concurrent Requests</b> and <b>Requests per Second</b>: Limit "
+            "the load. The rate is halved whenever Earth Engine reports a quota "
+            "error.</li>"
+            "<li><b>Output</b>: A table, such as a GeoPackage or, where GDAL "
+            "supports it, a Parquet file.</li>"
+            "</ul>"
+            "<p>Rows are written as each request finishes. Running the algorithm "
+            "again with the same inputs after a failure or cancel only extracts "
+            "the chunks that are left.</p>"
+        )
+
+    def initAlgorithm(self, config: dict) -> None:
+        self.addParameter(
+            QgsProcessingParameterFeatureSource(
+                self.INPUT,
+                _("Points"),
+                [QgsProcessing.SourceType.TypeVectorPoint],
+            )
+        )
+        self.addParameter(
+            QgsProcessingParameterField(
+                self.ID_FIELD,
+                _("Point ID Field"),
+                parentLayerParameterName=self.INPUT,
+                optional=True,
+            )
+        )
+        self.addParameter(
+            QgsProcessingParameterString(
+                self.COLLECTION, _("Earth Engine Image Collection ID")
+            )
+        )
+        self.addParameter(
+            QgsProcessingParameterString(
+                self.FILTERS,
+                _("Filter Image Properties"),
+                "Enter filters as property_0:operator_0:value_0;property_1:operator_1:value_1",
+                optional=True,
+            )
+        )
+        self.addParameter(
+            QgsProcessingParameterDateTime(
+                self.START_DATE, _("Start date for filtering"), optional=True
+            )
+        )
+        self.addParameter(
+            QgsProcessingParameterDateTime(
+                self.END_DATE, _("End date for filtering"), optional=True
+            )
+        )
+        self.addParameter(
+            QgsProcessingParameterString(
+                self.BANDS, _("Bands (comma-separated)"), optional=True
+            )
+        )
+        self.addParameter(
+            QgsProcessingParameterNumber(
+                self.SCALE,
+                _("Scale (meters)"),
+                QgsProcessingParameterNumber.Type.Double,
+                defaultValue=30,
+                minValue=0.01,
+            )
+        )
+        self.addParameter(
+            QgsProcessingParameterNumber(
+                self.CHUNK_SIZE,
+                _("Points per Request"),
+                QgsProcessingParameterNumber.Type.Integer,
+                defaultValue=DEFAULT_CHUNK_SIZE,
+                minValue=1,
+                maxValue=MAX_SAMPLES // 2,
+            )
+        )
+        self.addParameter(
+            QgsProcessingParameterNumber(
+                self.MAX_WORKERS,
+                _("Concurrent Requests"),
+                QgsProcessingParameterNumber.Type.Integer,
+                defaultValue=chunking.CHUNK_MAX_WORKERS,
+                minValue=1,
+                maxValue=16,
+            )
+        )
+        self.addParameter(
+            QgsProcessingParameterNumber(
+                self.REQUEST_RATE,
+                _("Requests per Second"),
+                QgsProcessingParameterNumber.Type.Double,
+                defaultValue=DEFAULT_REQUEST_RATE,
+                minValue=0.1,
+            )
+        )
+        self.addParameter(
+            QgsProcessingParameterFeatureSink(
+                self.OUTPUT, _("Time Series"), QgsProcessing.SourceType.TypeVector
+            )
+        )
+
+    def _collection(
+        self, parameters: dict, context: QgsProcessingContext
+    ) -> ee.ImageCollection:
+        collection = ee.ImageCollection(
+            self.parameterAsString(parameters, self.COLLECTION, context)
+        )
+        filters = self.parameterAsString(parameters, self.FILTERS, context)
+        if filters:
+            collection = apply_property_filters(collection, filters)
+        start_date = self.parameterAsDateTime(parameters, self.START_DATE, context)
+        end_date = self.parameterAsDateTime(parameters, self.END_DATE, context)
+        if start_date.isValid() and end_date.isValid():
+            if start_date > end_date:
+                raise ValueError(
+                    "Start date must be earlier than or equal to end date."
+                )
+            collection = collection.filterDate(
+                ee.Date(start_date.toMSecsSinceEpoch()),
+                ee.Date(end_date.toMSecsSinceEpoch()),
+            )
+        bands = [
+            band.strip()
+            for band in self.parameterAsString(parameters, self.BANDS, context).split(
+                ","
+            )
+            if band.strip()
+        ]
+        return collection.select(bands) if bands else collection
+
+    def processAlgorithm(
+        self,
+        parameters: dict,
+        context: QgsProcessingContext,
+        feedback: QgsProcessingFeedback,
+    ) -> dict:
+        local_context.set_feedback(feedback)
+        steps = QgsProcessingMultiStepFeedback(2, feedback)
+        source = self.parameterAsSource(parameters, self.INPUT, context)
+        if source is None:
+            raise ValueError("Points layer not found.")
+        id_field = self.parameterAsString(parameters, self.ID_FIELD, context)
+        scale = self.parameterAsDouble(parameters, self.SCALE, context)
+        chunk_size = self.parameterAsInt(parameters, self.CHUNK_SIZE, context)
+        max_workers = self.parameterAsInt(parameters, self.MAX_WORKERS, context)
+        throttle = chunking.Throttle(
+            self.parameterAsDouble(parameters, self.REQUEST_RATE, context)
+        )
+
+        feedback.pushInfo(f"Reading {source.featureCount()} points…")
+        rows = point_rows(source, context, steps)
+        if not rows:
+            raise ValueError("The points layer has no points.")
+        point_ids = (
+            {feature.id(): feature[id_field] for feature in source.getFeatures()}
+            if id_field
+            else {}
+        )
+
+        longitudes = [row[1] for row in rows]
+        latitudes = [row[2] for row in rows]
+        bounds = ee.Geometry.Rectangle(
+            [min(longitudes), min(latitudes), max(longitudes), max(latitudes)],
+            "EPSG:4326",
+            False,
+        )
+        collection = self._collection(parameters, context).filterBounds(bounds)
+        size = collection.size()
+        summary = ee.Dictionary(
+            {
+                "size": size,
+                "start": collection.aggregate_min(TIME_START_PROPERTY),
+                "bands": ee.Algorithms.If(
+                    size.gt(0), collection.first().bandNames(), []
+                ),
+            }
+        ).getInfo()
+
+        fields = QgsFields()
+        if id_field:
+            fields.append(QgsField(source.fields().field(id_field)))
+        else:
+            fields.append(QgsField("point_fid", QVariant.LongLong))
+        fields.append(QgsField("image_id", QVariant.String))
+        fields.append(QgsField("date", QVariant.DateTime))
+        bands = summary["bands"]
+        for name in unique_field_names(bands, fields.names()):
+            fields.append(QgsField(name, QVariant.Double))
+        sink, dest_id = self.parameterAsSink(
+            parameters,
+            self.OUTPUT,
+            context,
+            fields,
+            Qgis.WkbType.NoGeometry,
+            QgsCoordinateReferenceSystem(),
+        )
+        if not summary["size"]:
+            feedback.pushWarning("No images match the filters at these points.")
+            return {self.OUTPUT: dest_id}
+
+        if summary["start"] is None:
+            raise ValueError(
+                f"The images have no {TIME_START_PROPERTY} property to date "
+                "the time series with."
+            )
+
+        windows = image_windows(summary["size"], chunk_size)
+        chunks = list(product(chunking.chunked(rows, chunk_size), windows))
+        digest = hashlib.sha1(
+            json.dumps(rows).encode("utf-8"), usedforsecurity=False
+        ).hexdigest()
+        # Chunk indexes mean other points and windows once the chunk size
+        # changes, or images are added to the collection
+        key = chunking.job_key(
+            self.name(),
+            ee.serializer.toJSON(collection),
+            scale,
+            chunk_size,
+            windows,
+            digest,
+        )
+        checkpoint = chunking.Checkpoint(key)
+
+        steps.setCurrentStep(1)
+        feedback.pushInfo(
+            f"Extracting {summary['size']} images at {len(rows)} points in "
+            f"{len(chunks)} requests…"
+        )
+        written = 0
+        for index, samples in chunking.run_chunks(
+            lambda chunk: extract_chunk(collection, bands, scale, *chunk),
+            chunks,
+            steps,
+            checkpoint,
+            max_workers=max_workers,
+            throttle=throttle,
+        ):
+            for fid, time, image_id, *values in samples:
+                feature = QgsFeature(fields)
+                feature.setAttributes(
+                    [
+                        point_ids[int(fid)] if id_field else int(fid),
+                        image_id,
+                        QDateTime.fromMSecsSinceEpoch(int(time), Qt.TimeSpec.UTC)
+                        if time is not None
+                        else None,
+                    ]
+                    + values
+                )
+                sink.addFeature(feature, QgsFeatureSink.Flag.FastInsert)
+            written += len(samples)
+        if feedback.isCanceled():
+            raise RuntimeError("Canceled")
+
+        checkpoint.remove()
+        feedback.pushInfo(f"Wrote {written} rows.")
+        return {self.OUTPUT: dest_id}
@@ -5,6 +5,9 @@ from .add_ee_image import AddEEImageAlgorithm
 from .add_image_collection import AddImageCollectionAlgorithm
 from .export_geotiff import ExportGeoTIFFAlgorithm
 from .add_feature_collection import AddFeatureCollectionAlgorithm
+from .extract_time_series import ExtractTimeSeriesAlgorithm
+from .sample_points import SampleLayersAtPointsAlgorithm
+from .zonal_statistics import ZonalStatisticsAlgorithm
 
 
 class EEProcessingProvider(QgsProcessingProvider):
@@ -17,6 +20,9 @@ class EEProcessingProvider(QgsProcessingProvider):
         self.addAlgorithm(AddImageCollectionAlgorithm())
         self.addAlgorithm(ExportGeoTIFFAlgorithm())
         self.addAlgorithm(AddFeatureCollectionAlgorithm())
+        self.addAlgorithm(SampleLayersAtPointsAlgorithm())
+        self.addAlgorithm(ZonalStatisticsAlgorithm())
+        self.addAlgorithm(ExtractTimeSeriesAlgorithm())
 
     def id(self):
         return "ee"
@@ -0,0 +1,334 @@
+import logging
+import re
+from typing import Any, Dict, List, Tuple
+
+import ee
+from qgis.core import (
+    QgsCoordinateReferenceSystem,
+    QgsCoordinateTransform,
+    QgsFeature,
+    QgsFeatureSink,
+    QgsField,
+    QgsFields,
+    QgsProcessing,
+    QgsProcessingAlgorithm,
+    QgsProcessingContext,
+    QgsProcessingFeedback,
+    QgsProcessingMultiStepFeedback,
+    QgsProcessingParameterEnum,
+    QgsProcessingParameterFeatureSink,
+    QgsProcessingParameterFeatureSource,
+    QgsProcessingParameterNumber,
+)
+from qgis.PyQt.QtCore import QVariant
+
+from .. import chunking
+from ..logging import local_context
+from ..utils import (
+    get_ee_object_from_layer,
+    get_ee_raster_layers,
+    get_layer_by_name,
+    translate as _,
+)
+
+logger = logging.getLogger(__name__)
+
+# FeatureCollection.getInfo stops at 5000 features
+MAX_CHUNK_SIZE = 5000
+DEFAULT_CHUNK_SIZE = 2000
+# Coordinates are uploaded with about 1 cm of precision
+COORDINATE_DIGITS = 7
+
+PointRow = List[Any]
+
+
+def unique_field_names(names: List[str], existing: List[str]) -> List[str]:
+    """Make names attribute safe and distinct from each other and ``existing``."""
+    taken = {name.lower() for name in existing}
+    unique = []
+    for name in names:
+        name = re.sub(r"[^0-9A-Za-z_]+", "_", name).strip("_") or "band"
+        candidate, suffix = name, 2
+        while candidate.lower() in taken:
+            candidate = f"{name}_{suffix}"
+            suffix += 1
+        taken.add(candidate.lower())
+        unique.append(candidate)
+    return unique
+
+
+def sample_field_names(
+    layer_bands: List[Tuple[str, List[str]]], existing: List[str]
+) -> List[str]:
+    """Name a new field per sampled band, prefixed by its layer when several."""
+    return unique_field_names(
+        [
+            band if len(layer_bands) == 1 else f"{layer}_{band}"
+            for layer, bands in layer_bands
+            for band in bands
+        ],
+        existing,
+    )
+
+
+def points_collection(rows: List[PointRow]) -> ee.FeatureCollection:
+    """Build features from ``[fid, longitude, latitude]`` rows on the server.
+
+    Sending the rows as one nested list keeps the request far smaller than
+    an ``ee.Feature`` expression per point.
+    """
+    return ee.FeatureCollection(
+        ee.List(rows).map(
+            lambda row: ee.Feature(
+                ee.Geometry.Point(ee.List(row).slice(1)),
+                {"fid": ee.List(row).get(0)},
+            )
+        )
+    )
+
+
+def sample_chunk(
+    image: ee.Image, rows: List[PointRow], bands: List[str], scale: float
+) -> List[List[Any]]:
+    """Sample ``image`` at a chunk of points, returning ``[fid, *values]`` rows.
+
+    Points on masked pixels are left out by ``sampleRegions``.
+    """
+    samples = image.sampleRegions(
+        collection=points_collection(rows),
+        properties=["fid"],
+        scale=scale,
+        geometries=False,
+    ).getInfo()
+    return [
+        [feature["properties"]["fid"]]
+        + [feature["properties"].get(band) for band in bands]
+        for feature in samples.get("features", [])
+    ]
+
+
+def point_rows(
+    source, context: QgsProcessingContext, feedback: QgsProcessingFeedback
+) -> List[PointRow]:
+    """Read ``[fid, longitude, latitude]`` rows in WGS84 from a point source.
+
+    Multipoints are sampled at their centroid.
+    """
+    transform = QgsCoordinateTransform(
+        source.sourceCrs(),
+        QgsCoordinateReferenceSystem("EPSG:4326"),
+        context.transformContext(),
+    )
+    rows = []
+    total = max(source.featureCount(), 1)
+    for current, feature in enumerate(source.getFeatures()):
+        if feedback.isCanceled():
+            raise RuntimeError("Canceled")
+        geometry = feature.geometry()
+        if geometry.isEmpty():
+            continue
+        geometry.transform(transform)
+        point = geometry.centroid().asPoint()
+        rows.append(
+            [
+                feature.id(),
+                round(point.x(), COORDINATE_DIGITS),
+                round(point.y(), COORDINATE_DIGITS),
+            ]
+        )
+        feedback.setProgress(100 * current / total)
+    return rows
+
+
+class SampleLayersAtPointsAlgorithm(QgsProcessingAlgorithm):
+    """Sample Earth Engine raster layers at the points of a local layer."""
+
+    INPUT = "INPUT"
+    EE_LAYERS = "EE_LAYERS"
+    SCALE = "SCALE"
+    CHUNK_SIZE = "CHUNK_SIZE"
+    MAX_WORKERS = "MAX_WORKERS"
+    OUTPUT = "OUTPUT"
+
+    def name(self) -> str:
+        return "sample_points"
+
+    def displayName(self) -> str:
+        return _("Sample Layers at Points")
+
+    def group(self) -> str:
+        return "Analysis"
+
+    def groupId(self) -> str:
+        return "analysis"
+
+    def createInstance(self) -> QgsProcessingAlgorithm:
+        return SampleLayersAtPointsAlgorithm()
+
+    def shortHelpString(self) -> str:
+        return (
+            "<h2>Sample Earth Engine Layers at Points</h2>"
+            "<p>Samples the pixel values of Earth Engine raster layers at every "
+            "point of a local layer, and adds them to a copy of the layer as new "
+            "fields. Points on masked pixels get empty values.</p>"
+            "<ul>"
+            "<li><b>Points</b>: The local point layer to sample at.</li>"
+            "<li><b>Earth Engine Layers</b>: The raster layers to sample. With "
+            "several layers, field names are prefixed by the layer name.</li>"
+            "<li><b>Scale</b>: Resolution in meters to sample at.</li>"
+            f"<li><b>Points per Request</b>: At most {MAX_CHUNK_SIZE}. Lower it if "
+            "requests time out.</li>"
+            "<li><b>Concurrent Requests</b>: Chunks sampled at the same time.</li>"
+            "</ul>"
+            "<p>Failed requests are retried. Finished chunks are saved as they "
+            "arrive, so running the algorithm again with the same inputs after a "
+            "failure or cancel only samples the chunks that are left.</p>"
+        )
+
+    def initAlgorithm(self, config: dict) -> None:
+        self.raster_layers = [layer.name() for layer in get_ee_raster_layers()]
+        self.addParameter(
+            QgsProcessingParameterFeatureSource(
+                self.INPUT,
+                _("Points"),
+                [QgsProcessing.SourceType.TypeVectorPoint],
+            )
+        )
+        self.addParameter(
+            QgsProcessingParameterEnum(
+                self.EE_LAYERS,
+                _("Earth Engine Layers"),
+                options=self.raster_layers,
+                allowMultiple=True,
+            )
+        )
+        self.addParameter(
+            QgsProcessingParameterNumber(
+                self.SCALE,
+                _("Scale (meters)"),
+                QgsProcessingParameterNumber.Type.Double,
+                defaultValue=30,
+                minValue=0.01,
+            )
+        )
+        self.addParameter(
+            QgsProcessingParameterNumber(
+                self.CHUNK_SIZE,
+                _("Points per Request"),
+                QgsProcessingParameterNumber.Type.Integer,
+                defaultValue=DEFAULT_CHUNK_SIZE,
+                minValue=1,
+                maxValue=MAX_CHUNK_SIZE,
+            )
+        )
+        self.addParameter(
+            QgsProcessingParameterNumber(
+                self.MAX_WORKERS,
+                _("Concurrent Requests"),
+                QgsProcessingParameterNumber.Type.Integer,
+                defaultValue=chunking.CHUNK_MAX_WORKERS,
+                minValue=1,
+                maxValue=16,
+            )
+        )
+        self.addParameter(
+            QgsProcessingParameterFeatureSink(self.OUTPUT, _("Sampled Points"))
+        )
+
+    def _selected_images(
+        self, parameters: dict, context: QgsProcessingContext
+    ) -> List[Tuple[str, ee.Image]]:
+        images = []
+        for index in self.parameterAsEnums(parameters, self.EE_LAYERS, context):
+            name = self.raster_layers[index]
+            layer = get_layer_by_name(name)
+            image = get_ee_object_from_layer(layer) if layer else None
+            if image is None:
+                raise ValueError(f"Could not restore Earth Engine layer {name}")
+            images.append((name, ee.Image(image)))
+        if not images:
+            raise ValueError("Select at least one Earth Engine layer to sample.")
+        return images
+
+    def processAlgorithm(
+        self,
+        parameters: dict,
+        context: QgsProcessingContext,
+        feedback: QgsProcessingFeedback,
+    ) -> dict:
+        local_context.set_feedback(feedback)
+        steps = QgsProcessingMultiStepFeedback(3, feedback)
+        source = self.parameterAsSource(parameters, self.INPUT, context)
+        if source is None:
+            raise ValueError("Points layer not found.")
+        images = self._selected_images(parameters, context)
+        scale = self.parameterAsDouble(parameters, self.SCALE, context)
+        chunk_size = self.parameterAsInt(parameters, self.CHUNK_SIZE, context)
+        max_workers = self.parameterAsInt(parameters, self.MAX_WORKERS, context)
+
+        # Band names of every layer in one request
+        band_names = ee.List([image.bandNames() for name, image in images]).getInfo()
+        layer_bands = [
+            (name, names) for (name, image), names in zip(images, band_names)
+        ]
+        fields = QgsFields(source.fields())
+        bands = sample_field_names(layer_bands, fields.names())
+        selected, start = [], 0
+        for (name, layer_image), names in zip(images, band_names):
+            selected.append(
+                layer_image.select(names, bands[start : start + len(names)])
+            )
+            start += len(names)
+        image = ee.Image.cat(selected)
+        for band in bands:
+            fields.append(QgsField(band, QVariant.Double))
+
+        feedback.pushInfo(f"Reading {source.featureCount()} points…")
+        rows = point_rows(source, context, steps)
+        chunks = list(chunking.chunked(rows, chunk_size))
+        key = chunking.job_key(
+            self.name(), ee.serializer.toJSON(image), scale, chunk_size, rows
+        )
+        checkpoint = chunking.Checkpoint(key)
+
+        steps.setCurrentStep(1)
+        feedback.pushInfo(
+            f"Sampling {len(rows)} points in {len(chunks)} chunks of up to "
+            f"{chunk_size}…"
+        )
+        values: Dict[int, List[Any]] = {}
+        for chunk_index, samples in chunking.run_chunks(
+            lambda chunk: sample_chunk(image, chunk, bands, scale),
+            chunks,
+            steps,
+            checkpoint,
+            max_workers=max_workers,
+        ):
+            for sample in samples:
+                values[int(sample[0])] = sample[1:]
+        if feedback.isCanceled():
+            raise RuntimeError("Canceled")
+
+        steps.setCurrentStep(2)
+        sink, dest_id = self.parameterAsSink(
+            parameters,
+            self.OUTPUT,
+            context,
+            fields,
+            source.wkbType(),
+            source.sourceCrs(),
+        )
+        empty = [None] * len(bands)
+        total = max(source.featureCount(), 1)
+        for current, feature in enumerate(source.getFeatures()):
+            if feedback.isCanceled():
+                raise RuntimeError("Canceled")
+            output = QgsFeature(fields)
+            output.setGeometry(feature.geometry())
+            output.setAttributes(feature.attributes() + values.get(feature.id(), empty))
+            sink.addFeature(output, QgsFeatureSink.Flag.FastInsert)
+            steps.setProgress(100 * current / total)
+
+        checkpoint.remove()
+        feedback.pushInfo(f"Sampled values at {len(values)} of {len(rows)} points.")
+        return {self.OUTPUT: dest_id}
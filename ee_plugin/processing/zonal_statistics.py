@@ -0,0 +1,429 @@
+import hashlib
+import json
+import logging
+from typing import Any, List, Tuple
+
+import ee
+from qgis.core import (
+    QgsCoordinateReferenceSystem,
+    QgsCoordinateTransform,
+    QgsDistanceArea,
+    QgsFeature,
+    QgsFeatureRequest,
+    QgsFeatureSink,
+    QgsField,
+    QgsFields,
+    QgsProcessing,
+    QgsProcessingAlgorithm,
+    QgsProcessingContext,
+    QgsProcessingFeedback,
+    QgsProcessingMultiStepFeedback,
+    QgsProcessingParameterEnum,
+    QgsProcessingParameterFeatureSink,
+    QgsProcessingParameterFeatureSource,
+    QgsProcessingParameterNumber,
+    QgsProcessingParameterString,
+)
+from qgis.PyQt.QtCore import QVariant
+
+from .. import chunking
+from ..logging import local_context
+from ..utils import (
+    get_ee_object_from_layer,
+    get_ee_raster_layers,
+    get_layer_by_name,
+    translate as _,
+)
+from .sample_points import unique_field_names
+
+logger = logging.getLogger(__name__)
+
+# Statistic names are the reducer output names
+STATISTICS = [
+    ("Mean", "mean"),
+    ("Minimum", "min"),
+    ("Maximum", "max"),
+    ("Standard deviation", "stdDev"),
+    ("Sum", "sum"),
+    ("Count", "count"),
+    ("Histogram", "histogram"),
+]
+REDUCERS = {
+    "mean": ee.Reducer.mean,
+    "min": ee.Reducer.min,
+    "max": ee.Reducer.max,
+    "stdDev": ee.Reducer.stdDev,
+    "sum": ee.Reducer.sum,
+    "count": ee.Reducer.count,
+    "histogram": ee.Reducer.histogram,
+}
+
+# FeatureCollection.getInfo stops at 5000 features
+MAX_CHUNK_FEATURES = 5000
+# Coordinates make up most of a request; this keeps chunks to a few MB
+DEFAULT_CHUNK_VERTICES = 50_000
+DEFAULT_CHUNK_PIXELS = 1_000_000_000
+COORDINATE_DIGITS = 7
+
+
+def parse_percentiles(text: str) -> List[int]:
+    percentiles = []
+    for value in text.split(","):
+        if not value.strip():
+            continue
+        percentile = int(value)
+        if not 0 <= percentile <= 100:
+            raise ValueError(f"Percentiles must be between 0 and 100, got {value}.")
+        percentiles.append(percentile)
+    return sorted(set(percentiles))
+
+
+def zonal_reducer(
+    statistics: List[str], percentiles: List[int]
+) -> Tuple[ee.Reducer, List[str]]:
+    """Combine the reducers of the chosen statistics, returning their outputs."""
+    reducers = [REDUCERS[statistic]() for statistic in statistics]
+    outputs = list(statistics)
+    if percentiles:
+        reducers.append(ee.Reducer.percentile(percentiles))
+        outputs += [f"p{percentile}" for percentile in percentiles]
+    if not reducers:
+        raise ValueError("Select at least one statistic or percentile.")
+    reducer = reducers[0]
+    for other in reducers[1:]:
+        reducer = reducer.combine(other, sharedInputs=True)
+    return reducer, outputs
+
+
+def zonal_keys(bands: List[str], outputs: List[str]) -> List[str]:
+    """Return the property names ``reduceRegions`` gives each band statistic."""
+    if len(bands) == 1:
+        return outputs
+    if len(outputs) == 1:
+        return bands
+    return [f"{band}_{output}" for band in bands for output in outputs]
+
+
+def reduce_chunk(
+    image: ee.Image,
+    reducer: ee.Reducer,
+    keys: List[str],
+    scale: float,
+    rows: List[Tuple[int, str]],
+) -> List[List[Any]]:
+    """Reduce ``image`` over a chunk of ``(fid, GeoJSON)`` polygons.
+
+    Returns ``[fid, *values]`` rows, without downloading the geometries back.
+    """
+    polygons = ee.FeatureCollection(
+        [
+            ee.Feature(ee.Geometry(json.loads(geometry), None, False), {"fid": fid})
+            for fid, geometry in rows
+        ]
+    )
+    statistics = image.reduceRegions(
+        collection=polygons, reducer=reducer, scale=scale
+    ).select(["fid"] + keys, None, False)
+    return [
+        [feature["properties"]["fid"]]
+        + [feature["properties"].get(key) for key in keys]
+        for feature in statistics.getInfo().get("features", [])
+    ]
+
+
+class ZonalStatisticsAlgorithm(QgsProcessingAlgorithm):
+    """Compute statistics of an Earth Engine raster layer for local polygons."""
+
+    INPUT = "INPUT"
+    EE_IMAGE = "EE_IMAGE"
+    BANDS = "BANDS"
+    STATISTICS = "STATISTICS"
+    PERCENTILES = "PERCENTILES"
+    SCALE = "SCALE"
+    CHUNK_VERTICES = "CHUNK_VERTICES"
+    CHUNK_PIXELS = "CHUNK_PIXELS"
+    MAX_WORKERS = "MAX_WORKERS"
+    OUTPUT = "OUTPUT"
+
+    def name(self) -> str:
+        return "zonal_statistics"
+
+    def displayName(self) -> str:
+        return _("Zonal Statistics")
+
+    def group(self) -> str:
+        return "Analysis"
+
+    def groupId(self) -> str:
+        return "analysis"
+
+    def createInstance(self) -> QgsProcessingAlgorithm:
+        return ZonalStatisticsAlgorithm()
+
+    def shortHelpString(self) -> str:
+        return (
+            "<h2>Earth Engine Zonal Statistics</h2>"
+            "<p>Computes statistics of an Earth Engine raster layer within every "
+            "polygon of a local layer with <code>reduceRegions</code>, and adds "
+            "them to a copy of the layer as new fields.</p>"
+            "<ul>"
+            "<li><b>Polygons</b>: The local polygon layer.</li>"
+            "<li><b>Earth Engine Layer</b>: The raster layer to summarize.</li>"
+            "<li><b>Bands</b>: Comma-separated bands to summarize (optional, all "
+            "bands by default).</li>"
+            "<li><b>Statistics</b>: Histograms are stored as JSON text.</li>"
+            "<li><b>Percentiles</b>: Comma-separated whole percentiles, such as "
+            "<code>10,50,90</code> (optional).</li>"
+            "<li><b>Scale</b>: Resolution in meters to compute at.</li>"
+            "<li><b>Vertices per Request</b> and <b>Pixels per Request</b>: "
+            "Polygons are sent in chunks that stay within both budgets. Lower "
+            "them if requests run out of memory or time out.</li>"
+            "<li><b>Concurrent Requests</b>: Chunks computed at the same time.</li>"
+            "</ul>"
+            "<p>Every polygon is written, those without a geometry with empty "
+            "statistics. Features are written as their chunk finishes, so the "
+            "output is not in input order. Failed requests are retried, and running the "
+            "algorithm again with the same inputs after a failure or cancel only "
+            "computes the chunks that are left.</p>"
+        )
+
+    def initAlgorithm(self, config: dict) -> None:
+        self.raster_layers = [layer.name() for layer in get_ee_raster_layers()]
+        self.addParameter(
+            QgsProcessingParameterFeatureSource(
+                self.INPUT,
+                _("Polygons"),
+                [QgsProcessing.SourceType.TypeVectorPolygon],
+            )
+        )
+        self.addParameter(
+            QgsProcessingParameterEnum(
+                self.EE_IMAGE, _("Earth Engine Layer"), options=self.raster_layers
+            )
+        )
+        self.addParameter(
+            QgsProcessingParameterString(
+                self.BANDS, _("Bands (comma-separated)"), optional=True
+            )
+        )
+        self.addParameter(
+            QgsProcessingParameterEnum(
+                self.STATISTICS,
+                _("Statistics"),
+                options=[label for label, _name in STATISTICS],
+                allowMultiple=True,
+                defaultValue=[0],
+                optional=True,
+            )
+        )
+        self.addParameter(
+            QgsProcessingParameterString(
+                self.PERCENTILES, _("Percentiles (comma-separated)"), optional=True
+            )
+        )
+        self.addParameter(
+            QgsProcessingParameterNumber(
+                self.SCALE,
+                _("Scale (meters)"),
+                QgsProcessingParameterNumber.Type.Double,
+                defaultValue=30,
+                minValue=0.01,
+            )
+        )
+        self.addParameter(
+            QgsProcessingParameterNumber(
+                self.CHUNK_VERTICES,
+                _("Vertices per Request"),
+                QgsProcessingParameterNumber.Type.Integer,
+                defaultValue=DEFAULT_CHUNK_VERTICES,
+                minValue=1,
+            )
+        )
+        self.addParameter(
+            QgsProcessingParameterNumber(
+                self.CHUNK_PIXELS,
+                _("Pixels per Request"),
+                QgsProcessingParameterNumber.Type.Double,
+                defaultValue=DEFAULT_CHUNK_PIXELS,
+                minValue=1,
+            )
+        )
+        self.addParameter(
+            QgsProcessingParameterNumber(
+                self.MAX_WORKERS,
+                _("Concurrent Requests"),
+                QgsProcessingParameterNumber.Type.Integer,
+                defaultValue=chunking.CHUNK_MAX_WORKERS,
+                minValue=1,
+                maxValue=16,
+            )
+        )
+        self.addParameter(
+            QgsProcessingParameterFeatureSink(self.OUTPUT, _("Zonal Statistics"))
+        )
+
+    def _image(self, parameters: dict, context: QgsProcessingContext) -> ee.Image:
+        index = self.parameterAsEnum(parameters, self.EE_IMAGE, context)
+        name = self.raster_layers[index]
+        layer = get_layer_by_name(name)
+        image = get_ee_object_from_layer(layer) if layer else None
+        if image is None:
+            raise ValueError(f"Could not restore Earth Engine layer {name}")
+        image = ee.Image(image)
+        bands = [
+            band.strip()
+            for band in self.parameterAsString(parameters, self.BANDS, context).split(
+                ","
+            )
+            if band.strip()
+        ]
+        return image.select(bands) if bands else image
+
+    def processAlgorithm(
+        self,
+        parameters: dict,
+        context: QgsProcessingContext,
+        feedback: QgsProcessingFeedback,
+    ) -> dict:
+        local_context.set_feedback(feedback)
+        steps = QgsProcessingMultiStepFeedback(2, feedback)
+        source = self.parameterAsSource(parameters, self.INPUT, context)
+        if source is None:
+            raise ValueError("Polygon layer not found.")
+        image = self._image(parameters, context)
+        statistics = [
+            STATISTICS[index][1]
+            for index in self.parameterAsEnums(parameters, self.STATISTICS, context)
+        ]
+        percentiles = parse_percentiles(
+            self.parameterAsString(parameters, self.PERCENTILES, context)
+        )
+        scale = self.parameterAsDouble(parameters, self.SCALE, context)
+        budgets = (
+            self.parameterAsInt(parameters, self.CHUNK_VERTICES, context),
+            self.parameterAsDouble(parameters, self.CHUNK_PIXELS, context),
+        )
+        max_workers = self.parameterAsInt(parameters, self.MAX_WORKERS, context)
+
+        reducer, outputs = zonal_reducer(statistics, percentiles)
+        bands = image.bandNames().getInfo()
+        keys = zonal_keys(bands, outputs)
+        fields = QgsFields(source.fields())
+        band_outputs = [(band, output) for band in bands for output in outputs]
+        names = unique_field_names(
+            [f"{band}_{output}" for band, output in band_outputs], fields.names()
+        )
+        for name, (band, output) in zip(names, band_outputs):
+            field_type = QVariant.String if output == "histogram" else QVariant.Double
+            fields.append(QgsField(name, field_type))
+
+        feedback.pushInfo(f"Partitioning {source.featureCount()} polygons…")
+        chunks, empty_ids, digest = self._partition(
+            source, context, scale, budgets, steps
+        )
+        key = chunking.job_key(
+            self.name(),
+            ee.serializer.toJSON(image),
+            ee.serializer.toJSON(reducer),
+            scale,
+            budgets,
+            digest,
+        )
+        checkpoint = chunking.Checkpoint(key)
+
+        sink, dest_id = self.parameterAsSink(
+            parameters,
+            self.OUTPUT,
+            context,
+            fields,
+            source.wkbType(),
+            source.sourceCrs(),
+        )
+        steps.setCurrentStep(1)
+        feedback.pushInfo(f"Computing statistics in {len(chunks)} chunks…")
+        written = 0
+        for index, results in chunking.run_chunks(
+            lambda chunk: reduce_chunk(image, reducer, keys, scale, chunk),
+            chunks,
+            steps,
+            checkpoint,
+            max_workers=max_workers,
+        ):
+            values = {int(row[0]): row[1:] for row in results}
+            request = QgsFeatureRequest().setFilterFids(list(values))
+            for feature in source.getFeatures(request):
+                output = QgsFeature(fields)
+                output.setGeometry(feature.geometry())
+                output.setAttributes(
+                    feature.attributes() + self._attributes(values[feature.id()])
+                )
+                sink.addFeature(output, QgsFeatureSink.Flag.FastInsert)
+                written += 1
+        if feedback.isCanceled():
+            raise RuntimeError("Canceled")
+
+        # Polygons without a geometry have nothing to reduce, but stay in the
+        # output with empty statistics
+        request = QgsFeatureRequest().setFilterFids(empty_ids)
+        for feature in source.getFeatures(request) if empty_ids else []:
+            output = QgsFeature(fields)
+            output.setGeometry(feature.geometry())
+            output.setAttributes(feature.attributes() + [None] * len(band_outputs))
+            sink.addFeature(output, QgsFeatureSink.Flag.FastInsert)
+            written += 1
+
+        checkpoint.remove()
+        feedback.pushInfo(f"Wrote statistics for {written} polygons.")
+        return {self.OUTPUT: dest_id}
+
+    @staticmethod
+    def _attributes(values: List[Any]) -> List[Any]:
+        return [
+            json.dumps(value) if isinstance(value, dict) else value for value in values
+        ]
+
+    @staticmethod
+    def _partition(
+        source,
+        context: QgsProcessingContext,
+        scale: float,
+        budgets: Tuple[float, float],
+        feedback: QgsProcessingFeedback,
+    ) -> Tuple[List[List[Tuple[int, str]]], List[int], str]:
+        """Split polygons into chunks by vertex count and area in pixels.
+
+        Geometries are kept as compact GeoJSON text. Also returns the ids of
+        the features with an empty geometry, which are left out of the chunks,
+        and a digest of every polygon, so a changed layer does not resume an
+        old checkpoint.
+        """
+        transform = QgsCoordinateTransform(
+            source.sourceCrs(),
+            QgsCoordinateReferenceSystem("EPSG:4326"),
+            context.transformContext(),
+        )
+        area = QgsDistanceArea()
+        area.setSourceCrs(source.sourceCrs(), context.transformContext())
+        area.setEllipsoid(context.ellipsoid() or "WGS84")
+        digest = hashlib.sha1(usedforsecurity=False)
+        total = max(source.featureCount(), 1)
+        empty_ids: List[int] = []
+
+        def items() -> Any:
+            for current, feature in enumerate(source.getFeatures()):
+                if feedback.isCanceled():
+                    raise RuntimeError("Canceled")
+                feedback.setProgress(100 * current / total)
+                geometry = feature.geometry()
+                if geometry.isEmpty():
+                    empty_ids.append(feature.id())
+                    continue
+                pixels = area.measureArea(geometry) / scale**2
+                vertices = geometry.constGet().nCoordinates()
+                geometry.transform(transform)
+                text = geometry.asJson(COORDINATE_DIGITS)
+                digest.update(f"{feature.id()}:{text}\n".encode("utf-8"))
+                yield (feature.id(), text), (vertices, pixels)
+
+        chunks = list(chunking.partition(items(), budgets, MAX_CHUNK_FEATURES))
+        return chunks, empty_ids, digest.hexdigest()
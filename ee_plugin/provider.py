@@ -10,8 +10,10 @@ import ee
 from qgis.core import (
     Qgis,
     QgsCoordinateReferenceSystem,
+    QgsCoordinateTransform,
     QgsDataProvider,
     QgsProviderMetadata,
+    QgsProject,
     QgsProviderRegistry,
     QgsRaster,
     QgsRasterDataProvider,
@@ -21,6 +23,8 @@ from qgis.core import (
 from qgis.PyQt.QtCore import QObject
 
 from . import Map
+from .pixel_blocks import pixel_cache
+from .vector_provider import EarthEngineVectorDataProvider
 
 BAND_TYPES = {
     "int8": Qgis.DataType.Int16,
@@ -244,14 +248,16 @@ class EarthEngineRasterDataProvider(QgsRasterDataProvider):
     def identify(
         self, point, format, boundingBox=None, width=None, height=None, dpi=None
     ):
-        dataset_projection = self.ee_info["bands"][0]["crs"]
-        point_ee = ee.Geometry.Point(
-            [point.x(), point.y()], self.crs().authid()
-        ).transform(dataset_projection)
-
-        reducer = ee.Reducer.first()
         scale = Map.getScale()
-        value = self.ee_object.reduceRegion(reducer, point_ee, scale).getInfo()
+        value = self._identify_pixel_block(point, scale)
+        if value is None:
+            dataset_projection = self.ee_info["bands"][0]["crs"]
+            point_ee = ee.Geometry.Point(
+                [point.x(), point.y()], self.crs().authid()
+            ).transform(dataset_projection)
+
+            reducer = ee.Reducer.first()
+            value = self.ee_object.reduceRegion(reducer, point_ee, scale).getInfo()
         band_indices = range(1, self.bandCount() + 1)
         band_names = [self.generateBandName(band_no) for band_no in band_indices]
         band_values = [value[band_name] for band_name in band_names]
@@ -263,6 +269,21 @@ class EarthEngineRasterDataProvider(QgsRasterDataProvider):
 
         return result
 
+    def _identify_pixel_block(self, point, scale):
+        transform = QgsCoordinateTransform(
+            self.crs(),
+            QgsCoordinateReferenceSystem("EPSG:4326"),
+            QgsProject.instance(),
+        )
+        try:
+            point_wgs84 = transform.transform(point)
+            return pixel_cache.identify(
+                self.ee_object, point_wgs84.x(), point_wgs84.y(), scale
+            )
+        except Exception as e:
+            logger.debug(f"Pixel block identify failed, using reduceRegion: {e}")
+            return None
+
     def lastErrorTitle(self):
         return self.wms.lastErrorTitle()
 
@@ -435,3 +456,11 @@ def register_data_provider():
     registry = QgsProviderRegistry.instance()
     registry.registerProvider(metadata)
     logger.info("EE provider registered")
+
+    vector_metadata = QgsProviderMetadata(
+        EarthEngineVectorDataProvider.providerKey(),
+        EarthEngineVectorDataProvider.description(),
+        EarthEngineVectorDataProvider.createProvider,
+    )
+    registry.registerProvider(vector_metadata)
+    logger.info("EE vector provider registered")
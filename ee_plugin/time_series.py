@@ -0,0 +1,177 @@
+"""Fetch per-point time series from the image collection behind a layer."""
+
+import hashlib
+import logging
+import math
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+import ee
+
+logger = logging.getLogger(__name__)
+
+# getRegion fails past 1,048,576 values; pages stay well below that even for
+# collections with dozens of bands.
+TIME_SERIES_PAGE_SIZE = 1000
+TIME_SERIES_MAX_WORKERS = 4
+TIME_SERIES_CACHE_SIZE = 32
+REGION_HEADER = ["id", "longitude", "latitude", "time"]
+
+CacheKey = Tuple[str, float, float, float]
+
+
+@dataclass
+class TimeSeries:
+    """Band values at one point, one entry per image date."""
+
+    bands: List[str]
+    times: List[int] = field(default_factory=list)
+    values: Dict[str, List[Optional[float]]] = field(default_factory=dict)
+
+    def __len__(self) -> int:
+        return len(self.times)
+
+
+def find_source_collection(ee_object: Any) -> Optional[ee.ImageCollection]:
+    """Return the image collection a composite image was computed from, if any."""
+    stack = [ee_object]
+    seen = set()
+    while stack:
+        current = stack.pop()
+        if id(current) in seen:
+            continue
+        seen.add(id(current))
+        if isinstance(current, ee.ImageCollection):
+            return current
+        if isinstance(current, ee.ComputedObject):
+            stack.extend((current.args or {}).values())
+        elif isinstance(current, dict):
+            stack.extend(current.values())
+        elif isinstance(current, (list, tuple)):
+            stack.extend(current)
+    return None
+
+
+def parse_region(rows: List[List[Any]]) -> TimeSeries:
+    """Turn getRegion rows into a series sorted by time, dropping the header."""
+    if not rows:
+        return TimeSeries(bands=[])
+    header, rows = rows[0], rows[1:]
+    bands = header[len(REGION_HEADER) :]
+    rows = sorted((row for row in rows if row[3] is not None), key=lambda r: r[3])
+    series = TimeSeries(bands=bands, values={band: [] for band in bands})
+    for row in rows:
+        series.times.append(int(row[3]))
+        for band, value in zip(bands, row[len(REGION_HEADER) :]):
+            series.values[band].append(value)
+    return series
+
+
+def merge_series(pages: List[TimeSeries]) -> TimeSeries:
+    pages = [page for page in pages if page.bands]
+    if not pages:
+        return TimeSeries(bands=[])
+    rows = [
+        [None, None, None, time] + [page.values[band][index] for band in page.bands]
+        for page in pages
+        for index, time in enumerate(page.times)
+    ]
+    return parse_region([REGION_HEADER + pages[0].bands] + rows)
+
+
+def date_windows(start: int, end: int, pages: int) -> List[Tuple[int, int]]:
+    """Split the millisecond range ``[start, end]`` into equal half-open windows."""
+    step = math.ceil((end + 1 - start) / pages)
+    return [
+        (window_start, min(window_start + step, end + 1))
+        for window_start in range(start, end + 1, step)
+    ]
+
+
+def fetch_time_series(
+    collection: ee.ImageCollection,
+    longitude: float,
+    latitude: float,
+    scale: float,
+    page_size: int = TIME_SERIES_PAGE_SIZE,
+    max_workers: int = TIME_SERIES_MAX_WORKERS,
+) -> TimeSeries:
+    """Fetch a point's series with one request, paging long series by date."""
+    point = ee.Geometry.Point([longitude, latitude], "EPSG:4326")
+    collection = collection.filterBounds(point)
+    size = collection.size()
+    info = ee.Dictionary(
+        {
+            "size": size,
+            "start": collection.aggregate_min("system:time_start"),
+            "end": collection.aggregate_max("system:time_start"),
+            # Short series come back with the summary; longer ones are paged
+            "region": ee.Algorithms.If(
+                size.lte(page_size), collection.getRegion(point, scale), None
+            ),
+        }
+    ).getInfo()
+    if info["size"] and info["start"] is None:
+        # getRegion rows without a time are dropped, so nothing would be left
+        raise ValueError("The images have no system:time_start to plot over time.")
+    if info["region"] is not None or not info["size"]:
+        return parse_region(info["region"] or [])
+
+    windows = date_windows(
+        int(info["start"]), int(info["end"]), math.ceil(info["size"] / page_size)
+    )
+    logger.debug(f"Fetching {info['size']} images in {len(windows)} date pages")
+
+    def fetch_page(window: Tuple[int, int]) -> TimeSeries:
+        page = collection.filterDate(ee.Date(window[0]), ee.Date(window[1]))
+        return parse_region(page.getRegion(point, scale).getInfo())
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(windows))) as executor:
+        return merge_series(list(executor.map(fetch_page, windows)))
+
+
+class TimeSeriesCache:
+    """LRU cache of series keyed by collection expression, point and scale."""
+
+    def __init__(self, max_entries: int = TIME_SERIES_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[CacheKey, TimeSeries]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(
+        collection: ee.ImageCollection, longitude: float, latitude: float, scale: float
+    ) -> CacheKey:
+        expression = ee.serializer.toJSON(collection).encode("utf-8")
+        return (
+            hashlib.sha1(expression, usedforsecurity=False).hexdigest(),
+            round(longitude, 6),
+            round(latitude, 6),
+            float(f"{scale:.6g}"),
+        )
+
+    def fetch(
+        self,
+        collection: ee.ImageCollection,
+        longitude: float,
+        latitude: float,
+        scale: float,
+    ) -> TimeSeries:
+        key = self.key(collection, longitude, latitude, scale)
+        with self._lock:
+            series = self._entries.get(key)
+            if series is not None:
+                self._entries.move_to_end(key)
+                return series
+        series = fetch_time_series(collection, longitude, latitude, scale)
+        with self._lock:
+            self._entries[key] = series
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return series
+
+
+time_series_cache = TimeSeriesCache()
@@ -3,6 +3,7 @@ from typing import List, Optional, Tuple, Union
 
 from qgis import gui
 from qgis.PyQt import QtCore
+from qgis.PyQt.QtGui import QColor, QPainter, QPen, QPolygonF
 from qgis.PyQt.QtWidgets import (
     QDialog,
     QDialogButtonBox,
@@ -18,6 +19,9 @@ from qgis.PyQt.QtWidgets import (
     QSlider,
     QLabel,
     QDoubleSpinBox,
+    QListWidget,
+    QListWidgetItem,
+    QCheckBox,
 )
 from qgis.gui import QgsCollapsibleGroupBox
 
@@ -355,6 +359,8 @@ class VisualizationParamsWidget(QWidget):
 
 
 class FilterWidget(gui.QgsCollapsibleGroupBox):
+    changed = QtCore.pyqtSignal()
+
     def __init__(
         self,
         title="Filter by Properties",
@@ -390,6 +396,9 @@ class FilterWidget(gui.QgsCollapsibleGroupBox):
             remove_button = QPushButton("Remove")
             remove_button.clicked.connect(lambda: self._remove_row(row_layout))
 
+            operator_input.currentIndexChanged.connect(lambda: self.changed.emit())
+            value_input.editingFinished.connect(lambda: self.changed.emit())
+
             row_layout.addWidget(name_input, 2)
             row_layout.addWidget(operator_input, 1)
             row_layout.addWidget(value_input, 2)
@@ -416,6 +425,7 @@ class FilterWidget(gui.QgsCollapsibleGroupBox):
             if widget:
                 widget.setParent(None)
         self.filter_rows_layout.removeItem(row_layout)
+        self.changed.emit()
 
     def set_property_list(self, props):
         self.property_list = props
@@ -429,3 +439,147 @@ class FilterWidget(gui.QgsCollapsibleGroupBox):
 
     def get_filter_rows_layout(self):
         return self.filter_rows_layout
+
+
+class PropertySelectionWidget(gui.QgsCollapsibleGroupBox):
+    """Checkable list of feature properties to keep; none checked keeps all."""
+
+    def __init__(
+        self,
+        title="Select Properties",
+        property_list=None,
+        parent=None,
+    ):
+        super().__init__(title, parent)
+        self.setCollapsed(True)
+        self.property_list = []
+
+        self.property_items = QListWidget()
+        self.property_items.setObjectName("properties")
+        self.property_items.setToolTip(
+            _(
+                "Only the checked properties are fetched. Leave all unchecked to keep every property."
+            )
+        )
+        self.as_vector = QCheckBox(
+            _("Download as vector layer"),
+            objectName="as_vector",
+            toolTip=_("Download the features instead of drawing them on the server."),
+        )
+        self.drop_geometry = QCheckBox(
+            _("Attributes only (drop geometry)"),
+            objectName="drop_geometry",
+            toolTip=_("Download an attribute table without geometries."),
+        )
+        self.drop_geometry.toggled.connect(self._on_drop_geometry_toggled)
+
+        layout = QVBoxLayout()
+        layout.addWidget(self.property_items)
+        layout.addWidget(self.as_vector)
+        layout.addWidget(self.drop_geometry)
+        self.setLayout(layout)
+        self.set_property_list(property_list or [])
+
+    def _on_drop_geometry_toggled(self, checked: bool):
+        # A table without geometry can only be downloaded
+        if checked:
+            self.as_vector.setChecked(True)
+        self.as_vector.setEnabled(not checked)
+
+    def set_property_list(self, props):
+        selected = set(self.selected_properties())
+        self.property_list = props
+        self.property_items.clear()
+        for prop in props:
+            item = QListWidgetItem(prop)
+            item.setFlags(item.flags() | QtCore.Qt.ItemFlag.ItemIsUserCheckable)
+            item.setCheckState(
+                QtCore.Qt.CheckState.Checked
+                if prop in selected
+                else QtCore.Qt.CheckState.Unchecked
+            )
+            self.property_items.addItem(item)
+
+    def selected_properties(self) -> List[str]:
+        return [
+            self.property_items.item(i).text()
+            for i in range(self.property_items.count())
+            if self.property_items.item(i).checkState() == QtCore.Qt.CheckState.Checked
+        ]
+
+
+class TimeSeriesPlot(QWidget):
+    """A minimal line chart of one band's values over time."""
+
+    MARGINS = (64, 12, 16, 28)  # left, top, right, bottom
+
+    def __init__(self, parent: Optional[QWidget] = None):
+        super().__init__(parent)
+        self.times: List[int] = []
+        self.values: List[Optional[float]] = []
+        self.setMinimumHeight(200)
+
+    def set_series(self, times: List[int], values: List[Optional[float]]) -> None:
+        """Plot ``values`` against millisecond ``times``; ``None`` leaves a gap."""
+        self.times = times
+        self.values = values
+        self.update()
+
+    def paintEvent(self, event) -> None:
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        points = [
+            (time, value)
+            for time, value in zip(self.times, self.values)
+            if isinstance(value, (int, float))
+        ]
+        if not points:
+            painter.drawText(
+                self.rect(), QtCore.Qt.AlignmentFlag.AlignCenter, _("No data")
+            )
+            return
+
+        left, top, right, bottom = self.MARGINS
+        width = max(1, self.width() - left - right)
+        height = max(1, self.height() - top - bottom)
+        t_min, t_max = points[0][0], points[-1][0]
+        v_min = min(value for time, value in points)
+        v_max = max(value for time, value in points)
+        t_span = (t_max - t_min) or 1
+        v_span = (v_max - v_min) or 1
+
+        def position(time: int, value: float) -> QtCore.QPointF:
+            return QtCore.QPointF(
+                left + (time - t_min) / t_span * width,
+                top + (v_max - value) / v_span * height,
+            )
+
+        painter.setPen(QPen(self.palette().mid().color()))
+        painter.drawLine(left, top, left, top + height)
+        painter.drawLine(left, top + height, left + width, top + height)
+        painter.setPen(QPen(self.palette().text().color()))
+        painter.drawText(4, top + 10, f"{v_max:.4g}")
+        painter.drawText(4, top + height, f"{v_min:.4g}")
+        for time, alignment in [
+            (t_min, QtCore.Qt.AlignmentFlag.AlignLeft),
+            (t_max, QtCore.Qt.AlignmentFlag.AlignRight),
+        ]:
+            label = (
+                QtCore.QDateTime.fromMSecsSinceEpoch(time, QtCore.Qt.TimeSpec.UTC)
+                .date()
+                .toString("yyyy-MM-dd")
+            )
+            painter.drawText(
+                QtCore.QRectF(left, top + height + 4, width, bottom - 4),
+                alignment,
+                label,
+            )
+
+        color = QColor(33, 150, 243)
+        painter.setPen(QPen(color, 2))
+        painter.drawPolyline(
+            QPolygonF([position(time, value) for time, value in points])
+        )
+        painter.setBrush(color)
+        for time, value in points:
+            painter.drawEllipse(position(time, value), 2.5, 2.5)
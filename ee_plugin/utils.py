@@ -13,13 +13,6 @@ import tempfile
 import logging
 from typing import Optional, TypedDict, Tuple, Any, List
 
-try:
-    import gzip
-
-    _GZIP_AVAILABLE = True
-except ImportError:
-    _GZIP_AVAILABLE = False
-
 import ee
 import qgis
 import requests
@@ -40,6 +33,8 @@ from qgis.core import (
     QgsSimpleFillSymbolLayer,
 )
 
+from . import vector, vector_provider
+
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.DEBUG)  # Change as needed (DEBUG/INFO/WARNING/ERROR)
@@ -50,6 +45,7 @@ EE_OBJECT_PROPERTY = "ee-object"
 EE_OBJECT_VIS_PROPERTY = "ee-object-vis"
 EE_ASSET_ID_PROPERTY = "ee-asset-id"
 EE_FEATURE_COLLECTION_OBJECT_PROPERTY = "ee-feature-collection-object"
+EE_FEATURE_COLLECTION_VIS_PROPERTY = "ee-feature-collection-vis"
 
 # --- Encoding-size helpers (module-level; used by tile_extent) ---
 
@@ -228,6 +224,12 @@ def is_ee_raster_layer(layer: QgsMapLayer) -> bool:
     )
 
 
+def is_ee_vector_layer(layer: QgsMapLayer) -> bool:
+    return bool(
+        is_ee_layer(layer) and layer.customProperty(EE_LAYER_TYPE_PROPERTY) == "vector"
+    )
+
+
 def is_ee_feature_collection_layer(layer: QgsMapLayer) -> bool:
     return bool(
         is_ee_layer(layer)
@@ -251,12 +253,18 @@ def get_ee_object_from_layer(layer: QgsMapLayer) -> Optional[ee.Element]:
 
 
 def set_ee_feature_collection_layer_source(
-    layer: QgsMapLayer, feature_collection: ee.FeatureCollection
+    layer: QgsMapLayer,
+    feature_collection: ee.FeatureCollection,
+    vis_params: Optional[VisualizeParams] = None,
 ) -> None:
     layer.setCustomProperty(
         EE_FEATURE_COLLECTION_OBJECT_PROPERTY,
         _serialize_ee_object(feature_collection),
     )
+    if vis_params is not None:
+        layer.setCustomProperty(
+            EE_FEATURE_COLLECTION_VIS_PROPERTY, json.dumps(vis_params)
+        )
 
 
 def get_ee_feature_collection_from_layer(
@@ -284,6 +292,7 @@ def add_or_update_ee_layer(
     opacity: float,
     add_to_project: bool = True,
     context: Optional[QgsProcessingContext] = None,
+    render_mode: Optional[str] = None,
 ) -> QgsMapLayer:
     logger.info(f"Adding/updating EE layer: {name}")
     if isinstance(eeObject, ee.Image):
@@ -291,14 +300,36 @@ def add_or_update_ee_layer(
             eeObject, name, vis_params, shown, opacity, add_to_project, context
         )
     elif isinstance(eeObject, ee.FeatureCollection):
-        if is_named_dataset(eeObject):
-            layer = add_or_update_named_vector_layer(
+        existing = get_layer_by_name(name) if add_to_project else None
+        if render_mode is None and existing is not None:
+            render_mode = existing.customProperty(vector.RENDER_MODE_PROPERTY)
+        render_mode = render_mode or vector.RENDER_AUTO
+        resolved_mode, cost = _resolve_feature_collection_render_mode(
+            eeObject, render_mode
+        )
+        if existing is not None and is_ee_layer(existing):
+            existing_type = existing.customProperty(EE_LAYER_TYPE_PROPERTY)
+            if existing_type != resolved_mode:
+                # A raster layer cannot switch its data source to a vector one
+                vector.cancel_page_loading(existing)
+                _cleanup_vector_source_path(existing.customProperty("ee-vector-source"))
+                QgsProject.instance().removeMapLayer(existing.id())
+        if resolved_mode == vector.RENDER_RASTER:
+            layer = add_or_update_styled_feature_collection_layer(
                 eeObject, name, vis_params, shown, opacity, add_to_project, context
             )
         else:
             layer = add_or_update_ee_vector_layer(
-                eeObject, name, vis_params, shown, opacity, add_to_project, context
+                eeObject,
+                name,
+                vis_params,
+                shown,
+                opacity,
+                add_to_project,
+                context,
+                cost=cost,
             )
+        layer.setCustomProperty(vector.RENDER_MODE_PROPERTY, render_mode)
     elif isinstance(eeObject, ee.Geometry):
         layer = add_or_update_ee_vector_layer(
             eeObject, name, vis_params, shown, opacity, add_to_project, context
@@ -484,6 +515,81 @@ def update_ee_image_layer(
     return layer
 
 
+def _resolve_feature_collection_render_mode(
+    feature_collection: ee.FeatureCollection, render_mode: str
+) -> Tuple[str, Optional[vector.CollectionCost]]:
+    # Also returns the estimated cost, when it was needed, for the download
+    if render_mode in (vector.RENDER_VECTOR, vector.RENDER_RASTER):
+        return render_mode, None
+    # Catalog tables are drawn on the server unless a mode was chosen
+    if is_named_dataset(feature_collection):
+        return vector.RENDER_RASTER, None
+    cost = vector.estimate_collection_cost(feature_collection)
+    mode = vector.choose_render_mode(cost)
+    logger.debug(
+        f"Estimated {cost.features} feature(s) and {cost.vertices} vertices, "
+        f"rendering as {mode}"
+    )
+    return mode, cost
+
+
+def switch_feature_collection_render_mode(
+    layer: QgsMapLayer, render_mode: str
+) -> QgsMapLayer:
+    """Re-add an EE feature collection layer as server-side tiles or local vectors.
+
+    ``render_mode`` is one of ``vector.RENDER_MODES``; the choice is kept
+    when the layer is refreshed.
+    """
+    if render_mode not in vector.RENDER_MODES:
+        raise ValueError(f"Unknown render mode: {render_mode}")
+    return _readd_feature_collection_layer(layer, render_mode)
+
+
+def switch_zoom_simplification(layer: QgsMapLayer, enabled: bool) -> QgsMapLayer:
+    """Re-add an EE vector layer with zoom simplification turned on or off.
+
+    See ``vector_provider.set_zoom_simplification``; the choice is kept when
+    the layer is refreshed.
+    """
+    if not is_ee_vector_layer(layer):
+        raise ValueError("Select an Earth Engine vector layer first.")
+    vector_provider.set_zoom_simplification(layer, enabled)
+    return _readd_feature_collection_layer(layer)
+
+
+def _readd_feature_collection_layer(
+    layer: QgsMapLayer, render_mode: Optional[str] = None
+) -> QgsMapLayer:
+    # Rebuilds the layer from the collection stored on it, keeping its
+    # render mode unless a new one is given
+    if not is_ee_layer(layer):
+        raise ValueError("Select an Earth Engine feature collection layer first.")
+    if layer.customProperty(EE_LAYER_TYPE_PROPERTY) == "raster":
+        feature_collection = get_ee_feature_collection_from_layer(layer)
+        vis_params = layer.customProperty(EE_FEATURE_COLLECTION_VIS_PROPERTY)
+    else:
+        feature_collection = get_ee_object_from_layer(layer)
+        vis_params = layer.customProperty(EE_OBJECT_VIS_PROPERTY)
+    if feature_collection is None or isinstance(
+        feature_collection, (ee.Image, ee.Geometry, ee.Feature)
+    ):
+        raise ValueError(f"Layer is not an EE feature collection: {layer.name()}")
+    # Deserialized collections may come back as generic computed objects
+    feature_collection = ee.FeatureCollection(feature_collection)
+
+    tree_layer = QgsProject.instance().layerTreeRoot().findLayer(layer.id())
+    shown = tree_layer.itemVisibilityChecked() if tree_layer else True
+    return add_or_update_ee_layer(
+        feature_collection,
+        json.loads(vis_params or "{}"),
+        layer.name(),
+        shown,
+        layer.opacity(),
+        render_mode=render_mode,
+    )
+
+
 def add_or_update_named_vector_layer(
     eeObject: ee.Element,
     name: str,
@@ -497,6 +603,21 @@ def add_or_update_named_vector_layer(
     table_id = eeObject.args.get("tableId", "")
     if not table_id:
         raise ValueError(f"FeatureCollection {name} does not have a valid tableId.")
+    return add_or_update_styled_feature_collection_layer(
+        eeObject, name, vis_params, shown, opacity, add_to_project, context
+    )
+
+
+def add_or_update_styled_feature_collection_layer(
+    eeObject: ee.FeatureCollection,
+    name: str,
+    vis_params: VisualizeParams,
+    shown: bool = True,
+    opacity: float = 1.0,
+    add_to_project: bool = True,
+    context: Optional[QgsProcessingContext] = None,
+) -> QgsRasterLayer:
+    logger.debug(f"Adding/updating styled EE feature collection layer: {name}")
     # Keys accepted by FeatureCollection.style() on the EE server side.
     # Client-side-only keys (lineColor, polygonFillColor, etc.) are silently
     # dropped here; they only take effect on the local vector path.
@@ -515,14 +636,14 @@ def add_or_update_named_vector_layer(
         layer = add_or_update_ee_raster_layer(
             image, name, {}, shown, opacity, add_to_project, context
         )
-        set_ee_feature_collection_layer_source(layer, eeObject)
+        set_ee_feature_collection_layer_source(layer, eeObject, vis_params)
         return layer
     else:
         image = ee.Image().paint(eeObject, 0, 2)
         layer = add_or_update_ee_raster_layer(
             image, name, {}, shown, opacity, add_to_project, context
         )
-        set_ee_feature_collection_layer_source(layer, eeObject)
+        set_ee_feature_collection_layer_source(layer, eeObject, vis_params)
         return layer
 
 
@@ -534,15 +655,18 @@ def add_or_update_ee_vector_layer(
     opacity: float = 1.0,
     add_to_project: bool = True,
     context: Optional[QgsProcessingContext] = None,
+    cost: Optional[vector.CollectionCost] = None,
 ) -> QgsVectorLayer:
     logger.debug(f"Adding/updating EE vector layer: {name}")
     layer = get_layer_by_name(name) if add_to_project else None
     if layer:
         if not layer.customProperty("ee-layer"):
             raise Exception(f"Layer is not an EE layer: {name}")
-        return update_ee_vector_layer(eeObject, layer, vis_params, shown, opacity)
+        return update_ee_vector_layer(
+            eeObject, layer, vis_params, shown, opacity, cost=cost
+        )
     return add_ee_vector_layer(
-        eeObject, name, vis_params, shown, opacity, add_to_project, context
+        eeObject, name, vis_params, shown, opacity, add_to_project, context, cost
     )
 
 
@@ -770,26 +894,68 @@ def _ee_object_to_geojson(eeObject: ee.Element) -> dict:
         raise ValueError("Unsupported EE object type: " + info["type"])
 
 
-def _write_geojson_temp_file(geojson: dict) -> str:
-    # Use gzip by default; fall back to plain .geojson if unavailable
-    compress = _GZIP_AVAILABLE
-    suffix = ".geojson.gz" if compress else ".geojson"
-    temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=suffix)
-    temp_file.close()  # close the fd so we can reopen it
-    if compress:
-        with gzip.open(temp_file.name, "wt", encoding="utf-8") as f:
-            json.dump(geojson, f)
-    else:
-        with open(temp_file.name, "w") as f:
-            json.dump(geojson, f)
-    return temp_file.name
+def _open_ee_vector_source(
+    eeObject: ee.Element,
+    track_changes: bool = False,
+    simplify: Optional[bool] = None,
+    cost: Optional[vector.CollectionCost] = None,
+) -> Tuple[str, str, Optional[vector.VectorDownload]]:
+    # Returns the layer URI, its provider key and the local download, if any.
+    # ``cost`` is reused when the render mode was already chosen by size, and
+    # ``simplify`` is the layer's vector_provider.zoom_simplification().
+    if not isinstance(eeObject, ee.FeatureCollection):
+        geojson = _ee_object_to_geojson(eeObject)
+        download = vector.VectorDownload(vector.write_features(geojson["features"]))
+        return download.uri, "ogr", download
+    if simplify:
+        return vector_provider.encode_uri(eeObject), vector_provider.PROVIDER_KEY, None
+    # Sized first, so collections browsed per tile are never fingerprinted or
+    # partly downloaded
+    cost = cost or vector.estimate_collection_cost(eeObject)
+    if cost.features > vector_provider.VIEWPORT_MIN_FEATURES and cost.has_geometry:
+        logger.debug(f"Fetching {cost.features} feature(s) by extent instead")
+        uri = vector_provider.encode_uri(eeObject, simplify=simplify is not False)
+        return uri, vector_provider.PROVIDER_KEY, None
+    # Collections are paged so the layer can be shown before every page arrives
+    download = vector.download_first_page(
+        eeObject, track_changes=track_changes, total=cost.features
+    )
+    return download.uri, "ogr", download
+
+
+def _refresh_ee_vector_source(eeObject: ee.Element, layer: QgsVectorLayer) -> bool:
+    # Edits the existing file in place; False means a full download is needed
+    source = layer.customProperty("ee-vector-source")
+    if not (
+        source
+        and isinstance(eeObject, ee.FeatureCollection)
+        and vector.is_incremental_refresh(layer)
+        and not vector_provider.is_zoom_simplification(layer)
+    ):
+        return False
+    try:
+        diff = vector.refresh_features(source, eeObject)
+    except Exception as e:
+        logger.warning(f"Incremental refresh of {layer.name()} failed: {e}")
+        return False
+    if diff is None:
+        return False
+    logger.debug(
+        f"Refreshed {layer.name()} in place: {len(diff.added)} added, "
+        f"{len(diff.changed)} changed, {len(diff.deleted)} deleted"
+    )
+    if not diff.is_empty:
+        layer.reload()
+        layer.updateExtents()
+        layer.triggerRepaint()
+    return True
 
 
 def _cleanup_vector_source_path(path: Optional[str]) -> None:
     if not path:
         return
     try:
-        os.remove(path)
+        vector.remove_vector_file(path)
         logger.debug(f"Cleaned up old vector source: {path}")
     except PermissionError:
         logger.warning(f"Could not remove old vector source (file locked): {path}")
@@ -805,18 +971,19 @@ def add_ee_vector_layer(
     opacity: float = 1.0,
     add_to_project: bool = True,
     context: Optional[QgsProcessingContext] = None,
+    cost: Optional[vector.CollectionCost] = None,
 ) -> QgsVectorLayer:
     logger.debug(f"Adding EE vector layer: {name}")
-    geojson = _ee_object_to_geojson(eeObject)
-    uri = _write_geojson_temp_file(geojson)
-    layer = QgsVectorLayer(uri, name, "ogr")
+    uri, provider_key, download = _open_ee_vector_source(eeObject, cost=cost)
+    layer = QgsVectorLayer(uri, name, provider_key)
     if not layer.isValid():
         raise RuntimeError(f"Failed to load vector layer: {name}")
     set_ee_layer_properties(layer, eeObject, vis_params or {}, layer_type="vector")
 
     _store_created_layer(layer, add_to_project, context)
     layer.setCustomProperty("ee-layer", True)
-    layer.setCustomProperty("ee-vector-source", uri)
+    if download is not None:
+        layer.setCustomProperty("ee-vector-source", download.path)
 
     if add_to_project and shown is not None:
         tree_layer = QgsProject.instance().layerTreeRoot().findLayer(layer.id())
@@ -834,6 +1001,8 @@ def add_ee_vector_layer(
     if vis_params:
         _apply_vector_style(layer, vis_params)
 
+    if download is not None:
+        vector.load_remaining_pages(layer, download)
     return layer
 
 
@@ -843,18 +1012,30 @@ def update_ee_vector_layer(
     vis_params: Optional[dict] = None,
     shown: bool = True,
     opacity: float = 1.0,
+    cost: Optional[vector.CollectionCost] = None,
 ) -> QgsVectorLayer:
     logger.debug(f"Updating EE vector layer: {layer.name()}")
-    geojson = _ee_object_to_geojson(eeObject)
-    uri = _write_geojson_temp_file(geojson)
-    old_source = layer.customProperty("ee-vector-source")
-    layer.setDataSource(uri, layer.name(), "ogr")
-    if not layer.isValid():
-        raise RuntimeError(f"Failed to reload vector layer: {layer.name()}")
+    vector.cancel_page_loading(layer)
+    download = None
+    if not _refresh_ee_vector_source(eeObject, layer):
+        uri, provider_key, download = _open_ee_vector_source(
+            eeObject,
+            track_changes=vector.is_incremental_refresh(layer),
+            simplify=vector_provider.zoom_simplification(layer),
+            cost=cost,
+        )
+        old_source = layer.customProperty("ee-vector-source")
+        layer.setDataSource(uri, layer.name(), provider_key)
+        if not layer.isValid():
+            raise RuntimeError(f"Failed to reload vector layer: {layer.name()}")
+
+        _cleanup_vector_source_path(old_source)
+        if download is not None:
+            layer.setCustomProperty("ee-vector-source", download.path)
+        else:
+            layer.removeCustomProperty("ee-vector-source")
 
-    _cleanup_vector_source_path(old_source)
     set_ee_layer_properties(layer, eeObject, vis_params or {}, layer_type="vector")
-    layer.setCustomProperty("ee-vector-source", uri)
     renderer = layer.renderer()
     if renderer and renderer.symbol() and opacity is not None:
         renderer.symbol().setOpacity(opacity)
@@ -867,6 +1048,8 @@ def update_ee_vector_layer(
         if tree_node:
             tree_node.setItemVisibilityChecked(shown)
 
+    if download is not None:
+        vector.load_remaining_pages(layer, download)
     return layer
 
 
@@ -0,0 +1,841 @@
+"""Download Earth Engine feature collections to local vector files."""
+
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+import ee
+import requests
+from osgeo import gdal
+from qgis.core import QgsApplication, QgsSettings, QgsTask, QgsVectorLayer
+from qgis.PyQt.QtCore import pyqtSignal
+
+logger = logging.getLogger(__name__)
+
+# getInfo() aborts once a collection query accumulates more than 5000 elements,
+# so pages stay well below that limit.
+VECTOR_PAGE_SIZE = 2000
+VECTOR_MAX_WORKERS = 4
+VECTOR_LAYER_NAME = "features"
+VECTOR_STREAM_CHUNK_SIZE = 1 << 16
+# (connect, read) seconds; the table is generated before the first byte arrives
+VECTOR_STREAM_TIMEOUT = (30, 600)
+
+# FlatGeobuf builds its packed R-tree once, when the file is written, and
+# cannot be appended to; collections that need more than one page go to a
+# GeoPackage instead, whose rtree index is maintained as pages are inserted.
+FLATGEOBUF = "FlatGeobuf"
+GEOPACKAGE = "GPKG"
+VECTOR_FORMAT_SUFFIXES = {FLATGEOBUF: ".fgb", GEOPACKAGE: ".gpkg"}
+
+FEATURE_ID_FIELD = "system:index"
+# Carries the id through table downloads, which are not guaranteed to keep it
+STREAM_ID_PROPERTY = "ee_plugin_id"
+FINGERPRINT_PROPERTY = "ee_fingerprint"
+FINGERPRINTS_SUFFIX = ".fingerprints.json"
+INCREMENTAL_REFRESH_PROPERTY = "ee-vector-incremental"
+# Past this share of changed features a full download is cheaper than
+# filtering the collection by id.
+INCREMENTAL_MAX_CHANGED_RATIO = 0.5
+
+# How a feature collection is drawn depends on its estimated size, which is
+# fetched once and shared by both decisions:
+# - up to vector_provider.VIEWPORT_MIN_FEATURES it is downloaded whole;
+# - above that, vectors are fetched per map tile around the visible extent;
+# - over either limit below, auto mode draws it as server-side styled tiles
+#   instead. Choosing vector mode still fetches it per map tile.
+# Both limits can be overridden in the QGIS settings.
+VECTOR_MAX_FEATURES_SETTING = "ee_plugin/vector_max_features"
+VECTOR_MAX_VERTICES_SETTING = "ee_plugin/vector_max_vertices"
+DEFAULT_VECTOR_MAX_FEATURES = 200000
+DEFAULT_VECTOR_MAX_VERTICES = 5000000
+COST_SAMPLE_SIZE = 100
+
+RENDER_MODE_PROPERTY = "ee-render-mode"
+RENDER_AUTO = "auto"
+RENDER_VECTOR = "vector"
+RENDER_RASTER = "raster"
+RENDER_MODES = (RENDER_AUTO, RENDER_VECTOR, RENDER_RASTER)
+
+TIME_START_PROPERTY = "system:time_start"
+# Long enough for a dialog and the algorithm it runs to share one lookup,
+# short enough that edits to an asset show up on the next run.
+SUMMARY_CACHE_SECONDS = 300
+SUMMARY_CACHE_SIZE = 64
+
+# Fingerprint digests code each character by its position in this string;
+# every other character shares a single code.
+_DIGEST_ALPHABET = "".join(chr(code) for code in range(32, 127))
+_page_tasks: Dict[str, "FeatureCollectionPageTask"] = {}
+_summary_cache: "OrderedDict[str, Tuple[float, CollectionSummary]]" = OrderedDict()
+_summary_cache_lock = threading.Lock()
+
+
+@dataclass
+class VectorDownload:
+    """A local vector file that may still be missing some collection pages."""
+
+    path: str
+    feature_collection: Optional[ee.FeatureCollection] = None
+    loaded: int = 0
+    total: int = 0
+    page_size: int = VECTOR_PAGE_SIZE
+    fingerprints: Optional[Dict[str, str]] = None
+    loaded_ids: Set[str] = field(default_factory=set)
+    has_geometry: bool = True
+
+    @property
+    def is_complete(self) -> bool:
+        return self.loaded >= self.total
+
+    @property
+    def uri(self) -> str:
+        return f"{self.path}|layername={VECTOR_LAYER_NAME}"
+
+
+def fetch_feature_page(
+    feature_collection: ee.FeatureCollection,
+    offset: int,
+    page_size: int = VECTOR_PAGE_SIZE,
+) -> List[Dict[str, Any]]:
+    """Fetch one slice of a feature collection as GeoJSON feature dicts."""
+    return feature_collection.toList(page_size, offset).getInfo()
+
+
+def page_offsets(total: int, page_size: int, start: int = 0) -> List[int]:
+    """Return the offsets of the pages still needed to cover ``total`` features."""
+    return list(range(start, total, page_size))
+
+
+def select_properties(
+    feature_collection: ee.FeatureCollection,
+    properties: Optional[List[str]] = None,
+    retain_geometry: bool = True,
+) -> ee.FeatureCollection:
+    """Keep only ``properties`` (all when empty) and optionally drop geometry, server-side."""
+    if not properties and retain_geometry:
+        return feature_collection
+    # An empty selector list would drop every property, not keep them all
+    return feature_collection.select(properties or [".*"], None, retain_geometry)
+
+
+@dataclass
+class CollectionCost:
+    """Estimated size of a feature collection download."""
+
+    features: int
+    vertices: int
+
+    @property
+    def has_geometry(self) -> bool:
+        # Only collections selected without geometry have no vertices
+        return self.vertices > 0
+
+
+def _vertex_count(feature: ee.Feature) -> ee.Feature:
+    geometry = feature.geometry()
+    vertices = ee.Algorithms.If(
+        geometry, geometry.coordinates().flatten().length().divide(2), 0
+    )
+    return feature.set("ee_vertices", vertices)
+
+
+def estimate_collection_cost(
+    feature_collection: ee.FeatureCollection, sample_size: int = COST_SAMPLE_SIZE
+) -> CollectionCost:
+    """Count features and extrapolate vertices from a sample, in a single request."""
+    count = feature_collection.size()
+    sample = feature_collection.limit(sample_size).map(_vertex_count)
+    mean_vertices = ee.Number(sample.aggregate_mean("ee_vertices"))
+    info = ee.Dictionary(
+        {
+            "features": count,
+            "vertices": ee.Algorithms.If(
+                count, mean_vertices.multiply(count).round(), 0
+            ),
+        }
+    ).getInfo()
+    return CollectionCost(int(info["features"]), int(info["vertices"] or 0))
+
+
+@dataclass
+class CollectionSummary:
+    """Feature count and first-feature property names of a collection."""
+
+    count: int
+    properties: List[str]
+    has_time_start: bool
+
+
+def summarize_feature_collection(
+    feature_collection: ee.FeatureCollection,
+    max_age: float = SUMMARY_CACHE_SECONDS,
+) -> CollectionSummary:
+    """Fetch the count and property names of a collection in a single request.
+
+    Results are cached for ``max_age`` seconds per serialized collection, so
+    callers describing the same collection share one round trip. Only the
+    ``SUMMARY_CACHE_SIZE`` most recently used collections are kept.
+    """
+    key = ee.serializer.toJSON(feature_collection)
+    now = time.monotonic()
+    with _summary_cache_lock:
+        cached = _summary_cache.get(key)
+        if cached and now - cached[0] < max_age:
+            _summary_cache.move_to_end(key)
+            return cached[1]
+        if cached:
+            del _summary_cache[key]
+
+    count = feature_collection.size()
+    names = ee.Algorithms.If(
+        count, ee.Feature(feature_collection.first()).propertyNames(), ee.List([])
+    )
+    info = ee.Dictionary({"count": count, "names": names}).getInfo()
+    names = info["names"] or []
+    summary = CollectionSummary(
+        count=int(info["count"]),
+        # Matches Feature.toDictionary(), which leaves out system properties
+        properties=sorted(name for name in names if not name.startswith("system:")),
+        has_time_start=TIME_START_PROPERTY in names,
+    )
+    with _summary_cache_lock:
+        _summary_cache[key] = (now, summary)
+        _summary_cache.move_to_end(key)
+        while len(_summary_cache) > SUMMARY_CACHE_SIZE:
+            _summary_cache.popitem(last=False)
+    return summary
+
+
+def clear_summary_cache() -> None:
+    with _summary_cache_lock:
+        _summary_cache.clear()
+
+
+def vector_cost_limits() -> CollectionCost:
+    """Return the largest collection that is still downloaded as vectors."""
+    settings = QgsSettings()
+    return CollectionCost(
+        features=settings.value(
+            VECTOR_MAX_FEATURES_SETTING, DEFAULT_VECTOR_MAX_FEATURES, type=int
+        ),
+        vertices=settings.value(
+            VECTOR_MAX_VERTICES_SETTING, DEFAULT_VECTOR_MAX_VERTICES, type=int
+        ),
+    )
+
+
+def choose_render_mode(
+    cost: CollectionCost, limits: Optional[CollectionCost] = None
+) -> str:
+    """Pick raster tiles for collections over either limit, vectors otherwise."""
+    limits = limits or vector_cost_limits()
+    if cost.features > limits.features or cost.vertices > limits.vertices:
+        return RENDER_RASTER
+    return RENDER_VECTOR
+
+
+def choose_vector_format(feature_count: int, page_size: int = VECTOR_PAGE_SIZE) -> str:
+    """Pick the indexed OGR format for a download of ``feature_count`` features."""
+    return FLATGEOBUF if feature_count <= page_size else GEOPACKAGE
+
+
+def download_first_page(
+    feature_collection: ee.FeatureCollection,
+    page_size: int = VECTOR_PAGE_SIZE,
+    track_changes: bool = False,
+    total: Optional[int] = None,
+) -> VectorDownload:
+    """Write the first page to a new file, fetching the collection size alongside it.
+
+    Pass ``total`` when the size is already known to skip that request. With
+    ``track_changes`` the file is always an editable GeoPackage and the
+    feature fingerprints used by :func:`refresh_features` are fetched as well;
+    if they cannot be, the file is written without them and the next refresh
+    downloads it in full again.
+    """
+    fingerprints = None
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        # Fingerprints are requested before any feature, so a change that
+        # lands mid-download is picked up again by the next refresh.
+        if track_changes:
+            fingerprints_future = pool.submit(
+                fetch_fingerprints, feature_collection, total
+            )
+        if total is None:
+            size_future = pool.submit(lambda: feature_collection.size().getInfo())
+        page_future = pool.submit(fetch_feature_page, feature_collection, 0, page_size)
+        features = page_future.result()
+        if total is None:
+            total = size_future.result()
+        if track_changes:
+            try:
+                fingerprints = fingerprints_future.result()
+            except Exception as e:
+                logger.warning(f"Could not fetch feature fingerprints: {e}")
+
+    total = max(total, len(features))
+    has_geometry = any(feature.get("geometry") for feature in features)
+    if track_changes or not has_geometry:
+        # Attribute-only tables also need GeoPackage, which has aspatial layers
+        driver = GEOPACKAGE
+    else:
+        driver = choose_vector_format(total, page_size)
+    path = write_features(features, driver)
+    logger.debug(f"Downloaded first {len(features)} of {total} feature(s) to {path}")
+    return VectorDownload(
+        path=path,
+        feature_collection=feature_collection,
+        loaded=len(features),
+        total=total,
+        page_size=page_size,
+        fingerprints=fingerprints,
+        loaded_ids={feature["id"] for feature in features if "id" in feature},
+        has_geometry=has_geometry,
+    )
+
+
+def write_features(features: List[Dict[str, Any]], driver: str = FLATGEOBUF) -> str:
+    """Write features to a new spatially indexed file in a temporary location."""
+    fd, path = tempfile.mkstemp(suffix=VECTOR_FORMAT_SUFFIXES[driver])
+    os.close(fd)
+    # OGR creates the dataset itself and refuses to overwrite an empty GeoPackage
+    os.remove(path)
+    _translate_features(
+        path,
+        features,
+        format=driver,
+        layerName=VECTOR_LAYER_NAME,
+        layerCreationOptions=["SPATIAL_INDEX=YES"],
+    )
+    return path
+
+
+def append_features(path: str, features: List[Dict[str, Any]]) -> None:
+    """Append features to a GeoPackage written by :func:`write_features`."""
+    _translate_features(
+        path,
+        features,
+        layerName=VECTOR_LAYER_NAME,
+        accessMode="append",
+        addFields=True,
+    )
+
+
+def with_feature_id(feature: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy the Earth Engine id of a GeoJSON feature into its properties."""
+    # OGR drops string GeoJSON ids, so keep the EE id as an attribute
+    if "id" not in feature:
+        return feature
+    properties = dict(feature.get("properties") or {})
+    properties[FEATURE_ID_FIELD] = feature["id"]
+    return {**feature, "properties": properties}
+
+
+def _translate_features(
+    path: str, features: List[Dict[str, Any]], **options: Any
+) -> None:
+    source = f"/vsimem/ee_plugin_{uuid.uuid4().hex}.geojson"
+    geojson = {
+        "type": "FeatureCollection",
+        "features": [with_feature_id(feature) for feature in features],
+    }
+    gdal.FileFromMemBuffer(source, json.dumps(geojson).encode("utf-8"))
+    # Pages may mix single and multi-part geometries of the same kind; tables
+    # selected without geometry are written as aspatial layers.
+    if any(feature.get("geometry") for feature in features):
+        geometry_type = "PROMOTE_TO_MULTI"
+    else:
+        geometry_type = "NONE"
+    try:
+        dataset = gdal.VectorTranslate(
+            path, source, geometryType=geometry_type, **options
+        )
+        if dataset is None:
+            raise RuntimeError(f"Failed to write {path}: {gdal.GetLastErrorMsg()}")
+        # Dropping the dataset flushes the features and the spatial index
+        dataset = None
+    finally:
+        gdal.Unlink(source)
+
+
+def delete_features(path: str, feature_ids: List[str]) -> None:
+    """Delete features from a GeoPackage by their Earth Engine id."""
+    if not feature_ids:
+        return
+    dataset = gdal.OpenEx(path, gdal.OF_VECTOR | gdal.OF_UPDATE)
+    if dataset is None:
+        raise RuntimeError(f"Failed to open {path}: {gdal.GetLastErrorMsg()}")
+    layer = dataset.GetLayerByName(VECTOR_LAYER_NAME)
+    definition = layer.GetLayerDefn()
+    # Only the id column is read to find the features, which are then
+    # deleted by FID; no id is ever written into SQL
+    layer.SetIgnoredFields(
+        [
+            definition.GetFieldDefn(index).GetName()
+            for index in range(definition.GetFieldCount())
+            if definition.GetFieldDefn(index).GetName() != FEATURE_ID_FIELD
+        ]
+        + ["OGR_GEOMETRY", "OGR_STYLE"]
+    )
+    deleted = set(feature_ids)
+    fids = [
+        feature.GetFID()
+        for feature in layer
+        if feature.GetField(FEATURE_ID_FIELD) in deleted
+    ]
+    layer.SetIgnoredFields([])
+    layer.StartTransaction()
+    for fid in fids:
+        layer.DeleteFeature(fid)
+    layer.CommitTransaction()
+    dataset = None
+
+
+def _text_digest(text: ee.String) -> ee.List:
+    # Length and Fletcher-style sums of the character codes, computed on the
+    # server so only a few numbers per feature are sent back
+    alphabet = ee.String(_DIGEST_ALPHABET)
+    codes = text.split("").map(lambda char: alphabet.index(char).add(2))
+    length = text.length()
+    weights = ee.Array(ee.List.sequence(length, 1, -1))
+    return ee.List(
+        [length, codes.reduce(ee.Reducer.sum()), ee.Array(codes).dotProduct(weights)]
+    )
+
+
+def _fingerprint(feature: ee.Feature) -> ee.Feature:
+    # Properties are compared through a digest of their JSON; geometry through
+    # a few cheap measures rather than its full coordinate list.
+    geometry = feature.geometry()
+    measures = ee.Algorithms.If(
+        geometry,
+        ee.List(
+            [
+                geometry.area(1),
+                geometry.perimeter(1),
+                geometry.centroid(1).coordinates(),
+            ]
+        ),
+        None,
+    )
+    summary = ee.List(
+        [_text_digest(ee.String.encodeJSON(feature.toDictionary())), measures]
+    )
+    return feature.select([], None, False).set(
+        FINGERPRINT_PROPERTY, ee.String.encodeJSON(summary)
+    )
+
+
+def fetch_fingerprints(
+    feature_collection: ee.FeatureCollection,
+    total: Optional[int] = None,
+    page_size: int = VECTOR_PAGE_SIZE,
+    max_workers: int = VECTOR_MAX_WORKERS,
+) -> Dict[str, str]:
+    """Return a short digest of every feature keyed by its Earth Engine id.
+
+    The digests are computed server-side and fetched a page of ids at a time.
+    """
+    if total is None:
+        total = feature_collection.size().getInfo()
+    fingerprints = feature_collection.map(_fingerprint)
+
+    def fetch_page(offset: int) -> Dict[str, str]:
+        page = ee.FeatureCollection(fingerprints.toList(page_size, offset))
+        return ee.Dictionary.fromLists(
+            page.aggregate_array(FEATURE_ID_FIELD),
+            page.aggregate_array(FINGERPRINT_PROPERTY),
+        ).getInfo()
+
+    result: Dict[str, str] = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        for page in pool.map(fetch_page, page_offsets(total, page_size)):
+            result.update(page)
+    return result
+
+
+def fingerprints_path(path: str) -> str:
+    return f"{path}{FINGERPRINTS_SUFFIX}"
+
+
+def load_fingerprints(path: str) -> Optional[Dict[str, str]]:
+    """Read the fingerprints stored next to a downloaded file, if any."""
+    try:
+        with open(fingerprints_path(path), encoding="utf-8") as file_obj:
+            return json.load(file_obj)
+    except (OSError, ValueError):
+        return None
+
+
+def save_fingerprints(path: str, fingerprints: Dict[str, str]) -> None:
+    with open(fingerprints_path(path), "w", encoding="utf-8") as file_obj:
+        json.dump(fingerprints, file_obj)
+
+
+@dataclass
+class FeatureDiff:
+    """Feature ids that differ between two fingerprint snapshots."""
+
+    added: List[str] = field(default_factory=list)
+    changed: List[str] = field(default_factory=list)
+    deleted: List[str] = field(default_factory=list)
+
+    @property
+    def is_empty(self) -> bool:
+        return not (self.added or self.changed or self.deleted)
+
+
+def diff_fingerprints(old: Dict[str, str], new: Dict[str, str]) -> FeatureDiff:
+    """Compare the stored fingerprints with the ones currently on the server."""
+    return FeatureDiff(
+        added=[feature_id for feature_id in new if feature_id not in old],
+        changed=[
+            feature_id
+            for feature_id, fingerprint in new.items()
+            if feature_id in old and old[feature_id] != fingerprint
+        ],
+        deleted=[feature_id for feature_id in old if feature_id not in new],
+    )
+
+
+def fetch_features_by_id(
+    feature_collection: ee.FeatureCollection,
+    feature_ids: List[str],
+    page_size: int = VECTOR_PAGE_SIZE,
+    max_workers: int = VECTOR_MAX_WORKERS,
+) -> List[Dict[str, Any]]:
+    """Download only the listed features, a page at a time in parallel."""
+    if not feature_ids:
+        return []
+    selected = feature_collection.filter(
+        ee.Filter.inList(FEATURE_ID_FIELD, feature_ids)
+    )
+    offsets = page_offsets(len(feature_ids), page_size)
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        pages = pool.map(
+            lambda offset: fetch_feature_page(selected, offset, page_size), offsets
+        )
+        return [feature for page in pages for feature in page]
+
+
+def refresh_features(
+    path: str, feature_collection: ee.FeatureCollection
+) -> Optional[FeatureDiff]:
+    """Bring a GeoPackage in line with ``feature_collection`` by editing only what changed.
+
+    Returns None when the file has no stored fingerprints or when so much has
+    changed that a full download is the better option.
+    """
+    old = load_fingerprints(path)
+    if old is None:
+        return None
+    new = fetch_fingerprints(feature_collection)
+    diff = diff_fingerprints(old, new)
+    fetch_ids = diff.added + diff.changed
+    if len(fetch_ids) > INCREMENTAL_MAX_CHANGED_RATIO * max(len(new), 1):
+        return None
+    if diff.is_empty:
+        return diff
+
+    try:
+        features = fetch_features_by_id(feature_collection, fetch_ids)
+        delete_features(path, diff.changed + diff.deleted)
+        if features:
+            append_features(path, features)
+    except Exception:
+        # The file no longer matches its fingerprints; force a full refresh
+        os.remove(fingerprints_path(path))
+        raise
+    save_fingerprints(path, new)
+    return diff
+
+
+def is_incremental_refresh(layer: QgsVectorLayer) -> bool:
+    return bool(layer.customProperty(INCREMENTAL_REFRESH_PROPERTY, False))
+
+
+def set_incremental_refresh(layer: QgsVectorLayer, enabled: bool = True) -> None:
+    """Refresh ``layer`` by applying feature-level changes instead of re-downloading.
+
+    Takes effect from the next full download of the layer, which records the
+    fingerprints later refreshes are compared against.
+    """
+    layer.setCustomProperty(INCREMENTAL_REFRESH_PROPERTY, enabled)
+
+
+def remove_vector_file(path: str) -> None:
+    """Delete a downloaded vector file along with its sidecar files."""
+    os.remove(path)
+    for sidecar in (f"{path}-wal", f"{path}-shm", fingerprints_path(path)):
+        if os.path.exists(sidecar):
+            os.remove(sidecar)
+
+
+def finish_download(download: VectorDownload) -> None:
+    """Record the fingerprints of a fully downloaded, change-tracked file."""
+    if download.fingerprints is not None:
+        save_fingerprints(download.path, download.fingerprints)
+
+
+_JSON_TOKENS = re.compile(rb'["\\{}\[\]]')
+_QUOTE, _BACKSLASH = ord('"'), ord("\\")
+_OPENERS = (ord("{"), ord("["))
+_FEATURES_KEY = b"features"
+
+
+class FeatureStreamScanner:
+    """Split the features array out of a GeoJSON FeatureCollection as it streams in.
+
+    Only brackets, quotes and escapes are inspected, so coordinates pass
+    through without being parsed, and at most one feature is buffered.
+    """
+
+    def __init__(self):
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._in_features = False
+        self._key: Optional[bytearray] = None
+        self._last_key = b""
+        self._item: Optional[bytearray] = None
+
+    def feed(self, chunk: bytes) -> List[bytes]:
+        """Consume the next chunk and return the raw JSON of every completed feature."""
+        completed = []
+        size = len(chunk)
+        pos = 0
+        if self._escaped and size:
+            self._escaped = False
+            pos = 1
+        item_start = 0 if self._item is not None else None
+        key_start = 0 if self._key is not None else None
+
+        while True:
+            match = _JSON_TOKENS.search(chunk, pos)
+            if match is None:
+                break
+            index = match.start()
+            token = chunk[index]
+            pos = index + 1
+
+            if self._in_string:
+                if token == _BACKSLASH:
+                    if pos < size:
+                        pos += 1
+                    else:
+                        self._escaped = True
+                elif token == _QUOTE:
+                    self._in_string = False
+                    if key_start is not None:
+                        self._key += chunk[key_start:index]
+                        self._last_key = bytes(self._key)
+                        self._key, key_start = None, None
+                continue
+
+            if token == _QUOTE:
+                self._in_string = True
+                if self._depth == 1:
+                    # Top-level keys and values; the last one names the next array
+                    self._key, key_start = bytearray(), pos
+            elif token in _OPENERS:
+                self._depth += 1
+                if self._in_features and self._depth == 3:
+                    self._item, item_start = bytearray(), index
+                elif self._depth == 2 and self._last_key == _FEATURES_KEY:
+                    self._in_features = True
+            else:
+                if self._in_features and self._depth == 3 and item_start is not None:
+                    self._item += chunk[item_start:pos]
+                    completed.append(bytes(self._item))
+                    self._item, item_start = None, None
+                elif self._in_features and self._depth == 2:
+                    self._in_features = False
+                self._depth -= 1
+
+        if item_start is not None:
+            self._item += chunk[item_start:]
+        if key_start is not None:
+            self._key += chunk[key_start:]
+        return completed
+
+
+def iter_geojson_features(chunks: Iterable[bytes]) -> Iterator[Dict[str, Any]]:
+    """Yield features one at a time from a streamed GeoJSON FeatureCollection."""
+    scanner = FeatureStreamScanner()
+    for chunk in chunks:
+        for raw_feature in scanner.feed(chunk):
+            yield json.loads(raw_feature)
+
+
+def stream_feature_collection(
+    feature_collection: ee.FeatureCollection,
+) -> Iterator[Dict[str, Any]]:
+    """Download a collection as one GeoJSON table and yield its features as they arrive."""
+    url = feature_collection.getDownloadURL(filetype="geojson")
+    with requests.get(url, stream=True, timeout=VECTOR_STREAM_TIMEOUT) as response:
+        response.raise_for_status()
+        yield from iter_geojson_features(
+            response.iter_content(chunk_size=VECTOR_STREAM_CHUNK_SIZE)
+        )
+
+
+def remaining_features(download: VectorDownload) -> ee.FeatureCollection:
+    """Return the features of ``download`` that are not in its file yet.
+
+    The first page is excluded on the server by ``system:index``, which is the
+    id ``toList()`` reports, so the table download never repeats it. Each
+    feature also carries its id in ``STREAM_ID_PROPERTY``.
+    """
+    feature_collection = download.feature_collection
+    if download.loaded_ids:
+        loaded = ee.Filter.inList(FEATURE_ID_FIELD, sorted(download.loaded_ids))
+        feature_collection = feature_collection.filter(loaded.Not())
+    return feature_collection.map(
+        lambda feature: feature.set(STREAM_ID_PROPERTY, feature.get(FEATURE_ID_FIELD))
+    )
+
+
+def with_stream_id(feature: Dict[str, Any]) -> Dict[str, Any]:
+    """Restore the id of a feature from a :func:`remaining_features` download."""
+    properties = dict(feature.get("properties") or {})
+    feature_id = properties.pop(STREAM_ID_PROPERTY, None)
+    feature = {**feature, "properties": properties}
+    if feature_id is not None:
+        feature["id"] = feature_id
+    return feature
+
+
+class FeatureCollectionPageTask(QgsTask):
+    """Stream the rest of a feature collection into its file, a page at a time.
+
+    A single table download of the features after the first page replaces
+    one toList() query per page, fetched in parallel before. Each of those had
+    the server walk the collection up to its offset again.
+    """
+
+    pageLoaded = pyqtSignal(int, int)
+
+    def __init__(self, description: str, download: VectorDownload):
+        super().__init__(description, QgsTask.Flag.CanCancel)
+        self.download = download
+        self.error: Optional[str] = None
+        # Held while the file is written, so stop() can wait for the write
+        self._write_lock = threading.Lock()
+
+    def run(self) -> bool:
+        download = self.download
+        page: List[Dict[str, Any]] = []
+        try:
+            for feature in stream_feature_collection(remaining_features(download)):
+                if self.isCanceled():
+                    return False
+                page.append(with_stream_id(feature))
+                if len(page) >= download.page_size:
+                    if not self._append_page(page):
+                        return False
+                    page = []
+            if page and not self._append_page(page):
+                return False
+            with self._write_lock:
+                if self.isCanceled():
+                    return False
+                finish_download(download)
+            return True
+        except Exception as exc:
+            self.error = str(exc)
+            return False
+
+    def stop(self) -> None:
+        """Cancel the task and wait until it is no longer writing to the file."""
+        self.cancel()
+        with self._write_lock:
+            pass
+
+    def _append_page(self, features: List[Dict[str, Any]]) -> bool:
+        download = self.download
+        with self._write_lock:
+            # The file may already be removed once the task is canceled
+            if self.isCanceled():
+                return False
+            append_features(download.path, features)
+        download.loaded += len(features)
+        self.setProgress(100 * download.loaded / max(download.total, 1))
+        self.pageLoaded.emit(download.loaded, download.total)
+        return True
+
+    def finished(self, ok: bool) -> None:
+        if ok or self.isCanceled():
+            return
+        logger.warning(
+            f"{self.description()} stopped after {self.download.loaded} of "
+            f"{self.download.total} feature(s): {self.error}"
+        )
+
+
+def load_remaining_pages(
+    layer: QgsVectorLayer, download: VectorDownload
+) -> Optional[FeatureCollectionPageTask]:
+    """Fill ``layer`` in the background with the pages ``download`` is missing."""
+    cancel_page_loading(layer)
+    if download.is_complete:
+        finish_download(download)
+        return None
+
+    layer_id = layer.id()
+    task = FeatureCollectionPageTask(f"Loading {layer.name()}", download)
+
+    def _refresh(loaded: int, total: int) -> None:
+        try:
+            layer.reload()
+            layer.updateExtents()
+            layer.triggerRepaint()
+        except RuntimeError:
+            # The layer was deleted while pages were still arriving.
+            task.cancel()
+            return
+        logger.debug(f"Loaded {loaded} of {total} feature(s) into {layer_id}")
+
+    def _cancel() -> None:
+        cancel_page_loading(layer)
+
+    def _forget() -> None:
+        if _page_tasks.get(layer_id) is task:
+            del _page_tasks[layer_id]
+        try:
+            layer.willBeDeleted.disconnect(_cancel)
+        except (RuntimeError, TypeError):
+            # The layer is already deleted or was never connected
+            pass
+
+    task.pageLoaded.connect(_refresh)
+    task.taskCompleted.connect(_forget)
+    task.taskTerminated.connect(_forget)
+    layer.willBeDeleted.connect(_cancel)
+    _page_tasks[layer_id] = task
+    QgsApplication.taskManager().addTask(task)
+    return task
+
+
+def cancel_page_loading(layer: QgsVectorLayer) -> None:
+    """Stop any background page download that is still filling ``layer``.
+
+    Returns once the task no longer writes to the layer's file, so the file
+    can be replaced or removed.
+    """
+    task = _page_tasks.pop(layer.id(), None)
+    if task is None:
+        return
+    try:
+        task.stop()
+    except RuntimeError:
+        logger.debug("Page loading task was already deleted.")
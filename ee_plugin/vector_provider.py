@@ -0,0 +1,627 @@
+# -*- coding: utf-8 -*-
+"""
+Vector data provider that fetches Earth Engine features for the visible extent
+"""
+
+import json
+import logging
+import math
+import os
+import shutil
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Set, Tuple
+from urllib.parse import parse_qs, quote
+
+import ee
+from qgis.core import (
+    Qgis,
+    QgsAbstractFeatureIterator,
+    QgsApplication,
+    QgsAbstractFeatureSource,
+    QgsCoordinateReferenceSystem,
+    QgsCoordinateTransform,
+    QgsCsException,
+    QgsDataProvider,
+    QgsFeature,
+    QgsFeatureIterator,
+    QgsFeatureRequest,
+    QgsField,
+    QgsFields,
+    QgsRectangle,
+    QgsTask,
+    QgsVectorDataProvider,
+    QgsVectorLayer,
+    QgsWkbTypes,
+)
+from qgis.PyQt.QtCore import QCoreApplication, QThread, QVariant
+
+from . import chunking, geojson, vector
+
+logger = logging.getLogger(__name__)
+
+PROVIDER_KEY = "EE_VECTOR"
+# Collections larger than this are browsed per tile instead of downloaded whole;
+# see vector.py for how it relates to the limits of auto render mode
+VIEWPORT_MIN_FEATURES = 50000
+# Tiles are squares of 360 / 2**level degrees
+TILE_MIN_LEVEL = 2
+TILE_MAX_LEVEL = 16
+# Stays below the 5000 element limit of a single getInfo() collection query
+MAX_TILE_FEATURES = 4000
+# A full tile is fetched as its four children instead, down this many levels;
+# tiles still full after that are cut at MAX_TILE_FEATURES with a warning
+TILE_SPLIT_LEVELS = 2
+TILE_SPLIT_WORKERS = 2
+TILE_CACHE_SIZE = 256
+# Fetched tiles are also kept on disk, one directory per collection, and
+# fetched again once they are older than this
+TILE_DISK_CACHE_DIR = os.path.join(tempfile.gettempdir(), "ee_plugin_tiles")
+TILE_DISK_CACHE_SECONDS = 24 * 3600
+# Simplification aims at about one screen pixel of a tile drawn at this size;
+# the finest level is always fetched at full detail.
+TILE_PIXELS = 256
+METERS_PER_DEGREE = 111320
+SIMPLIFY_PROPERTY = "ee-vector-simplify"
+
+TileKey = Tuple[int, int, int]
+WORLD = QgsRectangle(-180, -90, 180, 90)
+
+
+def encode_uri(feature_collection: ee.FeatureCollection, simplify: bool = True) -> str:
+    """Build a provider URI that carries the serialized collection."""
+    serialized = quote(ee.serializer.toJSON(feature_collection), safe="")
+    return f"ee_object={serialized}&simplify={int(simplify)}"
+
+
+def decode_uri(uri: str) -> Tuple[ee.FeatureCollection, bool]:
+    """Return the collection and whether its tiles are simplified."""
+    params = parse_qs(uri)
+    serialized = params.get("ee_object", [""])[0]
+    simplify = params.get("simplify", ["1"])[0] == "1"
+    return ee.FeatureCollection(ee.deserializer.fromJSON(serialized)), simplify
+
+
+def zoom_simplification(layer: QgsVectorLayer) -> Optional[bool]:
+    """Return the simplification chosen for ``layer``, or ``None`` if unset.
+
+    Unset layers are fetched per tile, simplified, only when the collection
+    is too large to download.
+    """
+    enabled = layer.customProperty(SIMPLIFY_PROPERTY)
+    return None if enabled is None else bool(enabled)
+
+
+def is_zoom_simplification(layer: QgsVectorLayer) -> bool:
+    return zoom_simplification(layer) is True
+
+
+def is_simplified(layer: QgsVectorLayer) -> bool:
+    """Return whether ``layer`` is drawn from tiles simplified to the zoom."""
+    return layer.providerType() == PROVIDER_KEY and decode_uri(layer.source())[1]
+
+
+def set_zoom_simplification(layer: QgsVectorLayer, enabled: bool = True) -> None:
+    """Choose whether ``layer`` is fetched per tile, simplified to the zoom level.
+
+    ``True`` fetches even small collections this way. ``False`` downloads small
+    collections and fetches the tiles of large ones at full detail. Takes effect from the next refresh of the layer; use
+    ``utils.switch_zoom_simplification`` to apply it right away.
+    """
+    layer.setCustomProperty(SIMPLIFY_PROPERTY, enabled)
+
+
+def tile_level(extent: QgsRectangle) -> int:
+    """Pick the level whose tiles are between half and all of the extent's span."""
+    span = max(extent.width(), extent.height())
+    if span <= 0:
+        return TILE_MAX_LEVEL
+    level = math.ceil(math.log2(360 / span))
+    return min(max(level, TILE_MIN_LEVEL), TILE_MAX_LEVEL)
+
+
+def tile_size(level: int) -> float:
+    return 360 / 2**level
+
+
+def tile_tolerance(level: int) -> float:
+    """Return the simplification error in meters for tiles at ``level``."""
+    if level >= TILE_MAX_LEVEL:
+        return 0
+    return tile_size(level) * METERS_PER_DEGREE / TILE_PIXELS
+
+
+def tiles_for_extent(extent: QgsRectangle, level: int) -> List[TileKey]:
+    """Return the keys of the tiles at ``level`` that cover ``extent``."""
+    extent = extent.intersect(WORLD)
+    if extent.isNull():
+        return []
+    size = tile_size(level)
+    columns = math.ceil(360 / size)
+    rows = math.ceil(180 / size)
+    first_col = min(int((extent.xMinimum() + 180) // size), columns - 1)
+    last_col = min(int((extent.xMaximum() + 180) // size), columns - 1)
+    first_row = min(int((extent.yMinimum() + 90) // size), rows - 1)
+    last_row = min(int((extent.yMaximum() + 90) // size), rows - 1)
+    return [
+        (level, col, row)
+        for row in range(first_row, last_row + 1)
+        for col in range(first_col, last_col + 1)
+    ]
+
+
+def child_tiles(key: TileKey) -> List[TileKey]:
+    """Return the four tiles one level down that make up tile ``key``."""
+    level, col, row = key
+    return [(level + 1, 2 * col + dx, 2 * row + dy) for dy in (0, 1) for dx in (0, 1)]
+
+
+def tile_extent(key: TileKey) -> QgsRectangle:
+    level, col, row = key
+    size = tile_size(level)
+    return QgsRectangle(
+        -180 + col * size,
+        -90 + row * size,
+        min(-180 + (col + 1) * size, 180),
+        min(-90 + (row + 1) * size, 90),
+    )
+
+
+class TileCache:
+    """Least recently used cache of fetched tiles, shared across threads.
+
+    Also hands out the QGIS feature ids, so a feature keeps its id when it is
+    fetched again as part of another tile.
+    """
+
+    def __init__(self, max_tiles: int = TILE_CACHE_SIZE):
+        self.max_tiles = max_tiles
+        self._tiles: "OrderedDict[TileKey, List[QgsFeature]]" = OrderedDict()
+        self._feature_ids: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def feature_id(self, ee_id: str) -> int:
+        with self._lock:
+            return self._feature_ids.setdefault(ee_id, len(self._feature_ids) + 1)
+
+    def get(self, key: TileKey) -> Optional[List[QgsFeature]]:
+        with self._lock:
+            features = self._tiles.get(key)
+            if features is not None:
+                self._tiles.move_to_end(key)
+            return features
+
+    def put(self, key: TileKey, features: List[QgsFeature]) -> None:
+        with self._lock:
+            self._tiles[key] = features
+            self._tiles.move_to_end(key)
+            while len(self._tiles) > self.max_tiles:
+                self._tiles.popitem(last=False)
+
+    def features(self) -> List[QgsFeature]:
+        with self._lock:
+            tiles = list(self._tiles.values())
+        return [feature for features in tiles for feature in features]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._tiles.clear()
+
+
+class DiskTileCache:
+    """Fetched tiles of one collection as GeoJSON files, kept across sessions."""
+
+    def __init__(
+        self,
+        key: str,
+        directory: str = TILE_DISK_CACHE_DIR,
+        max_age: float = TILE_DISK_CACHE_SECONDS,
+    ):
+        self.directory = os.path.join(directory, key)
+        self.max_age = max_age
+
+    def _path(self, key: TileKey) -> str:
+        return os.path.join(self.directory, "{}_{}_{}.json".format(*key))
+
+    def get(self, key: TileKey) -> Optional[List[Dict[str, Any]]]:
+        path = self._path(key)
+        try:
+            if time.time() - os.path.getmtime(path) > self.max_age:
+                return None
+            with open(path, encoding="utf-8") as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return None
+
+    def put(self, key: TileKey, infos: List[Dict[str, Any]]) -> None:
+        path = self._path(key)
+        # Written under another name first, so a reader never sees half a tile
+        partial = f"{path}.{threading.get_ident()}.partial"
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(partial, "w", encoding="utf-8") as file:
+                json.dump(infos, file)
+            os.replace(partial, path)
+        except OSError as e:
+            logger.debug(f"Could not cache tile {key} on disk: {e}")
+
+    def clear(self) -> None:
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+def prune_disk_cache(
+    directory: str = TILE_DISK_CACHE_DIR, max_age: float = TILE_DISK_CACHE_SECONDS
+) -> None:
+    """Remove the cached tiles of collections not fetched from for ``max_age``."""
+    try:
+        entries = list(os.scandir(directory))
+    except OSError:
+        return
+    for entry in entries:
+        try:
+            if time.time() - entry.stat().st_mtime > max_age:
+                shutil.rmtree(entry.path, ignore_errors=True)
+        except OSError:
+            continue
+
+
+def fetch_tile_infos(
+    feature_collection: ee.FeatureCollection,
+    key: TileKey,
+    tolerance: float = 0,
+    splits: int = TILE_SPLIT_LEVELS,
+) -> List[Dict[str, Any]]:
+    """Download the GeoJSON features that intersect one tile.
+
+    A tile with more than ``MAX_TILE_FEATURES`` features comes back empty
+    from one request, and is fetched as its children instead.
+    """
+    extent = tile_extent(key)
+    region = ee.Geometry.Rectangle(
+        [
+            extent.xMinimum(),
+            extent.yMinimum(),
+            extent.xMaximum(),
+            extent.yMaximum(),
+        ],
+        "EPSG:4326",
+        False,
+    )
+    collection = feature_collection.filterBounds(region)
+    features = collection
+    if tolerance:
+        # Children keep the tolerance of the tile that was asked for
+        features = collection.map(lambda feature: feature.simplify(tolerance))
+    if not splits or key[0] >= TILE_MAX_LEVEL:
+        infos = features.toList(MAX_TILE_FEATURES + 1).getInfo()
+        if len(infos) > MAX_TILE_FEATURES:
+            logger.warning(
+                f"Only {MAX_TILE_FEATURES} features are shown in part of the map "
+                f"around {extent.center().toString(2)}; zoom in to "
+                "see every feature there."
+            )
+        return infos[:MAX_TILE_FEATURES]
+
+    is_full = collection.limit(MAX_TILE_FEATURES + 1).size().gt(MAX_TILE_FEATURES)
+    infos = ee.Algorithms.If(
+        is_full, None, features.toList(MAX_TILE_FEATURES)
+    ).getInfo()
+    if infos is not None:
+        return infos
+    logger.debug(f"Tile {key} is full, fetching its children")
+    # Tiles are already fetched in parallel, so children only add a little
+    with ThreadPoolExecutor(max_workers=TILE_SPLIT_WORKERS) as pool:
+        parts = pool.map(
+            lambda child: fetch_tile_infos(
+                feature_collection, child, tolerance, splits - 1
+            ),
+            child_tiles(key),
+        )
+        # Features across the children's borders are returned by each of them
+        merged: Dict[str, Dict[str, Any]] = {}
+        for part in parts:
+            for info in part:
+                merged.setdefault(info.get("id", ""), info)
+    return list(merged.values())
+
+
+def _on_gui_thread() -> bool:
+    app = QCoreApplication.instance()
+    return app is not None and QThread.currentThread() == app.thread()
+
+
+class TileFetchTask(QgsTask):
+    """Fetch tiles asked for on the GUI thread, which only gets cached tiles."""
+
+    def __init__(self, provider: "EarthEngineVectorDataProvider", keys: List[TileKey]):
+        super().__init__("Loading Earth Engine features", QgsTask.Flag.CanCancel)
+        self.provider = provider
+        self.keys = keys
+        self.error: Optional[str] = None
+
+    def run(self) -> bool:
+        try:
+            self.provider.fetch_tiles(self.keys)
+        except Exception as e:
+            self.error = str(e)
+            return False
+        return True
+
+    def finished(self, ok: bool) -> None:
+        try:
+            self.provider.tiles_fetched(self, ok)
+        except RuntimeError:
+            # The layer was removed while its tiles were loading
+            pass
+
+
+class EarthEngineFeatureIterator(QgsAbstractFeatureIterator):
+    def __init__(self, source: "EarthEngineFeatureSource", request: QgsFeatureRequest):
+        super().__init__(request)
+        self._request = request if request is not None else QgsFeatureRequest()
+        self._source = source
+        self._features: List[QgsFeature] = []
+        self._index = 0
+        self._transform = QgsCoordinateTransform()
+        destination_crs = self._request.destinationCrs()
+        if destination_crs.isValid() and destination_crs != source.crs:
+            self._transform = QgsCoordinateTransform(
+                source.crs, destination_crs, self._request.transformContext()
+            )
+        try:
+            filter_rect = self.filterRectToSourceCrs(self._transform)
+        except QgsCsException:
+            self.close()
+            return
+        self._features = self._select_features(filter_rect)
+
+    def _select_features(self, filter_rect: QgsRectangle) -> List[QgsFeature]:
+        request = self._request
+        if request.filterType() == QgsFeatureRequest.FilterType.FilterFid:
+            fids = {request.filterFid()}
+        elif request.filterType() == QgsFeatureRequest.FilterType.FilterFids:
+            fids = set(request.filterFids())
+        else:
+            fids = None
+
+        if fids is None and not filter_rect.isNull():
+            candidates = self._source.provider.features_in_extent(filter_rect)
+        else:
+            # Without an extent only what has already been browsed is available
+            candidates = self._source.provider.cache.features()
+
+        selected: Dict[int, QgsFeature] = {}
+        for feature in candidates:
+            if fids is not None and feature.id() not in fids:
+                continue
+            if (
+                not filter_rect.isNull()
+                and not feature.geometry().boundingBox().intersects(filter_rect)
+            ):
+                continue
+            selected[feature.id()] = feature
+        return list(selected.values())
+
+    def fetchFeature(self, f: QgsFeature) -> bool:
+        if self._index < 0 or self._index >= len(self._features):
+            f.setValid(False)
+            return False
+        feature = self._features[self._index]
+        self._index += 1
+        f.setId(feature.id())
+        f.setFields(self._source.fields)
+        f.setAttributes(feature.attributes())
+        f.setGeometry(feature.geometry())
+        self.geometryToDestinationCrs(f, self._transform)
+        f.setValid(True)
+        return True
+
+    def __iter__(self):
+        self._index = 0
+        return self
+
+    def __next__(self) -> QgsFeature:
+        feature = QgsFeature()
+        if not self.nextFeature(feature):
+            raise StopIteration
+        return feature
+
+    def rewind(self) -> bool:
+        self._index = 0
+        return True
+
+    def close(self) -> bool:
+        self._index = -1
+        return True
+
+
+class EarthEngineFeatureSource(QgsAbstractFeatureSource):
+    def __init__(self, provider: "EarthEngineVectorDataProvider"):
+        super().__init__()
+        self.provider = provider
+        self.fields = provider.fields()
+        self.crs = provider.crs()
+
+    def getFeatures(self, request: QgsFeatureRequest) -> QgsFeatureIterator:
+        return QgsFeatureIterator(EarthEngineFeatureIterator(self, request))
+
+
+class EarthEngineVectorDataProvider(QgsVectorDataProvider):
+    """Serve a feature collection from tiles fetched with ``filterBounds``."""
+
+    def __init__(
+        self,
+        uri: str = "",
+        providerOptions: QgsDataProvider.ProviderOptions = QgsDataProvider.ProviderOptions(),
+        flags: QgsDataProvider.ReadFlags = QgsDataProvider.ReadFlags(),
+    ):
+        super().__init__(uri)
+        self._uri = uri
+        self._valid = False
+        self._fields = QgsFields()
+        self._wkb_type = Qgis.WkbType.Unknown
+        self.cache = TileCache()
+        self.disk_cache = DiskTileCache(chunking.job_key(uri))
+        self._tile_tasks: List[TileFetchTask] = []
+        self._pending_tiles: Set[TileKey] = set()
+        self.ee_object: Optional[ee.FeatureCollection] = None
+        self.simplify = True
+        prune_disk_cache()
+        try:
+            self.ee_object, self.simplify = decode_uri(uri)
+            self._read_schema()
+            self._valid = True
+        except Exception as e:
+            logger.warning(f"Could not open EE feature collection: {e}")
+
+    @classmethod
+    def description(cls) -> str:
+        return "Google Earth Engine Vector Data Provider"
+
+    @classmethod
+    def providerKey(cls) -> str:
+        return PROVIDER_KEY
+
+    @classmethod
+    def createProvider(cls, uri, providerOptions, flags=QgsDataProvider.ReadFlags()):
+        return EarthEngineVectorDataProvider(uri, providerOptions, flags)
+
+    def _read_schema(self) -> None:
+        first = self.ee_object.limit(1).getInfo()
+        features = first.get("features", [])
+        for name, field_type in geojson.property_types(features).items():
+            self._fields.append(QgsField(name, field_type))
+        if features:
+            geometry = geojson.geometry_from_geojson(features[0].get("geometry"))
+            self._wkb_type = QgsWkbTypes.multiType(geometry.wkbType())
+        if self._fields.indexOf(vector.FEATURE_ID_FIELD) < 0:
+            self._fields.append(QgsField(vector.FEATURE_ID_FIELD, QVariant.String))
+
+    def fetch_tile(self, key: TileKey) -> List[QgsFeature]:
+        """Read one tile from disk, or download it, as QGIS features."""
+        infos = self.disk_cache.get(key)
+        if infos is None:
+            # Tiles are cached per level, so each tolerance is fetched only once
+            tolerance = tile_tolerance(key[0]) if self.simplify else 0
+            infos = fetch_tile_infos(self.ee_object, key, tolerance)
+            self.disk_cache.put(key, infos)
+        features = geojson.to_qgs_features(infos, self._fields)
+        id_index = self._fields.indexOf(vector.FEATURE_ID_FIELD)
+        for info, feature in zip(infos, features):
+            feature.setId(self.cache.feature_id(info.get("id", "")))
+            if "id" in info:
+                feature.setAttribute(id_index, info["id"])
+            geometry = feature.geometry()
+            if not geometry.isNull() and QgsWkbTypes.isMultiType(self._wkb_type):
+                geometry.convertToMultiType()
+                feature.setGeometry(geometry)
+        return features
+
+    def fetch_tiles(self, keys: List[TileKey]) -> Dict[TileKey, List[QgsFeature]]:
+        """Fetch tiles concurrently and add them to the memory cache."""
+        with ThreadPoolExecutor(max_workers=vector.VECTOR_MAX_WORKERS) as pool:
+            tiles = dict(zip(keys, pool.map(self.fetch_tile, keys)))
+        for key, features in tiles.items():
+            self.cache.put(key, features)
+        return tiles
+
+    def tiles_fetched(self, task: TileFetchTask, ok: bool) -> None:
+        self._tile_tasks.remove(task)
+        self._pending_tiles.difference_update(task.keys)
+        if ok:
+            self.dataChanged.emit()
+        elif not task.isCanceled():
+            logger.warning(f"Could not load Earth Engine features: {task.error}")
+
+    def features_in_extent(self, extent: QgsRectangle) -> List[QgsFeature]:
+        """Return features for ``extent``, fetching only the tiles not yet cached.
+
+        Map rendering runs on worker threads, which wait for the missing
+        tiles. On the GUI thread, for example when identifying or selecting
+        features, the cached tiles are returned at once and the missing ones
+        are fetched in a background task; ``dataChanged`` is emitted when
+        they arrive.
+        """
+        keys = tiles_for_extent(extent, tile_level(extent))
+        tiles = {key: self.cache.get(key) for key in keys}
+        missing = [key for key, features in tiles.items() if features is None]
+        if missing and _on_gui_thread():
+            missing = [key for key in missing if key not in self._pending_tiles]
+            if missing:
+                task = TileFetchTask(self, missing)
+                self._pending_tiles.update(missing)
+                self._tile_tasks.append(task)
+                QgsApplication.taskManager().addTask(task)
+        elif missing:
+            tiles.update(self.fetch_tiles(missing))
+        return [
+            feature
+            for features in tiles.values()
+            if features is not None
+            for feature in features
+        ]
+
+    def featureSource(self) -> EarthEngineFeatureSource:
+        return EarthEngineFeatureSource(self)
+
+    def getFeatures(self, request: QgsFeatureRequest = QgsFeatureRequest()):
+        return QgsFeatureIterator(
+            EarthEngineFeatureIterator(EarthEngineFeatureSource(self), request)
+        )
+
+    def dataSourceUri(self, expandAuthConfig: bool = True) -> str:
+        return self._uri
+
+    def storageType(self) -> str:
+        return "Google Earth Engine feature collection"
+
+    def wkbType(self):
+        return self._wkb_type
+
+    def featureCount(self) -> int:
+        # Qgis.FeatureCountState.UnknownCount; the collection may be huge
+        return -1
+
+    def fields(self) -> QgsFields:
+        return self._fields
+
+    def capabilities(self):
+        return QgsVectorDataProvider.Capability.SelectAtId
+
+    def name(self) -> str:
+        return self.providerKey()
+
+    def extent(self) -> QgsRectangle:
+        return QgsRectangle(WORLD)
+
+    def updateExtents(self) -> None:
+        pass
+
+    def isValid(self) -> bool:
+        return self._valid
+
+    def crs(self) -> QgsCoordinateReferenceSystem:
+        return QgsCoordinateReferenceSystem("EPSG:4326")
+
+    def reloadProviderData(self) -> None:
+        # Refreshing the layer fetches every tile again
+        self.cache.clear()
+        self.disk_cache.clear()
+
+    def subsetString(self) -> str:
+        return ""
+
+    def supportsSubsetString(self) -> bool:
+        return False
+
+    def unload(self) -> None:
+        self.cache.clear()
+
+    def handlePostCloneOperations(self, source: QgsVectorDataProvider) -> None:
+        # Clones share the tiles already fetched by the original provider
+        if isinstance(source, EarthEngineVectorDataProvider):
+            self.cache = source.cache
+            self.disk_cache = source.disk_cache
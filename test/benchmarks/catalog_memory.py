@@ -0,0 +1,138 @@
+"""Measure the memory held by a large loaded catalog.
+
+Writes synthetic catalog items to the official catalog's TSV format and parses
+them back, so repeated values are separate strings as they are when read from
+the network. Compares the memory of the parsed items with items kept in a
+plain dataclass as before, of the search index, and of one set of filtered
+results held as items or as an array of positions. Run from the repository
+root with::
+
+    python -m test.benchmarks.catalog_memory --counts 10000 100000
+"""
+
+import argparse
+import csv
+import gc
+import io
+import tracemalloc
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Tuple
+
+from ee_plugin.catalog.client import (
+    OFFICIAL_SOURCE,
+    _normalize_asset_type,
+    _split_keywords,
+    parse_official_catalog_tsv,
+)
+from ee_plugin.catalog.search import CatalogIndex
+
+from .catalog_search import synthetic_items
+
+DEFAULT_COUNTS = [10_000, 100_000]
+TSV_COLUMNS = ["id", "title", "type", "provider", "category", "keywords", "license"]
+
+
+@dataclass
+class PlainCatalogItem:
+    """A catalog item as it was stored before it was made compact."""
+
+    title: str
+    asset_id: str
+    asset_type: str
+    source: str = OFFICIAL_SOURCE
+    provider: str = ""
+    category: str = ""
+    keywords: List[str] = field(default_factory=list)
+    start_date: str = ""
+    end_date: str = ""
+    url: str = ""
+    catalog_url: str = ""
+    license: str = ""
+    license_text: str = ""
+    sample_code_url: str = ""
+    thumbnail_url: str = ""
+
+
+def catalog_tsv(count: int) -> str:
+    output = io.StringIO()
+    writer = csv.writer(output, delimiter="\t", lineterminator="\n")
+    writer.writerow(TSV_COLUMNS)
+    for item in synthetic_items(count):
+        type_name = {"ImageCollection": "image_collection", "Image": "image"}
+        writer.writerow(
+            [
+                item.asset_id,
+                item.title,
+                type_name.get(item.asset_type, "table"),
+                item.provider,
+                item.category,
+                ", ".join(item.keywords),
+                item.license,
+            ]
+        )
+    return output.getvalue()
+
+
+def parse_plain_items(text: str) -> List[PlainCatalogItem]:
+    return [
+        PlainCatalogItem(
+            title=row["title"].strip(),
+            asset_id=row["id"].strip(),
+            asset_type=_normalize_asset_type(row["type"]),
+            provider=row["provider"].strip(),
+            category=row["category"].strip(),
+            keywords=_split_keywords(row["keywords"]),
+            license=row["license"].strip(),
+        )
+        for row in csv.DictReader(text.splitlines(), delimiter="\t")
+    ]
+
+
+def allocated(build: Callable[[], Any]) -> Tuple[Any, float]:
+    """Return what ``build`` returns and the megabytes it still holds."""
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, size / 2**20
+
+
+def benchmark(count: int) -> Dict[str, float]:
+    text = catalog_tsv(count)
+    _, plain_mb = allocated(lambda: parse_plain_items(text))
+    items, items_mb = allocated(lambda: parse_official_catalog_tsv(text))
+    index, index_mb = allocated(lambda: CatalogIndex(items))
+    _, list_mb = allocated(lambda: index.search())
+    _, ids_mb = allocated(lambda: index.search_ids())
+    return {
+        "plain_items_mb": plain_mb,
+        "items_mb": items_mb,
+        "index_mb": index_mb,
+        "result_list_mb": list_mb,
+        "result_ids_mb": ids_mb,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--counts", type=int, nargs="+", default=DEFAULT_COUNTS)
+    args = parser.parse_args()
+
+    columns = [
+        "plain_items_mb",
+        "items_mb",
+        "index_mb",
+        "result_list_mb",
+        "result_ids_mb",
+    ]
+    print(f"{'items':>7} " + " ".join(f"{c:>15}" for c in columns))
+    for count in args.counts:
+        results = benchmark(count)
+        values = " ".join(f"{results[c]:>15.2f}" for c in columns)
+        print(f"{count:>7} {values}", flush=True)
+
+
+if __name__ == "__main__":
+    main()
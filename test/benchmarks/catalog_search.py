@@ -0,0 +1,214 @@
+"""Time catalog searches over a large synthetic catalog.
+
+Builds official and community catalog items with realistic titles, asset IDs,
+providers and keywords, then times building the search index and searching it
+for queries typed one character at a time, with and without facet filters. Each
+search is timed from scratch, and refining the previous keystroke's matches
+with the same index rebuilt; the scan over every item that the search replaced
+is timed for comparison. Run
+from the repository root with::
+
+    python -m test.benchmarks.catalog_search --counts 5000 50000
+"""
+
+import argparse
+import random
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from ee_plugin.catalog.client import COMMUNITY_SOURCE, OFFICIAL_SOURCE, CatalogItem
+from ee_plugin.catalog.search import CatalogIndex
+
+DEFAULT_COUNTS = [5_000, 50_000]
+ASSET_TYPES = ["Image", "ImageCollection", "FeatureCollection"]
+WORDS = [
+    "global",
+    "surface",
+    "reflectance",
+    "sentinel",
+    "landsat",
+    "modis",
+    "elevation",
+    "precipitation",
+    "temperature",
+    "land",
+    "cover",
+    "forest",
+    "water",
+    "soil",
+    "moisture",
+    "vegetation",
+    "index",
+    "daily",
+    "monthly",
+    "annual",
+    "population",
+    "nighttime",
+    "lights",
+    "emissions",
+    "ocean",
+    "color",
+    "snow",
+    "ice",
+    "fire",
+    "burned",
+    "area",
+    "crop",
+    "mangroves",
+    "wetlands",
+    "urban",
+    "roads",
+    "boundaries",
+    "climate",
+    "reanalysis",
+    "radar",
+]
+QUERIES = ["sentinel surface", "land cover", "copernicus/s2", "precip"]
+
+
+def synthetic_items(count: int, seed: int = 0) -> List[CatalogItem]:
+    """Return ``count`` items, a tenth of them from the community catalog."""
+    rng = random.Random(seed)
+    # Mostly rare words, as in real titles and tags, plus the common ones
+    vocabulary = WORDS + [
+        "".join(rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(7))
+        for _ in range(20_000)
+    ]
+    providers = [f"Provider {index}" for index in range(400)]
+    categories = [f"Category {index}" for index in range(40)]
+    items = []
+    for index in range(count):
+        words = rng.sample(WORDS, 1) + rng.sample(vocabulary, 3)
+        provider = rng.choice(providers)
+        prefix = provider.replace(" ", "_").upper()
+        items.append(
+            CatalogItem(
+                title=f"{' '.join(words).title()} {index}",
+                asset_id=f"{prefix}/{'_'.join(words)}/{index}",
+                asset_type=rng.choice(ASSET_TYPES),
+                source=COMMUNITY_SOURCE if index % 10 == 0 else OFFICIAL_SOURCE,
+                provider=provider,
+                category=rng.choice(categories),
+                keywords=rng.sample(vocabulary, 6),
+                license="CC-BY-4.0",
+            )
+        )
+    # A well known dataset to search for by ID
+    items.append(
+        CatalogItem(
+            "Sentinel-2 MSI: Surface Reflectance",
+            "COPERNICUS/S2_SR_HARMONIZED",
+            "ImageCollection",
+            provider="European Union/ESA/Copernicus",
+        )
+    )
+    return items
+
+
+def scan(
+    items: List[CatalogItem], query: str, asset_type: Optional[str] = None
+) -> List[CatalogItem]:
+    """Search the way the catalog did before it was indexed."""
+    query = query.strip().lower()
+    matches = [
+        item
+        for item in items
+        if (not asset_type or item.asset_type == asset_type)
+        and (
+            not query
+            or query
+            in " ".join(
+                [
+                    item.title,
+                    item.asset_id,
+                    item.asset_type,
+                    item.source,
+                    item.provider,
+                    item.category,
+                    item.license,
+                    item.license_text,
+                    item.sample_code_url,
+                    " ".join(item.keywords),
+                ]
+            ).lower()
+        )
+    ]
+    return sorted(matches, key=lambda item: item.title.lower())
+
+
+def timed(func: Callable[[], Any]) -> Tuple[Any, float]:
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def keystrokes(query: str) -> List[str]:
+    return [query[:length] for length in range(1, len(query) + 1)]
+
+
+def benchmark(count: int) -> Dict[str, float]:
+    items = synthetic_items(count)
+    index, build_seconds = timed(lambda: CatalogIndex(items))
+    timings: Dict[str, List[float]] = {
+        "indexed": [],
+        "filtered": [],
+        "narrowed": [],
+        "narrowed_filter": [],
+        "scan": [],
+    }
+    for query in QUERIES:
+        for typed in keystrokes(query):
+            timings["indexed"].append(timed(lambda: index.search_ids(typed))[1])
+            timings["filtered"].append(
+                timed(lambda: index.search_ids(typed, asset_type="Image"))[1]
+            )
+            timings["scan"].append(timed(lambda: scan(items, typed))[1])
+
+    # A fresh index, so earlier searches have not cached any terms
+    index = CatalogIndex(items)
+    for query in QUERIES:
+        previous = None
+        for typed in keystrokes(query):
+            previous, seconds = timed(lambda: index.matches(typed, previous=previous))
+            timings["narrowed"].append(seconds)
+            timings["narrowed_filter"].append(
+                timed(
+                    lambda: index.matches(typed, asset_type="Image", previous=previous)
+                )[1]
+            )
+    results = {"build_s": build_seconds}
+    for name, values in timings.items():
+        values.sort()
+        results[f"{name}_median_ms"] = 1000 * values[len(values) // 2]
+        results[f"{name}_max_ms"] = 1000 * values[-1]
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--counts", type=int, nargs="+", default=DEFAULT_COUNTS)
+    args = parser.parse_args()
+
+    columns = [
+        "build_s",
+        "indexed_median_ms",
+        "indexed_max_ms",
+        "filtered_median_ms",
+        "filtered_max_ms",
+        "narrowed_median_ms",
+        "narrowed_max_ms",
+        "narrowed_filter_median_ms",
+        "narrowed_filter_max_ms",
+        "scan_median_ms",
+        "scan_max_ms",
+    ]
+    width = max(len(column) for column in columns)
+    print(f"{'items':>7} " + " ".join(f"{c:>{width}}" for c in columns))
+    for count in args.counts:
+        results = benchmark(count)
+        values = " ".join(f"{results[c]:>{width}.3f}" for c in columns)
+        print(f"{count:>7} {values}", flush=True)
+
+
+if __name__ == "__main__":
+    main()
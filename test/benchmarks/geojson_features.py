@@ -0,0 +1,127 @@
+"""Compare ways of turning Earth Engine GeoJSON features into QGIS features.
+
+Converts synthetic polygon features by formatting WKT for every geometry (the
+previous identify path), through ``QgsJsonUtils`` (the previous vector
+provider path), through OGR's GeoJSON reader, and with ``ee_plugin.geojson``,
+which builds geometries from the coordinate arrays. Run from the repository
+root with::
+
+    python -m test.benchmarks.geojson_features --counts 1000 10000 100000
+"""
+
+import argparse
+import json
+import time
+import uuid
+from typing import Any, Callable, Dict, List
+
+from osgeo import gdal
+from qgis.core import (
+    QgsApplication,
+    QgsFeature,
+    QgsField,
+    QgsFields,
+    QgsGeometry,
+    QgsJsonUtils,
+    QgsVectorLayer,
+)
+
+from ee_plugin import geojson
+
+from .vector_formats import synthetic_features
+
+DEFAULT_COUNTS = [1_000, 10_000, 100_000]
+
+
+def wkt_coordinates(ring: List[List[float]]) -> str:
+    return ", ".join(f"{x} {y}" for x, y in ring)
+
+
+def convert_wkt(features: List[Dict[str, Any]]) -> List[QgsFeature]:
+    """Format each geometry as WKT and parse it back, field types from a rescan."""
+    samples: Dict[str, Any] = {}
+    for info in features:
+        samples.update(info["properties"])
+    fields = QgsFields()
+    for name, value in samples.items():
+        fields.append(QgsField(name, geojson.field_type(value)))
+    converted = []
+    for info in features:
+        feature = QgsFeature(fields)
+        rings = ", ".join(
+            f"({wkt_coordinates(ring)})" for ring in info["geometry"]["coordinates"]
+        )
+        feature.setGeometry(QgsGeometry.fromWkt(f"POLYGON ({rings})"))
+        feature.setAttributes([info["properties"].get(name) for name in samples])
+        converted.append(feature)
+    return converted
+
+
+def convert_json_utils(features: List[Dict[str, Any]]) -> List[QgsFeature]:
+    """Serialize the features and let QGIS parse them, schema from the first."""
+    fields = QgsJsonUtils.stringToFields(json.dumps(features[0]))
+    text = json.dumps({"type": "FeatureCollection", "features": features})
+    return QgsJsonUtils.stringToFeatureList(text, fields)
+
+
+def convert_ogr(features: List[Dict[str, Any]]) -> List[QgsFeature]:
+    """Read the features with OGR's GeoJSON driver from an in-memory file."""
+    path = f"/vsimem/ee_plugin_benchmark_{uuid.uuid4().hex}.geojson"
+    text = json.dumps({"type": "FeatureCollection", "features": features})
+    gdal.FileFromMemBuffer(path, text.encode("utf-8"))
+    try:
+        layer = QgsVectorLayer(path, "benchmark", "ogr")
+        return list(layer.getFeatures())
+    finally:
+        gdal.Unlink(path)
+
+
+def convert_arrays(features: List[Dict[str, Any]]) -> List[QgsFeature]:
+    fields = QgsFields()
+    for name, field_type in geojson.property_types(features).items():
+        fields.append(QgsField(name, field_type))
+    return geojson.to_qgs_features(features, fields)
+
+
+CONVERTERS: Dict[str, Callable[[List[Dict[str, Any]]], List[QgsFeature]]] = {
+    "wkt": convert_wkt,
+    "json_utils": convert_json_utils,
+    "ogr": convert_ogr,
+    "arrays": convert_arrays,
+}
+
+
+def benchmark(name: str, features: List[Dict[str, Any]], repeat: int) -> float:
+    """Return the best of ``repeat`` runs in features per second."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        converted = CONVERTERS[name](features)
+        best = min(best, time.perf_counter() - start)
+        if len(converted) != len(features):
+            raise RuntimeError(f"{name} converted {len(converted)} features")
+    return len(features) / best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--counts", type=int, nargs="+", default=DEFAULT_COUNTS)
+    parser.add_argument(
+        "--converters", nargs="+", choices=list(CONVERTERS), default=list(CONVERTERS)
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    app = QgsApplication([], False)
+    app.initQgis()
+    print(f"{'features':>9} " + " ".join(f"{name:>12}" for name in args.converters))
+    for count in args.counts:
+        features = list(synthetic_features(count))
+        rates = [benchmark(name, features, args.repeat) for name in args.converters]
+        print(f"{count:>9} " + " ".join(f"{rate:>12.0f}" for rate in rates), flush=True)
+    print("(features per second, best of each run)")
+    app.exitQgis()
+
+
+if __name__ == "__main__":
+    main()
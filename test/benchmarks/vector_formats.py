@@ -0,0 +1,177 @@
+"""Compare the local vector formats used for downloaded Earth Engine collections.
+
+Writes synthetic polygon collections as gzipped GeoJSON (the previous download
+format), FlatGeobuf and GeoPackage, then times opening, rendering and
+rectangle selection in QGIS. Run from the repository root with::
+
+    python -m test.benchmarks.vector_formats --counts 10000 100000 1000000
+"""
+
+import argparse
+import gzip
+import json
+import math
+import os
+import tempfile
+import time
+from typing import Any, Callable, Dict, Iterator, List, Tuple
+
+from qgis.core import (
+    QgsApplication,
+    QgsFeatureRequest,
+    QgsMapRendererSequentialJob,
+    QgsMapSettings,
+    QgsRectangle,
+    QgsVectorLayer,
+)
+from qgis.PyQt.QtCore import QSize
+
+from ee_plugin import vector
+
+DEFAULT_COUNTS = [10_000, 100_000, 1_000_000]
+WORLD = QgsRectangle(-180, -90, 180, 90)
+# About 1% of the world's area, roughly what a regional map view covers
+ZOOMED = QgsRectangle(-18, -9, 18, 9)
+
+
+def synthetic_features(count: int, start: int = 0) -> Iterator[Dict[str, Any]]:
+    """Yield small squares spread evenly over the globe."""
+    columns = math.ceil(math.sqrt(2 * count))
+    rows = math.ceil(count / columns)
+    width = 360 / columns
+    height = 180 / rows
+    for index in range(start, count):
+        x = -180 + (index % columns) * width
+        y = -90 + (index // columns) * height
+        ring = [
+            [x, y],
+            [x + width / 2, y],
+            [x + width / 2, y + height / 2],
+            [x, y + height / 2],
+            [x, y],
+        ]
+        yield {
+            "type": "Feature",
+            "id": str(index),
+            "geometry": {"type": "Polygon", "coordinates": [ring]},
+            "properties": {"index": index, "label": f"feature {index}"},
+        }
+
+
+def write_geojson_gz(count: int) -> str:
+    """Write features the way downloads were stored before indexed formats."""
+    temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=".geojson.gz")
+    temp_file.close()
+    geojson = {"type": "FeatureCollection", "features": list(synthetic_features(count))}
+    with gzip.open(temp_file.name, "wt", encoding="utf-8") as f:
+        json.dump(geojson, f)
+    return temp_file.name
+
+
+def write_flatgeobuf(count: int) -> str:
+    return vector.write_features(list(synthetic_features(count)), vector.FLATGEOBUF)
+
+
+def write_geopackage(count: int) -> str:
+    """Write one page at a time, as a multi-page download does."""
+    page_size = vector.VECTOR_PAGE_SIZE
+    path = vector.write_features(
+        list(synthetic_features(min(count, page_size))), vector.GEOPACKAGE
+    )
+    for offset in vector.page_offsets(count, page_size, start=page_size):
+        page = list(synthetic_features(min(count, offset + page_size), offset))
+        vector.append_features(path, page)
+    return path
+
+
+WRITERS: Dict[str, Callable[[int], str]] = {
+    "geojson.gz": write_geojson_gz,
+    "flatgeobuf": write_flatgeobuf,
+    "geopackage": write_geopackage,
+}
+
+
+def layer_uri(path: str) -> str:
+    if path.endswith(".geojson.gz"):
+        return path
+    return f"{path}|layername={vector.VECTOR_LAYER_NAME}"
+
+
+def timed(func: Callable[[], Any]) -> Tuple[Any, float]:
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def render(layer: QgsVectorLayer, extent: QgsRectangle) -> None:
+    settings = QgsMapSettings()
+    settings.setLayers([layer])
+    settings.setDestinationCrs(layer.crs())
+    settings.setExtent(extent)
+    settings.setOutputSize(QSize(1024, 768))
+    job = QgsMapRendererSequentialJob(settings)
+    job.start()
+    job.waitForFinished()
+
+
+def select_rect(layer: QgsVectorLayer, extent: QgsRectangle) -> int:
+    request = QgsFeatureRequest().setFilterRect(extent).setNoAttributes()
+    return sum(1 for _ in layer.getFeatures(request))
+
+
+def benchmark(name: str, count: int, repeat: int) -> Dict[str, float]:
+    path, write_seconds = timed(lambda: WRITERS[name](count))
+    results = {"write": write_seconds, "size_mb": os.path.getsize(path) / 1e6}
+    timings: Dict[str, List[float]] = {
+        "open": [],
+        "render_full": [],
+        "render_zoomed": [],
+        "select_zoomed": [],
+    }
+    try:
+        for _ in range(repeat):
+            layer, seconds = timed(lambda: QgsVectorLayer(layer_uri(path), name))
+            if not layer.isValid():
+                raise RuntimeError(f"QGIS could not open {path}")
+            timings["open"].append(seconds)
+            timings["render_full"].append(timed(lambda: render(layer, WORLD))[1])
+            timings["render_zoomed"].append(timed(lambda: render(layer, ZOOMED))[1])
+            timings["select_zoomed"].append(
+                timed(lambda: select_rect(layer, ZOOMED))[1]
+            )
+    finally:
+        vector.remove_vector_file(path)
+    results.update({key: min(values) for key, values in timings.items()})
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--counts", type=int, nargs="+", default=DEFAULT_COUNTS)
+    parser.add_argument(
+        "--formats", nargs="+", choices=list(WRITERS), default=list(WRITERS)
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    app = QgsApplication([], False)
+    app.initQgis()
+    columns = [
+        "write",
+        "size_mb",
+        "open",
+        "render_full",
+        "render_zoomed",
+        "select_zoomed",
+    ]
+    print(f"{'features':>9} {'format':<11} " + " ".join(f"{c:>13}" for c in columns))
+    for count in args.counts:
+        for name in args.formats:
+            results = benchmark(name, count, args.repeat)
+            values = " ".join(f"{results[c]:>13.3f}" for c in columns)
+            print(f"{count:>9} {name:<11} {values}", flush=True)
+    app.exitQgis()
+
+
+if __name__ == "__main__":
+    main()
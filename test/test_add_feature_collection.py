@@ -70,3 +70,59 @@ def test_add_feature_collection_algorithm(clean_qgis_iface):
     assert layer.name() == "FC: USGS/WBD/2017/HUC06"
     assert layer.customProperty("ee-layer")
     assert layer.customProperty("ee-layer-type") == "raster"
+
+
+def test_add_feature_collection_algorithm_selects_properties(clean_qgis_iface):
+    from ee_plugin.processing.add_feature_collection import (
+        AddFeatureCollectionAlgorithm,
+    )
+    from qgis.core import QgsProcessingContext, QgsProcessingFeedback
+
+    algorithm = AddFeatureCollectionAlgorithm()
+    algorithm.initAlgorithm(config=None)
+
+    parameters = {
+        "feature_collection_id": "USGS/WBD/2017/HUC06",
+        "filters": "states:==:FL,GA",
+        "start_date": "",
+        "end_date": "",
+        "extent": None,
+        "extent_crs": None,
+        "properties": "name, states",
+        "as_vector": True,
+        "drop_geometry": True,
+        "opacity": "100",
+        "viz_color_hex": "#000000",
+        "viz_fill_color": "#ffffff",
+        "viz_width": "2",
+    }
+
+    context = QgsProcessingContext()
+    feedback = QgsProcessingFeedback()
+    result = algorithm.processAlgorithm(parameters, context, feedback)
+
+    assert "OUTPUT_VECTOR" in result
+    layer = get_layer_by_name("FC: USGS/WBD/2017/HUC06")
+    assert layer.customProperty("ee-layer-type") == "vector"
+    assert not layer.isSpatial()
+    assert set(layer.fields().names()) <= {"fid", "name", "states", "system:index"}
+    assert layer.featureCount() > 0
+
+
+def test_filter_feature_collection_applies_property_filters():
+    import ee
+
+    from ee_plugin.processing.add_feature_collection import (
+        filter_feature_collection,
+    )
+
+    fc = filter_feature_collection(
+        "USGS/WBD/2017/HUC06", "states:==:FL,GA;areasqkm:>:10", None, None, None
+    )
+
+    expected = (
+        ee.FeatureCollection("USGS/WBD/2017/HUC06")
+        .filter(ee.Filter.eq("states", "FL,GA"))
+        .filter(ee.Filter.gt("areasqkm", 10))
+    )
+    assert ee.serializer.toJSON(fc) == ee.serializer.toJSON(expected)
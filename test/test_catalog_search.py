@@ -0,0 +1,125 @@
+from array import array
+
+from ee_plugin.catalog.client import COMMUNITY_SOURCE, CatalogItem
+from ee_plugin.catalog.search import CatalogIndex, search_catalog
+
+ITEMS = [
+    CatalogItem(
+        "Sentinel-2 MSI: Surface Reflectance",
+        "COPERNICUS/S2_SR_HARMONIZED",
+        "ImageCollection",
+        provider="European Union/ESA/Copernicus",
+        keywords=["sentinel", "msi", "sr"],
+    ),
+    CatalogItem(
+        "Sentinel-1 SAR GRD",
+        "COPERNICUS/S1_GRD",
+        "ImageCollection",
+        provider="European Union/ESA/Copernicus",
+        keywords=["sentinel", "radar"],
+    ),
+    CatalogItem(
+        "SRTM Digital Elevation Data",
+        "USGS/SRTMGL1_003",
+        "Image",
+        provider="NASA / USGS / JPL-Caltech",
+        keywords=["dem", "elevation"],
+    ),
+    CatalogItem(
+        "Global Mangrove Watch",
+        "projects/sat-io/open-datasets/GMW",
+        "FeatureCollection",
+        source=COMMUNITY_SOURCE,
+        keywords=["mangroves", "sentinel"],
+    ),
+]
+
+
+def asset_ids(items):
+    return [item.asset_id for item in items]
+
+
+def test_search_matches_token_prefixes_in_any_field():
+    index = CatalogIndex(ITEMS)
+
+    assert asset_ids(index.search("s2_sr")) == ["COPERNICUS/S2_SR_HARMONIZED"]
+    assert asset_ids(index.search("eleva")) == ["USGS/SRTMGL1_003"]
+    assert asset_ids(index.search("jpl calt")) == ["USGS/SRTMGL1_003"]
+    assert index.search("sentinel nothing") == []
+
+
+def test_search_ranks_leading_matches_then_relevance():
+    index = CatalogIndex(ITEMS)
+
+    assert asset_ids(index.search("copernicus/s1_grd"))[0] == "COPERNICUS/S1_GRD"
+    # Titled Sentinel before tagged sentinel
+    assert asset_ids(index.search("sentinel")) == [
+        "COPERNICUS/S1_GRD",
+        "COPERNICUS/S2_SR_HARMONIZED",
+        "projects/sat-io/open-datasets/GMW",
+    ]
+
+
+def test_search_filters_facets_and_sorts_by_title_without_query():
+    index = CatalogIndex(ITEMS)
+
+    assert asset_ids(index.search(asset_type="ImageCollection")) == [
+        "COPERNICUS/S1_GRD",
+        "COPERNICUS/S2_SR_HARMONIZED",
+    ]
+    assert asset_ids(index.search("sentinel", source=COMMUNITY_SOURCE)) == [
+        "projects/sat-io/open-datasets/GMW"
+    ]
+    assert index.search(asset_type="Image", provider="Unknown provider") == []
+    assert index.facet_values("provider") == [
+        "European Union/ESA/Copernicus",
+        "NASA / USGS / JPL-Caltech",
+    ]
+
+
+def test_search_ids_are_positions_of_the_matches():
+    index = CatalogIndex(ITEMS)
+
+    item_ids = index.search_ids("sentinel", asset_type="ImageCollection")
+    assert isinstance(item_ids, array)
+    assert asset_ids(index.items[item_id] for item_id in item_ids) == [
+        "COPERNICUS/S1_GRD",
+        "COPERNICUS/S2_SR_HARMONIZED",
+    ]
+    assert list(index.search_ids(provider="European Union/ESA/Copernicus")) == [1, 0]
+
+
+def test_matches_refine_previous_matches_when_narrowing():
+    index = CatalogIndex(ITEMS)
+    previous = index.matches("sen")
+
+    assert previous.contain(["sentinel"], {})
+    assert previous.contain(["sen", "sar"], {"asset_type": "Image"})
+    assert not previous.contain(["se"], {})
+    assert not index.matches("sen", source=COMMUNITY_SOURCE).contain(["sen"], {})
+
+    narrowed = index.matches("sentinel 1", previous=previous)
+    assert list(narrowed.item_ids) == list(index.search_ids("sentinel 1"))
+    narrowed = index.matches("sen", asset_type="FeatureCollection", previous=previous)
+    assert asset_ids(index.items[item_id] for item_id in narrowed.item_ids) == [
+        "projects/sat-io/open-datasets/GMW"
+    ]
+    assert index.facet_counts("provider", previous.item_ids) == {
+        "European Union/ESA/Copernicus": 2,
+        "": 1,
+    }
+
+
+def test_catalog_items_share_repeated_values():
+    item = CatalogItem("First", "FIRST", "Image", provider="".join(["NA", "SA"]))
+    other = CatalogItem("Second", "SECOND", "Image", provider="NASA")
+
+    assert item.provider is other.provider
+    assert item.keywords == ()
+    assert not hasattr(item, "__dict__")
+
+
+def test_search_catalog_searches_items_once():
+    assert asset_ids(search_catalog(ITEMS, "mangrove")) == [
+        "projects/sat-io/open-datasets/GMW"
+    ]
@@ -0,0 +1,114 @@
+import json
+import os
+from dataclasses import asdict, replace
+from unittest.mock import Mock, patch
+
+from ee_plugin.catalog.client import COMMUNITY_SOURCE, OFFICIAL_SOURCE, CatalogItem
+from ee_plugin.catalog.store import CatalogStore, _load_catalog_source
+
+ITEMS = [
+    CatalogItem(
+        "Sentinel-2 MSI: Surface Reflectance",
+        "COPERNICUS/S2_SR_HARMONIZED",
+        "ImageCollection",
+        provider="European Union/ESA/Copernicus",
+        keywords=["sentinel", "msi", "sr"],
+    ),
+    CatalogItem(
+        "Sentinel-1 SAR GRD",
+        "COPERNICUS/S1_GRD",
+        "ImageCollection",
+        provider="European Union/ESA/Copernicus",
+        keywords=["sentinel", "radar"],
+    ),
+    CatalogItem(
+        "SRTM Digital Elevation Data",
+        "USGS/SRTMGL1_003",
+        "Image",
+        provider="NASA / USGS / JPL-Caltech",
+        keywords=["dem", "elevation"],
+    ),
+]
+COMMUNITY_ITEM = CatalogItem(
+    "Global Mangrove Watch",
+    "projects/sat-io/open-datasets/GMW",
+    "FeatureCollection",
+    source=COMMUNITY_SOURCE,
+    keywords=["mangroves"],
+)
+
+
+def make_store(tmp_path) -> CatalogStore:
+    store = CatalogStore(str(tmp_path / "catalog.sqlite"))
+    store.replace_source(OFFICIAL_SOURCE, ITEMS)
+    store.replace_source(COMMUNITY_SOURCE, [COMMUNITY_ITEM])
+    return store
+
+
+def test_replace_source_only_writes_changed_rows(tmp_path):
+    store = make_store(tmp_path)
+
+    assert store.replace_source(OFFICIAL_SOURCE, ITEMS) == 0
+    changed = replace(ITEMS[0], title="Harmonized Sentinel-2 MSI")
+    assert store.replace_source(OFFICIAL_SOURCE, [changed, ITEMS[1]]) == 2
+
+    assert store.items(OFFICIAL_SOURCE) == [changed, ITEMS[1]]
+    assert store.items(COMMUNITY_SOURCE) == [COMMUNITY_ITEM]
+    assert store.search("harmonized") == [changed]
+    assert store.search("srtm") == []
+
+
+def test_search_matches_term_prefixes_and_facets(tmp_path):
+    store = make_store(tmp_path)
+
+    assert store.search("s2_sr")[0].asset_id == "COPERNICUS/S2_SR_HARMONIZED"
+    assert store.search("copernicus/s1")[0].asset_id == "COPERNICUS/S1_GRD"
+    assert [item.asset_id for item in store.search("elev")] == ["USGS/SRTMGL1_003"]
+    assert store.search("sentinel", asset_type="Image") == []
+    assert store.search("mangrove", source=OFFICIAL_SOURCE) == []
+    assert len(store.search("sentinel", limit=1)) == 1
+    assert [item.title for item in store.search(source=OFFICIAL_SOURCE)] == [
+        "Sentinel-1 SAR GRD",
+        "Sentinel-2 MSI: Surface Reflectance",
+        "SRTM Digital Elevation Data",
+    ]
+
+
+def test_get_and_facet_values_read_single_columns(tmp_path):
+    store = make_store(tmp_path)
+
+    assert store.get(["USGS/SRTMGL1_003", "missing", "COPERNICUS/S1_GRD"]) == [
+        ITEMS[2],
+        ITEMS[1],
+    ]
+    assert store.facet_values("provider", OFFICIAL_SOURCE) == [
+        "European Union/ESA/Copernicus",
+        "NASA / USGS / JPL-Caltech",
+    ]
+    assert store.count() == 4
+
+
+def test_load_catalog_source_uses_store_until_stale(tmp_path):
+    store = CatalogStore(str(tmp_path / "catalog.sqlite"))
+    fetcher = Mock(return_value=ITEMS)
+
+    with patch("ee_plugin.catalog.store.cache_dir", return_value=str(tmp_path)):
+        assert _load_catalog_source(store, OFFICIAL_SOURCE, fetcher, False) == ITEMS
+        assert _load_catalog_source(store, OFFICIAL_SOURCE, fetcher, False) == ITEMS
+        assert fetcher.call_count == 1
+
+        fetcher.side_effect = OSError("offline")
+        assert _load_catalog_source(store, OFFICIAL_SOURCE, fetcher, True) == ITEMS
+
+
+def test_load_catalog_source_imports_legacy_json_cache(tmp_path):
+    store = CatalogStore(str(tmp_path / "catalog.sqlite"))
+    path = tmp_path / "community.json"
+    path.write_text(json.dumps([asdict(COMMUNITY_ITEM)]), encoding="utf-8")
+    fetcher = Mock(side_effect=OSError("offline"))
+
+    with patch("ee_plugin.catalog.store.cache_dir", return_value=str(tmp_path)):
+        items = _load_catalog_source(store, COMMUNITY_SOURCE, fetcher, False)
+
+    assert items == [COMMUNITY_ITEM]
+    assert not os.path.exists(path)
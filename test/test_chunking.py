@@ -0,0 +1,74 @@
+from unittest.mock import Mock, patch
+
+import ee
+import pytest
+
+from ee_plugin import chunking
+
+
+def test_chunked_keeps_remainder():
+    assert list(chunking.chunked(range(5), 2)) == [[0, 1], [2, 3], [4]]
+
+
+def test_checkpoint_survives_truncated_line(tmp_path):
+    checkpoint = chunking.Checkpoint("job", str(tmp_path))
+    checkpoint.record(0, [[1, 2.5]])
+    with open(checkpoint.path, "a", encoding="utf-8") as file:
+        file.write('{"chunk": 1, "res')
+
+    assert chunking.Checkpoint("job", str(tmp_path)).results == {0: [[1, 2.5]]}
+
+
+def test_run_chunks_resumes_from_checkpoint(tmp_path):
+    checkpoint = chunking.Checkpoint("job", str(tmp_path))
+    checkpoint.record(0, "cached")
+    process = Mock(side_effect=lambda chunk: f"fetched {chunk}")
+
+    results = dict(chunking.run_chunks(process, ["a", "b"], checkpoint=checkpoint))
+
+    assert results == {0: "cached", 1: "fetched b"}
+    process.assert_called_once_with("b")
+    assert chunking.Checkpoint("job", str(tmp_path)).results == results
+
+
+def test_run_chunks_retries_then_reports_failed_chunks():
+    calls = []
+
+    def process(chunk):
+        calls.append(chunk)
+        if chunk == "bad" or calls.count(chunk) == 1:
+            raise ee.EEException("Too many concurrent aggregations.")
+        return chunk
+
+    with patch("ee_plugin.chunking.time.sleep"):
+        with pytest.raises(chunking.ChunkErrors) as error:
+            results = []
+            for result in chunking.run_chunks(process, ["ok", "bad"], retries=2):
+                results.append(result)
+
+    assert results == [(0, "ok")]
+    assert list(error.value.errors) == [1]
+    assert calls.count("bad") == 3
+
+
+def test_partition_respects_every_budget_and_item_limit():
+    items = [("a", (3, 10)), ("b", (3, 10)), ("c", (1, 90)), ("d", (9, 0))]
+
+    assert list(chunking.partition(items, (6, 100), 10)) == [["a", "b"], ["c"], ["d"]]
+    assert list(chunking.partition(items, (100, 1000), 3)) == [["a", "b", "c"], ["d"]]
+
+
+def test_quota_errors_slow_the_throttle_down():
+    throttle = chunking.Throttle(rate=10)
+    calls = []
+
+    def request():
+        calls.append(throttle.interval)
+        if len(calls) == 1:
+            raise ee.EEException("Too many concurrent aggregations.")
+        return "done"
+
+    with patch("ee_plugin.chunking.time.sleep"):
+        assert chunking.with_retries(request, throttle=throttle) == "done"
+
+    assert calls == [0.1, 0.2]
@@ -0,0 +1,64 @@
+from qgis.core import (
+    QgsFeature,
+    QgsGeometry,
+    QgsPointXY,
+    QgsProcessingContext,
+    QgsProcessingFeedback,
+    QgsProject,
+    QgsVectorLayer,
+)
+from qgis.PyQt.QtCore import QDateTime
+
+from ee_plugin.processing.extract_time_series import (
+    MAX_SAMPLES,
+    ExtractTimeSeriesAlgorithm,
+    image_windows,
+)
+
+
+def test_image_windows_keep_requests_within_sample_limit():
+    assert image_windows(10, 100) == [(0, 10)]
+    assert image_windows(120, 100) == [(0, 50), (50, 50), (100, 20)]
+    assert all(count * 100 <= MAX_SAMPLES for _, count in image_windows(999, 100))
+    assert image_windows(0, 100) == []
+
+
+def test_extract_time_series_writes_a_row_per_point_and_image(tmp_path):
+    points = QgsVectorLayer("Point?crs=EPSG:4326&field=plot:string", "plots", "memory")
+    features = []
+    for plot, x in [("a", -120.0), ("b", -120.1)]:
+        feature = QgsFeature(points.fields())
+        feature.setAttributes([plot])
+        feature.setGeometry(QgsGeometry.fromPointXY(QgsPointXY(x, 37.0)))
+        features.append(feature)
+    points.dataProvider().addFeatures(features)
+    QgsProject.instance().addMapLayer(points)
+
+    alg = ExtractTimeSeriesAlgorithm()
+    alg.initAlgorithm(config=None)
+    result = alg.processAlgorithm(
+        {
+            "INPUT": points,
+            "ID_FIELD": "plot",
+            "image_collection_id": "MODIS/061/MOD13A2",
+            "filters": "",
+            "start_date": QDateTime.fromString("2020-01-01", "yyyy-MM-dd"),
+            "end_date": QDateTime.fromString("2020-03-01", "yyyy-MM-dd"),
+            "BANDS": "NDVI",
+            "SCALE": 1000,
+            "CHUNK_SIZE": 1,
+            "MAX_WORKERS": 2,
+            "REQUEST_RATE": 10,
+            "OUTPUT": str(tmp_path / "series.gpkg"),
+        },
+        context=QgsProcessingContext(),
+        feedback=QgsProcessingFeedback(),
+    )
+
+    table = QgsVectorLayer(result["OUTPUT"], "series", "ogr")
+    rows = sorted(
+        (feature["plot"], feature["image_id"]) for feature in table.getFeatures()
+    )
+    # 16-day composites: four images in January and February per point
+    assert [plot for plot, _ in rows] == ["a"] * 4 + ["b"] * 4
+    assert rows[0][1] == "2020_01_01"
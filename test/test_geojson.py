@@ -0,0 +1,76 @@
+from qgis.core import NULL, Qgis, QgsField, QgsFields, QgsPointXY
+from qgis.PyQt.QtCore import QVariant
+
+from ee_plugin.geojson import geometry_from_geojson, property_types, to_qgs_features
+
+SQUARE = [[0, 0], [4, 0], [4, 4], [0, 4], [0, 0]]
+HOLE = [[1, 1], [2, 1], [2, 2], [1, 1]]
+
+
+def test_geometry_from_geojson_builds_polygon_with_hole():
+    geometry = geometry_from_geojson({"type": "Polygon", "coordinates": [SQUARE, HOLE]})
+
+    assert geometry.asWkt(0) == (
+        "Polygon ((0 0, 4 0, 4 4, 0 4, 0 0),(1 1, 2 1, 2 2, 1 1))"
+    )
+
+
+def test_geometry_from_geojson_builds_multi_part_geometries():
+    multi_polygon = geometry_from_geojson(
+        {"type": "MultiPolygon", "coordinates": [[SQUARE], [HOLE]]}
+    )
+    collection = geometry_from_geojson(
+        {
+            "type": "GeometryCollection",
+            "geometries": [
+                {"type": "Point", "coordinates": [1, 2, 3]},
+                {"type": "LineString", "coordinates": SQUARE},
+            ],
+        }
+    )
+
+    assert multi_polygon.wkbType() == Qgis.WkbType.MultiPolygon
+    assert multi_polygon.constGet().numGeometries() == 2
+    assert collection.wkbType() == Qgis.WkbType.GeometryCollection
+    assert collection.constGet().geometryN(0).asWkt(0) == "Point (1 2)"
+
+
+def test_geometry_from_geojson_returns_null_for_missing_geometries():
+    assert geometry_from_geojson(None).isNull()
+    assert geometry_from_geojson({"type": "MultiPoint", "coordinates": []}).isNull()
+
+
+def test_property_types_widens_mixed_values_in_one_pass():
+    features = [
+        {"properties": {"count": 1, "ratio": 1, "name": "a", "empty": None}},
+        {"properties": {"count": 2, "ratio": 0.5, "name": 3, "flag": True}},
+    ]
+
+    assert property_types(features) == {
+        "count": QVariant.LongLong,
+        "ratio": QVariant.Double,
+        "name": QVariant.String,
+        "empty": QVariant.Double,
+        "flag": QVariant.Bool,
+    }
+
+
+def test_to_qgs_features_maps_properties_to_fields():
+    fields = QgsFields()
+    fields.append(QgsField("label", QVariant.String))
+    fields.append(QgsField("tags", QVariant.String))
+    features = [
+        {
+            "type": "Feature",
+            "geometry": {"type": "Point", "coordinates": [-123.1, 49.2]},
+            "properties": {"name": "a", "tags": ["x", "y"], "dropped": 1},
+        },
+        {"type": "Feature", "geometry": None, "properties": {}},
+    ]
+
+    first, second = to_qgs_features(features, fields, {"name": "label"})
+
+    assert first.attributes() == ["a", '["x", "y"]']
+    assert first.geometry().asPoint() == QgsPointXY(-123.1, 49.2)
+    assert all(value in (None, NULL) for value in second.attributes())
+    assert second.geometry().isNull()
@@ -1,17 +1,27 @@
 from unittest.mock import Mock, patch
 
+import pytest
 from qgis.core import NULL, QgsProject, QgsPointXY, QgsRectangle
 
 from ee_plugin.identify import (
-    _geojson_geometry_to_wkt,
+    IdentifyRequest,
+    IdentifyTask,
     add_identify_results_layer,
-    identify_features,
+    combine_identify_results,
+    hover_max_rate,
+    hover_text,
+    identify_batch,
     identify_image,
+    identify_layer,
     identify_reducer,
     identify_reducer_name,
+    identify_requests,
     identify_result_field_name,
+    load_feature_geometries,
     point_to_ee_geometry,
     rectangle_to_ee_geometry,
+    region_scales,
+    split_pixel_counts,
 )
 
 
@@ -36,48 +46,6 @@ def test_identify_image_reduces_all_bands_over_geometry():
     assert values == {"B2": 0.12, "B3": 0.34}
 
 
-def test_identify_features_fetches_intersecting_features():
-    feature_collection = Mock()
-    filtered = feature_collection.filterBounds.return_value
-    limited = filtered.limit.return_value
-    limited.getInfo.return_value = {
-        "type": "FeatureCollection",
-        "features": [
-            {
-                "type": "Feature",
-                "id": "feature-1",
-                "geometry": {"type": "Point", "coordinates": [-123.1, 49.2]},
-                "properties": {"name": "Selected"},
-            }
-        ],
-    }
-    geometry = Mock()
-
-    features = identify_features(feature_collection, geometry, limit=10)
-
-    feature_collection.filterBounds.assert_called_once_with(geometry)
-    filtered.limit.assert_called_once_with(10)
-    assert features == limited.getInfo.return_value["features"]
-
-
-def test_geojson_geometry_to_wkt_handles_polygon():
-    wkt = _geojson_geometry_to_wkt(
-        {
-            "type": "Polygon",
-            "coordinates": [
-                [
-                    [-123.2, 49.1],
-                    [-123.1, 49.1],
-                    [-123.1, 49.2],
-                    [-123.2, 49.1],
-                ]
-            ],
-        }
-    )
-
-    assert wkt == "POLYGON ((-123.2 49.1, -123.1 49.1, -123.1 49.2, -123.2 49.1))"
-
-
 def test_point_to_ee_geometry():
     with patch("ee_plugin.identify.ee.Geometry.Point") as point_geometry:
         result = point_to_ee_geometry(QgsPointXY(-123.1, 49.2))
@@ -326,3 +294,270 @@ def test_add_identify_results_layer_creates_multi_layer_features():
     assert features[1]["source_layer"] == "NDVI"
     assert features[1]["band"] == "ndvi"
     assert features[1]["value"] == "0.42"
+
+
+SELECTION_CONTEXT = {
+    "ee_geometry": Mock(),
+    "feature_geometry": None,
+    "geometry": {"longitude": -123.1, "latitude": 49.2},
+    "scale": 30,
+}
+# About 100 m across, too small for coarse passes at 30 m
+REGION_CONTEXT = {
+    "ee_geometry": Mock(),
+    "feature_geometry": None,
+    "geometry": {"west": -123.1, "south": 49.2, "east": -123.099, "north": 49.201},
+    "scale": 30,
+}
+
+
+def test_identify_layer_reduces_image_request():
+    image = Mock()
+    image.reduceRegion.return_value.getInfo.return_value = {
+        "elevation_mean": 123,
+        "elevation_count": 9,
+    }
+
+    result = identify_layer(IdentifyRequest("DEM", image), REGION_CONTEXT, True)
+
+    assert result["layer"] == "DEM"
+    assert result["reducer"] == "mean"
+    assert result["scale"] == 30
+    assert result["values"] == {"elevation": 123}
+    assert result["pixel_counts"] == {"elevation": 9}
+
+
+def test_identify_layer_pages_features_without_geometries():
+    collection = Mock()
+    page = {
+        "type": "FeatureCollection",
+        "features": [
+            {"type": "Feature", "id": "7", "geometry": None, "properties": {"a": 1}}
+        ],
+    }
+
+    with patch("ee_plugin.identify.ee") as ee:
+        ee.Dictionary.return_value.getInfo.return_value = {"total": 250, "page": page}
+        result = identify_layer(
+            IdentifyRequest("FC", collection, is_features=True, offset=100),
+            SELECTION_CONTEXT,
+            False,
+        )
+
+    collection.filterBounds.return_value.toList.assert_called_once_with(100, 100)
+    assert result["total"] == 250
+    assert result["features"] == [
+        {"type": "Feature", "id": "7", "properties": {"a": 1}}
+    ]
+    assert result["collections"] == {"FC": collection.filterBounds.return_value}
+
+
+def test_load_feature_geometries_fetches_missing_geometries_once():
+    collection = Mock()
+    point = {"type": "Point", "coordinates": [-123.1, 49.2]}
+    result = {
+        "layer": "FC",
+        "features": [{"id": "1"}, {"id": "2", "geometry": point}],
+        "collections": {"FC": collection},
+    }
+
+    with patch("ee_plugin.identify.ee") as ee:
+        ee.Dictionary.return_value.getInfo.return_value = {
+            "FC": {"features": [{"id": "1", "geometry": point}]}
+        }
+        load_feature_geometries(result)
+        load_feature_geometries(result)
+
+    ee.Filter.inList.assert_called_once_with("system:index", ["1"])
+    ee.Dictionary.return_value.getInfo.assert_called_once_with()
+    assert result["features"][0]["geometry"] == point
+
+
+def test_split_pixel_counts_keeps_band_names_with_suffixes():
+    values, counts = split_pixel_counts(
+        {"B4_count_mean": 0.5, "B4_count_count": 4, "B8_mean": None, "B8_count": 0},
+        "mean",
+    )
+
+    assert values == {"B4_count": 0.5, "B8": None}
+    assert counts == {"B4_count": 4, "B8": 0}
+
+
+def test_region_scales_go_from_coarse_to_canvas_scale():
+    # Roughly 111 km by 111 km at the equator
+    geometry = {"west": 0, "south": 0, "east": 1, "north": 1}
+
+    scales = region_scales(geometry, 30)
+
+    assert scales == sorted(scales, reverse=True)
+    assert scales[0] == pytest.approx(1110, rel=0.01)
+    assert scales[-1] == 30
+    assert region_scales(REGION_CONTEXT["geometry"], 30) == [30]
+
+
+def test_identify_task_refines_region_results():
+    image = Mock()
+    image.reduceRegion.return_value.getInfo.return_value = {
+        "elevation_mean": 123,
+        "elevation_count": 9,
+    }
+    context = dict(
+        REGION_CONTEXT, geometry={"west": 0, "south": 0, "east": 1, "north": 1}
+    )
+    task = IdentifyTask([IdentifyRequest("DEM", image)], context, True)
+    ready, refined, refining = [], [], []
+    task.resultReady.connect(lambda index, result: ready.append(result["scale"]))
+    task.resultRefined.connect(lambda index, result: refined.append(result["scale"]))
+    task.refining.connect(refining.append)
+
+    assert task.run()
+
+    scales = region_scales(context["geometry"], 30)
+    assert ready == scales[:1]
+    assert refined == refining == scales[1:]
+    assert [
+        call.kwargs["scale"] for call in image.reduceRegion.call_args_list
+    ] == scales
+
+
+def test_identify_requests_rejects_mixed_layer_types():
+    raster, vector = Mock(), Mock()
+    raster.name.return_value = "DEM"
+    vector.name.return_value = "Counties"
+
+    with (
+        patch(
+            "ee_plugin.identify.utils.get_ee_feature_collection_from_layer",
+            side_effect=lambda layer: Mock() if layer is vector else None,
+        ),
+        patch("ee_plugin.identify.utils.get_ee_object_from_layer"),
+        pytest.raises(ValueError),
+    ):
+        identify_requests([raster, vector])
+
+
+def test_combine_identify_results_keeps_multi_layout_when_merging():
+    result = {
+        "layer": "DEM",
+        "selection_type": "point",
+        "reducer": "first",
+        "scale": 30,
+        "geometry": SELECTION_CONTEXT["geometry"],
+        "feature_geometry": None,
+        "values": {"elevation": 123},
+    }
+
+    assert combine_identify_results([result]) is result
+    assert combine_identify_results([result], merge=True)["results"] == [result]
+
+
+def test_identify_task_emits_each_layer_and_reports_failures():
+    image = Mock()
+    image.reduceRegion.return_value.getInfo.return_value = {"elevation_mean": 123}
+    broken = Mock()
+    broken.reduceRegion.return_value.getInfo.side_effect = RuntimeError("timeout")
+    task = IdentifyTask(
+        [IdentifyRequest("DEM", image), IdentifyRequest("Broken", broken)],
+        REGION_CONTEXT,
+        True,
+    )
+    ready, failed = [], []
+    task.resultReady.connect(lambda index, result: ready.append(index))
+    task.resultFailed.connect(lambda index, message: failed.append(message))
+
+    with patch(
+        "ee_plugin.identify.identify_batch", side_effect=RuntimeError("timeout")
+    ):
+        assert task.run()
+
+    assert ready == [0]
+    assert failed == ["Broken: timeout"]
+
+
+def test_identify_batch_fetches_all_layers_in_one_request():
+    requests = [IdentifyRequest("DEM", Mock()), IdentifyRequest("NDVI", Mock())]
+
+    with patch("ee_plugin.identify.ee.Dictionary") as dictionary:
+        dictionary.return_value.getInfo.return_value = {
+            "0": {"elevation_mean": 123},
+            "1": {"ndvi_mean": 0.42},
+        }
+        results = identify_batch(requests, REGION_CONTEXT, True)
+
+    dictionary.return_value.getInfo.assert_called_once_with()
+    assert sorted(dictionary.call_args[0][0]) == ["0", "1"]
+    assert [result["layer"] for result in results] == ["DEM", "NDVI"]
+    assert [result["values"] for result in results] == [
+        {"elevation": 123},
+        {"ndvi": 0.42},
+    ]
+
+
+def test_identify_layer_answers_point_images_from_pixel_blocks():
+    image = Mock()
+
+    with patch(
+        "ee_plugin.identify.pixel_cache.identify", return_value={"elevation": 123}
+    ) as identify:
+        result = identify_layer(IdentifyRequest("DEM", image), SELECTION_CONTEXT, False)
+
+    identify.assert_called_once_with(image, -123.1, 49.2, 30, cached_only=False)
+    image.reduceRegion.assert_not_called()
+    assert result["values"] == {"elevation": 123}
+
+
+def test_identify_task_batches_point_layers_without_cached_blocks():
+    requests = [
+        IdentifyRequest("DEM", Mock()),
+        IdentifyRequest("NDVI", Mock()),
+        IdentifyRequest("Slope", Mock()),
+    ]
+    task = IdentifyTask(requests, SELECTION_CONTEXT, False)
+    ready = {}
+    task.resultReady.connect(lambda index, result: ready.update({index: result}))
+
+    with (
+        patch(
+            "ee_plugin.identify.pixel_cache.identify",
+            side_effect=lambda image, *args, **kwargs: (
+                {"ndvi": 0.42} if image is requests[1].ee_object else None
+            ),
+        ) as identify,
+        patch(
+            "ee_plugin.identify.identify_batch",
+            return_value=[{"layer": "DEM"}, {"layer": "Slope"}],
+        ) as batch,
+    ):
+        assert task.run()
+
+    assert all(call.kwargs["cached_only"] for call in identify.call_args_list)
+    batch.assert_called_once()
+    assert batch.call_args.args[0] == [requests[0], requests[2]]
+    assert ready[1]["values"] == {"ndvi": 0.42}
+    assert ready[0] == {"layer": "DEM"}
+    assert ready[2] == {"layer": "Slope"}
+
+
+def test_hover_text_marks_pending_and_empty_layers():
+    text = hover_text(
+        ["DEM", "NDVI", "Clouds"],
+        {"DEM": {"elevation": 123, "slope": 1.23456789012}, "Clouds": {}},
+    )
+
+    assert text == (
+        "<b>DEM</b><br>elevation: 123<br>slope: 1.2345679"
+        "<br><br><b>NDVI</b><br><i>Loading...</i>"
+        "<br><br><b>Clouds</b><br><i>No data</i>"
+    )
+
+
+def test_hover_text_escapes_layer_and_band_names():
+    text = hover_text(["<NDVI & EVI>"], {"<NDVI & EVI>": {"a<b": 1}})
+
+    assert text == "<b>&lt;NDVI &amp; EVI&gt;</b><br>a&lt;b: 1"
+
+
+def test_hover_max_rate_stays_positive():
+    with patch("ee_plugin.identify.QgsSettings") as settings:
+        settings.return_value.value.return_value = 0.0
+        assert hover_max_rate() == 0.1
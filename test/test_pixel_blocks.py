@@ -0,0 +1,83 @@
+import struct
+from unittest.mock import patch
+
+import ee
+
+from ee_plugin import pixel_blocks
+
+
+def npy_bytes(descr, records, width=pixel_blocks.BLOCK_SIZE):
+    header = repr(
+        {
+            "descr": descr,
+            "fortran_order": False,
+            "shape": (len(records) // width, width),
+        }
+    )
+    header += " " * (-(10 + len(header) + 1) % 64) + "\n"
+    record = struct.Struct(
+        "<" + "".join(pixel_blocks.NPY_STRUCT_TYPES[d[1:]] for _, d in descr)
+    )
+    body = b"".join(record.pack(*values) for values in records)
+    return (
+        b"\x93NUMPY\x01\x00" + struct.pack("<H", len(header)) + header.encode() + body
+    )
+
+
+def test_parse_npy_reads_band_values_and_masks():
+    descr = [
+        ("elevation", "<i2"),
+        ("ndvi", "<f8"),
+        ("ee_mask_elevation", "<f4"),
+        ("ee_mask_ndvi", "<f4"),
+    ]
+    records = [
+        (index, index / 10, 1.0, 0.0 if index == 3 else 1.0) for index in range(8)
+    ]
+
+    block = pixel_blocks.parse_npy(npy_bytes(descr, records, width=4))
+
+    assert block.values(0, 2) == {"elevation": 2, "ndvi": 0.2}
+    assert block.values(0, 3) == {"elevation": 3, "ndvi": None}
+    assert block.values(1, 0) == {"elevation": 4, "ndvi": 0.4}
+
+
+def test_block_position_counts_rows_from_top_edge():
+    scale = 10
+    span = pixel_blocks.BLOCK_SIZE * scale
+
+    assert pixel_blocks.block_position(5, span - 5, scale) == (0, 0, 0, 0)
+    assert pixel_blocks.block_position(span + 15, -5, scale) == (1, -1, 0, 1)
+    assert pixel_blocks.block_position(span - 1, 1, scale) == (0, 0, 63, 63)
+
+
+def test_cache_answers_nearby_points_from_one_block():
+    descr = [("elevation", "<f8"), ("ee_mask_elevation", "<f8")]
+    records = [(float(index), 1.0) for index in range(pixel_blocks.BLOCK_SIZE**2)]
+    cache = pixel_blocks.PixelBlockCache()
+    image = ee.Image.constant(1).rename("elevation")
+
+    with patch.object(
+        pixel_blocks, "fetch_block", return_value=npy_bytes(descr, records)
+    ) as fetch_block:
+        first = cache.identify(image, 10.0, 45.0, 30)
+        nearby = cache.identify(image, 10.0001, 45.0001, 30)
+
+    fetch_block.assert_called_once()
+    assert set(first) == {"elevation"}
+    assert set(nearby) == {"elevation"}
+    assert cache.identify(image, 50.0, 45.0, 30, cached_only=True) is None
+    assert cache.identify(image, 10.0, 89.0, 30) is None
+
+
+def test_cache_evicts_least_recently_used_block():
+    cache = pixel_blocks.PixelBlockCache(max_blocks=2)
+    block = pixel_blocks.parse_npy(npy_bytes([("b", "<f8")], [(1.0,)], width=1))
+    cache.put(("a", 30.0, 0, 0), block)
+    cache.put(("a", 30.0, 1, 0), block)
+    assert cache.get(("a", 30.0, 0, 0)) is block
+
+    cache.put(("a", 30.0, 2, 0), block)
+
+    assert cache.get(("a", 30.0, 1, 0)) is None
+    assert cache.get(("a", 30.0, 0, 0)) is block
@@ -0,0 +1,58 @@
+import ee
+from qgis.core import (
+    QgsFeature,
+    QgsGeometry,
+    QgsPointXY,
+    QgsProcessingContext,
+    QgsProcessingFeedback,
+    QgsProject,
+    QgsVectorLayer,
+)
+
+from ee_plugin import Map
+from ee_plugin.processing.sample_points import (
+    SampleLayersAtPointsAlgorithm,
+    sample_field_names,
+)
+
+
+def test_sample_field_names_prefix_layers_and_avoid_existing_fields():
+    assert sample_field_names([("DEM", ["elevation"])], ["id"]) == ["elevation"]
+    assert sample_field_names(
+        [("DEM", ["elevation"]), ("Night lights", ["avg_rad"])], ["DEM_elevation"]
+    ) == ["DEM_elevation_2", "Night_lights_avg_rad"]
+
+
+def test_sample_points_joins_values_as_fields(tmp_path):
+    Map.addLayer(ee.Image.constant(7).rename("value"), {}, "Constant")
+    points = QgsVectorLayer("Point?crs=EPSG:4326&field=name:string", "plots", "memory")
+    features = []
+    for name, x, y in [("a", 10, 10), ("b", 11, 11), ("c", 12, 12)]:
+        feature = QgsFeature(points.fields())
+        feature.setAttributes([name])
+        feature.setGeometry(QgsGeometry.fromPointXY(QgsPointXY(x, y)))
+        features.append(feature)
+    points.dataProvider().addFeatures(features)
+    QgsProject.instance().addMapLayer(points)
+
+    alg = SampleLayersAtPointsAlgorithm()
+    alg.initAlgorithm(config=None)
+    output = str(tmp_path / "sampled.gpkg")
+    result = alg.processAlgorithm(
+        {
+            "INPUT": points,
+            "EE_LAYERS": [alg.raster_layers.index("Constant")],
+            "SCALE": 1000,
+            "CHUNK_SIZE": 2,
+            "MAX_WORKERS": 2,
+            "OUTPUT": output,
+        },
+        context=QgsProcessingContext(),
+        feedback=QgsProcessingFeedback(),
+    )
+
+    sampled = QgsVectorLayer(result["OUTPUT"], "sampled", "ogr")
+    rows = sorted(
+        (feature["name"], feature["value"]) for feature in sampled.getFeatures()
+    )
+    assert rows == [("a", 7), ("b", 7), ("c", 7)]
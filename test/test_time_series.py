@@ -0,0 +1,77 @@
+from unittest.mock import patch
+
+import ee
+import pytest
+
+from ee_plugin import time_series
+
+HEADER = ["id", "longitude", "latitude", "time", "B4", "B8"]
+
+
+def test_parse_region_sorts_rows_by_time():
+    series = time_series.parse_region(
+        [
+            HEADER,
+            ["b", 10.0, 45.0, 2000, 0.2, 0.4],
+            ["a", 10.0, 45.0, 1000, 0.1, None],
+            ["c", 10.0, 45.0, None, 0.3, 0.5],
+        ]
+    )
+
+    assert series.bands == ["B4", "B8"]
+    assert series.times == [1000, 2000]
+    assert series.values == {"B4": [0.1, 0.2], "B8": [None, 0.4]}
+
+
+def test_merge_series_joins_date_pages():
+    first = time_series.parse_region([HEADER, ["b", 0, 0, 3000, 3, 30]])
+    second = time_series.parse_region([HEADER, ["a", 0, 0, 1000, 1, 10]])
+
+    merged = time_series.merge_series([first, second, time_series.TimeSeries([])])
+
+    assert merged.times == [1000, 3000]
+    assert merged.values["B8"] == [10, 30]
+
+
+def test_date_windows_cover_range_without_overlap():
+    windows = time_series.date_windows(0, 99, 3)
+
+    assert windows == [(0, 34), (34, 68), (68, 100)]
+
+
+def test_find_source_collection_survives_serialization():
+    collection = ee.ImageCollection("COPERNICUS/S2_SR_HARMONIZED").filterDate(
+        "2024-01-01", "2024-02-01"
+    )
+    composite = ee.deserializer.fromJSON(
+        ee.serializer.toJSON(collection.median().select(["B4"]))
+    )
+
+    found = time_series.find_source_collection(composite)
+
+    assert ee.serializer.toJSON(found) == ee.serializer.toJSON(collection)
+    assert time_series.find_source_collection(ee.Image(1)) is None
+
+
+def test_cache_reuses_series_for_same_point_and_scale():
+    cache = time_series.TimeSeriesCache()
+    collection = ee.ImageCollection("COPERNICUS/S2_SR_HARMONIZED")
+    series = time_series.TimeSeries(["B4"], [1000], {"B4": [0.1]})
+
+    with patch.object(
+        time_series, "fetch_time_series", return_value=series
+    ) as fetch_time_series:
+        assert cache.fetch(collection, 10.0, 45.0, 30) is series
+        assert cache.fetch(collection, 10.0000001, 45.0, 30) is series
+        cache.fetch(collection, 10.0, 45.0, 60)
+
+    assert fetch_time_series.call_count == 2
+
+
+def test_fetch_time_series_requires_image_dates():
+    collection = ee.ImageCollection("COPERNICUS/S2_SR_HARMONIZED")
+    info = {"size": 1500, "start": None, "end": None, "region": None}
+
+    with patch.object(ee.Dictionary, "getInfo", return_value=info):
+        with pytest.raises(ValueError, match="system:time_start"):
+            time_series.fetch_time_series(collection, 10.0, 45.0, 30)
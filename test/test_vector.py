@@ -1,9 +1,13 @@
+import json
+from unittest.mock import Mock, patch
+
 import ee
 import pytest
+from osgeo import ogr
 from qgis.PyQt.QtGui import QColor
 from qgis.core import QgsMapLayer, QgsProject, QgsWkbTypes
 
-from ee_plugin import Map
+from ee_plugin import Map, vector
 
 # initialize the Earth Engine API is required to use the ee.Geometry module
 #   and runs before fixtures
@@ -225,8 +229,8 @@ def test_vector_update_normalizes_geometry_types():
     assert len(layers) == 1, "Update must not duplicate"
     assert layers[0].isValid(), "Updated Point layer must be valid"
     assert layers[0].customProperty("ee-layer") is True
-    source = layers[0].source()
-    assert source.endswith(".geojson") or source.endswith(".geojson.gz")
+    source = layers[0].customProperty("ee-vector-source")
+    assert source.endswith(".fgb")
 
 
 def test_data_catalog_vector_layer():
@@ -242,3 +246,321 @@ def test_data_catalog_vector_layer():
     assert layers[0].type() == QgsMapLayer.LayerType.RasterLayer, (
         "Layer is treated as raster layer"
     )
+
+
+def test_page_offsets_cover_remaining_features():
+    assert vector.page_offsets(0, 2000) == []
+    assert vector.page_offsets(4500, 2000) == [0, 2000, 4000]
+    assert vector.page_offsets(4500, 2000, start=2000) == [2000, 4000]
+
+
+def read_feature_properties(path):
+    dataset = ogr.Open(path)
+    layer = dataset.GetLayerByName(vector.VECTOR_LAYER_NAME)
+    return [feature.items() for feature in layer]
+
+
+def test_choose_vector_format_by_feature_count():
+    assert vector.choose_vector_format(10, page_size=2000) == vector.FLATGEOBUF
+    assert vector.choose_vector_format(2000, page_size=2000) == vector.FLATGEOBUF
+    assert vector.choose_vector_format(2001, page_size=2000) == vector.GEOPACKAGE
+
+
+def test_download_first_page_reports_collection_size():
+    feature = {
+        "type": "Feature",
+        "id": "0",
+        "geometry": {"type": "Point", "coordinates": [1.5, 1.5]},
+        "properties": {"name": "first"},
+    }
+    feature_collection = Mock()
+    feature_collection.size.return_value.getInfo.return_value = 3
+    feature_collection.toList.return_value.getInfo.return_value = [feature]
+
+    download = vector.download_first_page(feature_collection, page_size=1)
+
+    feature_collection.toList.assert_called_once_with(1, 0)
+    assert download.loaded == 1
+    assert download.total == 3
+    assert not download.is_complete
+    assert download.path.endswith(".gpkg")
+    assert read_feature_properties(download.path) == [
+        {"name": "first", "system:index": "0"}
+    ]
+
+
+def test_download_first_page_reuses_known_size_without_fingerprints():
+    feature_collection = Mock()
+    feature_collection.toList.return_value.getInfo.return_value = [
+        point_feature("0", 0)
+    ]
+
+    with patch.object(
+        vector, "fetch_fingerprints", side_effect=ee.EEException("Too many")
+    ):
+        download = vector.download_first_page(
+            feature_collection, page_size=1, track_changes=True, total=3
+        )
+
+    feature_collection.size.assert_not_called()
+    assert download.total == 3
+    assert download.fingerprints is None
+    vector.remove_vector_file(download.path)
+
+
+def test_append_features_extends_geopackage():
+    first = {
+        "type": "Feature",
+        "geometry": {"type": "Point", "coordinates": [0, 0]},
+        "properties": {"n": 1},
+    }
+    second = {
+        "type": "Feature",
+        "geometry": {"type": "Point", "coordinates": [1, 1]},
+        "properties": {"n": 2, "label": "b"},
+    }
+
+    path = vector.write_features([first], vector.GEOPACKAGE)
+    vector.append_features(path, [second])
+
+    assert read_feature_properties(path) == [
+        {"n": 1, "label": None},
+        {"n": 2, "label": "b"},
+    ]
+    vector.remove_vector_file(path)
+
+
+def point_feature(feature_id, value):
+    return {
+        "type": "Feature",
+        "id": feature_id,
+        "geometry": {"type": "Point", "coordinates": [value, value]},
+        "properties": {"value": value},
+    }
+
+
+def test_page_task_stops_writing_once_stopped():
+    path = vector.write_features([point_feature("0", 0)], vector.GEOPACKAGE)
+    download = vector.VectorDownload(path, loaded=1, total=2)
+    task = vector.FeatureCollectionPageTask("Loading features", download)
+
+    task.stop()
+
+    assert not task._append_page([point_feature("1", 1)])
+    assert len(read_feature_properties(path)) == 1
+    assert download.loaded == 1
+    vector.remove_vector_file(path)
+
+
+def test_delete_features_matches_ids_without_sql():
+    ids = ["0", "it's", "2"]
+    path = vector.write_features(
+        [point_feature(feature_id, value) for value, feature_id in enumerate(ids)],
+        vector.GEOPACKAGE,
+    )
+
+    vector.delete_features(path, ["it's", "missing"])
+
+    assert [props["system:index"] for props in read_feature_properties(path)] == [
+        "0",
+        "2",
+    ]
+    vector.remove_vector_file(path)
+
+
+def test_page_task_streams_only_features_after_first_page():
+    path = vector.write_features([point_feature("0", 0)], vector.GEOPACKAGE)
+    download = vector.VectorDownload(
+        path,
+        feature_collection=ee.FeatureCollection("USDOS/LSIB_SIMPLE/2017"),
+        loaded=1,
+        total=2,
+        loaded_ids={"0"},
+    )
+    # The table download keeps the id only in the property set for it
+    streamed = point_feature("1", 1)
+    del streamed["id"]
+    streamed["properties"][vector.STREAM_ID_PROPERTY] = "1"
+    task = vector.FeatureCollectionPageTask("Loading features", download)
+
+    with patch.object(
+        vector, "stream_feature_collection", return_value=iter([streamed])
+    ) as stream:
+        assert task.run()
+
+    requested = ee.serializer.toJSON(stream.call_args.args[0])
+    assert "Filter.inList" in requested
+    assert [props["system:index"] for props in read_feature_properties(path)] == [
+        "0",
+        "1",
+    ]
+    assert download.loaded == 2
+    vector.remove_vector_file(path)
+
+
+def test_diff_fingerprints_splits_added_changed_deleted():
+    old = {"a": "1", "b": "2", "c": "3"}
+    new = {"a": "1", "b": "changed", "d": "4"}
+
+    diff = vector.diff_fingerprints(old, new)
+
+    assert diff.added == ["d"]
+    assert diff.changed == ["b"]
+    assert diff.deleted == ["c"]
+    assert vector.diff_fingerprints(old, old).is_empty
+
+
+def test_fetch_fingerprints_pages_through_ids():
+    feature_collection = ee.FeatureCollection("USDOS/LSIB_SIMPLE/2017")
+    pages = [{"a": "1", "b": "2"}, {"c": "3"}]
+
+    with patch.object(ee.ComputedObject, "getInfo", side_effect=pages) as get_info:
+        fingerprints = vector.fetch_fingerprints(
+            feature_collection, total=3, page_size=2, max_workers=1
+        )
+
+    assert get_info.call_count == 2
+    assert fingerprints == {"a": "1", "b": "2", "c": "3"}
+
+
+def test_refresh_features_edits_only_changed_features():
+    old = {str(i): "same" for i in range(10)}
+    path = vector.write_features(
+        [point_feature(str(i), i) for i in range(10)], vector.GEOPACKAGE
+    )
+    vector.save_fingerprints(path, old)
+    new = {**old, "3": "changed", "10": "new"}
+    del new["5"]
+
+    with (
+        patch.object(vector, "fetch_fingerprints", return_value=new),
+        patch.object(
+            vector,
+            "fetch_features_by_id",
+            return_value=[point_feature("3", 30), point_feature("10", 10)],
+        ) as fetch_features_by_id,
+    ):
+        diff = vector.refresh_features(path, Mock())
+
+    fetch_features_by_id.assert_called_once()
+    assert fetch_features_by_id.call_args.args[1] == ["10", "3"]
+    assert diff.deleted == ["5"]
+    values = {
+        props["system:index"]: props["value"] for props in read_feature_properties(path)
+    }
+    expected = {str(i): i for i in range(10) if i != 5}
+    expected.update({"3": 30, "10": 10})
+    assert values == expected
+    assert vector.load_fingerprints(path) == new
+    vector.remove_vector_file(path)
+
+
+def test_refresh_features_needs_stored_fingerprints():
+    path = vector.write_features([point_feature("0", 0)], vector.GEOPACKAGE)
+    with patch.object(vector, "fetch_fingerprints") as fetch_fingerprints:
+        assert vector.refresh_features(path, Mock()) is None
+    fetch_fingerprints.assert_not_called()
+    vector.remove_vector_file(path)
+
+
+def test_feature_stream_scanner_handles_any_chunk_boundary():
+    features = [
+        {
+            "type": "Feature",
+            "id": "a",
+            "geometry": {"type": "Point", "coordinates": [1.5, -2]},
+            "properties": {"label": 'brace } and "quote" \\ slash', "features": []},
+        },
+        {
+            "type": "Feature",
+            "id": "b",
+            "geometry": None,
+            "properties": {"nested": {"list": [[1, 2], {"x": "]"}]}},
+        },
+    ]
+    body = json.dumps(
+        {
+            "type": "FeatureCollection",
+            "columns": {"label": "String"},
+            "features": features,
+        }
+    ).encode("utf-8")
+
+    for split in range(1, len(body)):
+        chunks = [body[:split], body[split:]]
+        assert list(vector.iter_geojson_features(chunks)) == features
+
+    one_byte_chunks = [body[i : i + 1] for i in range(len(body))]
+    assert list(vector.iter_geojson_features(one_byte_chunks)) == features
+
+
+def test_feature_stream_scanner_ignores_other_arrays():
+    body = b'{"type": "FeatureCollection", "bbox": [0, 0, 1, 1], "features": []}'
+    assert list(vector.iter_geojson_features([body])) == []
+
+
+def test_select_properties_leaves_collection_untouched_by_default():
+    feature_collection = Mock()
+
+    assert vector.select_properties(feature_collection) is feature_collection
+    feature_collection.select.assert_not_called()
+
+    vector.select_properties(feature_collection, ["name"], retain_geometry=False)
+    feature_collection.select.assert_called_once_with(["name"], None, False)
+
+
+def test_select_properties_keeps_every_property_without_geometry():
+    feature_collection = Mock()
+
+    vector.select_properties(feature_collection, [], retain_geometry=False)
+
+    feature_collection.select.assert_called_once_with([".*"], None, False)
+
+
+def test_choose_render_mode_rasterizes_over_either_limit():
+    limits = vector.CollectionCost(features=1000, vertices=50000)
+
+    assert vector.choose_render_mode(vector.CollectionCost(10, 500), limits) == (
+        vector.RENDER_VECTOR
+    )
+    assert vector.choose_render_mode(vector.CollectionCost(2000, 500), limits) == (
+        vector.RENDER_RASTER
+    )
+    assert vector.choose_render_mode(vector.CollectionCost(10, 60000), limits) == (
+        vector.RENDER_RASTER
+    )
+
+
+def test_summarize_feature_collection_is_one_cached_request():
+    vector.clear_summary_cache()
+    feature_collection = ee.FeatureCollection("USDOS/LSIB_SIMPLE/2017")
+    info = {"count": 3, "names": ["system:index", "system:time_start", "name"]}
+
+    with patch.object(ee.Dictionary, "getInfo", return_value=info) as get_info:
+        summary = vector.summarize_feature_collection(feature_collection)
+        again = vector.summarize_feature_collection(
+            ee.FeatureCollection("USDOS/LSIB_SIMPLE/2017")
+        )
+        vector.summarize_feature_collection(feature_collection, max_age=0)
+
+    assert summary == vector.CollectionSummary(3, ["name"], True)
+    assert again is summary
+    assert get_info.call_count == 2
+    vector.clear_summary_cache()
+
+
+def test_summary_cache_keeps_only_recent_collections():
+    vector.clear_summary_cache()
+    info = {"count": 1, "names": ["name"]}
+
+    with (
+        patch.object(vector, "SUMMARY_CACHE_SIZE", 1),
+        patch.object(ee.Dictionary, "getInfo", return_value=info) as get_info,
+    ):
+        vector.summarize_feature_collection(ee.FeatureCollection("USDOS/LSIB/2017"))
+        vector.summarize_feature_collection(ee.FeatureCollection("TIGER/2018/States"))
+        vector.summarize_feature_collection(ee.FeatureCollection("USDOS/LSIB/2017"))
+
+    assert get_info.call_count == 3
+    assert len(vector._summary_cache) == 1
+    vector.clear_summary_cache()
@@ -0,0 +1,141 @@
+import os
+import time
+from unittest.mock import patch
+
+import ee
+from qgis.core import QgsFeature, QgsRectangle, QgsVectorLayer
+
+from ee_plugin import utils, vector, vector_provider
+
+ee.Initialize()
+
+
+def test_tile_level_follows_extent_span():
+    assert vector_provider.tile_level(QgsRectangle(-180, -90, 180, 90)) == 2
+    assert vector_provider.tile_level(QgsRectangle(0, 0, 1, 1)) == 9
+    assert vector_provider.tile_level(QgsRectangle(5, 5, 5, 5)) == (
+        vector_provider.TILE_MAX_LEVEL
+    )
+
+
+def test_tiles_for_extent_cover_extent():
+    extent = QgsRectangle(-100, -10, -80, 10)
+    keys = vector_provider.tiles_for_extent(extent, 3)
+
+    assert keys == [(3, 1, 1), (3, 2, 1), (3, 1, 2), (3, 2, 2)]
+    covered = QgsRectangle(vector_provider.tile_extent(keys[0]))
+    for key in keys[1:]:
+        covered.combineExtentWith(vector_provider.tile_extent(key))
+    assert covered.contains(extent)
+
+
+def test_tiles_for_extent_clamps_to_world():
+    keys = vector_provider.tiles_for_extent(QgsRectangle(170, 80, 200, 100), 2)
+    assert keys == [(2, 3, 1)]
+
+
+def test_tile_cache_evicts_least_recently_used():
+    cache = vector_provider.TileCache(max_tiles=2)
+    cache.put((2, 0, 0), [QgsFeature(1)])
+    cache.put((2, 1, 0), [QgsFeature(2)])
+    assert cache.get((2, 0, 0)) is not None
+
+    cache.put((2, 2, 0), [QgsFeature(3)])
+
+    assert cache.get((2, 1, 0)) is None
+    assert sorted(feature.id() for feature in cache.features()) == [1, 3]
+
+
+def test_tile_cache_keeps_feature_ids_stable():
+    cache = vector_provider.TileCache()
+    first = cache.feature_id("a")
+    assert cache.feature_id("b") != first
+    assert cache.feature_id("a") == first
+
+
+def test_uri_round_trips_feature_collection():
+    feature_collection = ee.FeatureCollection("USDOS/LSIB_SIMPLE/2017").filter(
+        ee.Filter.eq("country_na", "Ukraine")
+    )
+    uri = vector_provider.encode_uri(feature_collection, simplify=False)
+
+    decoded, simplify = vector_provider.decode_uri(uri)
+
+    assert ee.serializer.toJSON(decoded) == ee.serializer.toJSON(feature_collection)
+    assert simplify is False
+
+
+def test_tile_tolerance_shrinks_with_zoom_until_full_detail():
+    tolerances = [
+        vector_provider.tile_tolerance(level)
+        for level in range(
+            vector_provider.TILE_MIN_LEVEL, vector_provider.TILE_MAX_LEVEL
+        )
+    ]
+
+    assert tolerances == sorted(tolerances, reverse=True)
+    assert tolerances[-1] > 0
+    assert vector_provider.tile_tolerance(vector_provider.TILE_MAX_LEVEL) == 0
+
+
+def test_child_tiles_make_up_their_parent():
+    children = vector_provider.child_tiles((3, 1, 2))
+
+    assert [key[0] for key in children] == [4] * 4
+    covered = QgsRectangle(vector_provider.tile_extent(children[0]))
+    for key in children[1:]:
+        covered.combineExtentWith(vector_provider.tile_extent(key))
+    assert covered == vector_provider.tile_extent((3, 1, 2))
+
+
+def test_disk_tile_cache_expires_tiles(tmp_path):
+    cache = vector_provider.DiskTileCache("collection", str(tmp_path), max_age=60)
+    infos = [{"type": "Feature", "id": "a", "geometry": None, "properties": {}}]
+    cache.put((2, 0, 0), infos)
+
+    assert cache.get((2, 0, 0)) == infos
+    assert cache.get((2, 1, 0)) is None
+    stale = time.time() - 120
+    os.utime(cache._path((2, 0, 0)), (stale, stale))
+    assert cache.get((2, 0, 0)) is None
+
+
+def test_fetch_tile_infos_splits_full_tiles():
+    feature_collection = ee.FeatureCollection("USDOS/LSIB_SIMPLE/2017")
+    # The tile is full, and its children overlap on feature "b"
+    pages = [None, [{"id": "a"}, {"id": "b"}], [{"id": "b"}], [], [{"id": "c"}]]
+
+    with patch.object(ee.ComputedObject, "getInfo", side_effect=pages):
+        infos = vector_provider.fetch_tile_infos(
+            feature_collection, (2, 0, 0), splits=1
+        )
+
+    assert sorted(info["id"] for info in infos) == ["a", "b", "c"]
+
+
+def test_zoom_simplification_is_unset_until_chosen():
+    layer = QgsVectorLayer("Point?crs=EPSG:4326", "points", "memory")
+    assert vector_provider.zoom_simplification(layer) is None
+    assert not vector_provider.is_simplified(layer)
+
+    vector_provider.set_zoom_simplification(layer, False)
+
+    assert vector_provider.zoom_simplification(layer) is False
+    assert not vector_provider.is_zoom_simplification(layer)
+
+
+def test_large_collections_keep_full_detail_when_simplification_is_off():
+    feature_collection = ee.FeatureCollection("USDOS/LSIB_SIMPLE/2017")
+    cost = vector.CollectionCost(
+        features=vector_provider.VIEWPORT_MIN_FEATURES + 1, vertices=1000
+    )
+
+    uri, provider_key, download = utils._open_ee_vector_source(
+        feature_collection, simplify=False, cost=cost
+    )
+
+    assert provider_key == vector_provider.PROVIDER_KEY
+    assert download is None
+    assert vector_provider.decode_uri(uri)[1] is False
+    uri, _, _ = utils._open_ee_vector_source(feature_collection, cost=cost)
+    assert vector_provider.decode_uri(uri)[1] is True
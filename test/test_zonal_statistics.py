@@ -0,0 +1,91 @@
+import ee
+import pytest
+from qgis.core import (
+    NULL,
+    QgsFeature,
+    QgsGeometry,
+    QgsProcessingContext,
+    QgsProcessingFeedback,
+    QgsProject,
+    QgsRectangle,
+    QgsVectorLayer,
+)
+
+from ee_plugin import Map
+from ee_plugin.processing.zonal_statistics import (
+    ZonalStatisticsAlgorithm,
+    parse_percentiles,
+    zonal_keys,
+)
+
+
+def test_zonal_keys_follow_reduce_regions_naming():
+    assert zonal_keys(["b1"], ["mean", "p50"]) == ["mean", "p50"]
+    assert zonal_keys(["b1", "b2"], ["mean"]) == ["b1", "b2"]
+    assert zonal_keys(["b1", "b2"], ["mean", "max"]) == [
+        "b1_mean",
+        "b1_max",
+        "b2_mean",
+        "b2_max",
+    ]
+
+
+def test_parse_percentiles_rejects_out_of_range_values():
+    assert parse_percentiles("90, 10,,50,10") == [10, 50, 90]
+    with pytest.raises(ValueError):
+        parse_percentiles("150")
+
+
+def test_zonal_statistics_writes_every_polygon(tmp_path):
+    Map.addLayer(ee.Image.constant(4).rename("value"), {}, "Constant")
+    polygons = QgsVectorLayer(
+        "Polygon?crs=EPSG:4326&field=name:string", "zones", "memory"
+    )
+    features = []
+    for name, x in [("a", 10), ("b", 11), ("c", 12)]:
+        feature = QgsFeature(polygons.fields())
+        feature.setAttributes([name])
+        feature.setGeometry(QgsGeometry.fromRect(QgsRectangle(x, 10, x + 0.01, 10.01)))
+        features.append(feature)
+    # No geometry to reduce, but still part of the output
+    empty = QgsFeature(polygons.fields())
+    empty.setAttributes(["d"])
+    features.append(empty)
+    polygons.dataProvider().addFeatures(features)
+    QgsProject.instance().addMapLayer(polygons)
+
+    alg = ZonalStatisticsAlgorithm()
+    alg.initAlgorithm(config=None)
+    result = alg.processAlgorithm(
+        {
+            "INPUT": polygons,
+            "EE_IMAGE": alg.raster_layers.index("Constant"),
+            "STATISTICS": [0, 2],
+            "PERCENTILES": "50",
+            "SCALE": 100,
+            # Two polygons of 5 vertices each per request
+            "CHUNK_VERTICES": 10,
+            "CHUNK_PIXELS": 1e9,
+            "MAX_WORKERS": 2,
+            "OUTPUT": str(tmp_path / "zones.gpkg"),
+        },
+        context=QgsProcessingContext(),
+        feedback=QgsProcessingFeedback(),
+    )
+
+    zones = QgsVectorLayer(result["OUTPUT"], "zones", "ogr")
+    rows = sorted(
+        (
+            feature["name"],
+            feature["value_mean"],
+            feature["value_max"],
+            feature["value_p50"],
+        )
+        for feature in zones.getFeatures()
+    )
+    assert rows == [
+        ("a", 4, 4, 4),
+        ("b", 4, 4, 4),
+        ("c", 4, 4, 4),
+        ("d", NULL, NULL, NULL),
+    ]